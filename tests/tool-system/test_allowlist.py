@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+import time
 
 import httpx
 
@@ -105,3 +106,59 @@ def test_audit_logging_successful_fetch_emits_allow_event(tmp_path, monkeypatch)
         assert allow["upstream"] == "local"
 
     asyncio.run(_run())
+
+
+def test_compiled_allowlist_matches_exact_suffix_and_cidr_entries() -> None:
+    from app.core.allowlist import CompiledAllowlist
+
+    allowlist = CompiledAllowlist(["Example.com", "*.gov.uk", "10.0.0.0/8", "2001:db8::/32", "192.168.1.5"])
+
+    assert allowlist.matches("example.com")
+    assert allowlist.matches("EXAMPLE.COM.")
+    assert not allowlist.matches("www.example.com")
+
+    assert allowlist.matches("www.gov.uk")
+    assert allowlist.matches("a.b.gov.uk")
+    assert not allowlist.matches("gov.uk")
+    assert not allowlist.matches("evilgov.uk")
+
+    assert allowlist.matches("10.1.2.3")
+    assert not allowlist.matches("11.0.0.1")
+    assert allowlist.matches("2001:db8::1")
+    assert allowlist.matches("[2001:db8::1]")
+    assert not allowlist.matches("2001:db9::1")
+    assert allowlist.matches("192.168.1.5")
+    assert not allowlist.matches("192.168.1.6")
+
+    assert CompiledAllowlist(["*"]).matches("anything.example")
+    assert not CompiledAllowlist([]).matches("example.com")
+
+
+def test_allowlist_file_reloads_on_mtime_change(tmp_path, monkeypatch) -> None:
+    from app.core import policy
+
+    path = tmp_path / "allowlist.txt"
+    path.write_text("# initial\nexample.com\n", encoding="utf-8")
+    monkeypatch.setenv("WEB_ALLOWLIST_FILE", str(path))
+    monkeypatch.setenv("WEB_ALLOWLIST_RELOAD_MS", "0")
+    policy.load_allowlist.cache_clear()
+    try:
+        assert policy.is_allowed_host("example.com")
+        assert not policy.is_allowed_host("api.service.gov.uk")
+
+        path.write_text("example.com\n*.gov.uk\n", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+        # Reload disabled: the compiled allowlist is kept.
+        assert not policy.is_allowed_host("api.service.gov.uk")
+
+        monkeypatch.setenv("WEB_ALLOWLIST_RELOAD_MS", "1")
+        deadline = time.monotonic() + 5
+        while not policy.is_allowed_host("api.service.gov.uk"):
+            assert time.monotonic() < deadline, "allowlist was not reloaded"
+            time.sleep(0.01)
+        assert policy.load_allowlist.reloads >= 1
+    finally:
+        monkeypatch.delenv("WEB_ALLOWLIST_FILE")
+        policy.load_allowlist.cache_clear()
@@ -0,0 +1,89 @@
+import json
+import threading
+
+from app.core.audit import AsyncAuditWriter
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_async_writer_batches_and_flushes_on_shutdown(tmp_path) -> None:
+    path = tmp_path / "audit.jsonl"
+    writer = AsyncAuditWriter(str(path), max_queue=1000, batch_lines=50, flush_interval_s=10.0, block_s=0.0)
+    for idx in range(120):
+        assert writer.submit(json.dumps({"n": idx}))
+    writer.close()
+
+    assert [e["n"] for e in _lines(path)] == list(range(120))
+    assert writer.stats()["written"] == 120
+    assert writer.stats()["dropped"] == 0
+
+
+def test_async_writer_drops_when_queue_is_full(tmp_path) -> None:
+    path = tmp_path / "audit.jsonl"
+    writer = AsyncAuditWriter(str(path), max_queue=2, batch_lines=10, flush_interval_s=10.0, block_s=0.0)
+    gate = threading.Event()
+    original_write = writer._write  # noqa: SLF001
+
+    def _stalled_write(handle, batch):
+        gate.wait(timeout=5)
+        original_write(handle, batch)
+
+    writer._write = _stalled_write  # noqa: SLF001
+    accepted = [writer.submit(json.dumps({"n": idx})) for idx in range(20)]
+    gate.set()
+    writer.flush()
+    writer.close()
+
+    stats = writer.stats()
+    assert accepted.count(False) == stats["dropped"] > 0
+    assert stats["written"] == accepted.count(True) == len(_lines(path))
+
+
+def test_emit_tool_event_uses_background_writer_when_enabled(tmp_path, monkeypatch) -> None:
+    from app.core import audit
+
+    path = tmp_path / "audit.jsonl"
+    monkeypatch.setenv("AUDIT_LOG_PATH", str(path))
+    monkeypatch.setenv("AUDIT_ASYNC", "true")
+    try:
+        audit.emit_tool_event({"tool_name": "web.fetch", "decision": "allow"})
+        audit.flush_audit_sink()
+        assert audit.audit_sink_stats()["written"] == 1
+        assert _lines(path)[0]["tool_name"] == "web.fetch"
+    finally:
+        audit.shutdown_audit_sink()
+    assert audit.audit_sink_stats()["mode"] == "async"
+
+
+def test_block_policy_waits_off_the_event_loop(tmp_path) -> None:
+    import asyncio
+    import time
+
+    path = tmp_path / "audit.jsonl"
+    writer = AsyncAuditWriter(str(path), max_queue=3, batch_lines=10, flush_interval_s=10.0, block_s=1.0)
+    gate = threading.Event()
+    original_write = writer._write  # noqa: SLF001
+
+    def _stalled_write(handle, batch):
+        gate.wait(timeout=5)
+        original_write(handle, batch)
+
+    writer._write = _stalled_write  # noqa: SLF001
+
+    async def _run() -> float:
+        started = time.perf_counter()
+        accepted = [writer.submit(json.dumps({"n": idx})) for idx in range(6)]
+        elapsed = time.perf_counter() - started
+        assert all(accepted)
+        return elapsed
+
+    elapsed = asyncio.run(_run())
+    gate.set()
+    writer.flush()
+    writer.close()
+
+    assert elapsed < 0.5
+    assert sorted(e["n"] for e in _lines(path)) == list(range(6))
+    assert writer.stats()["dropped"] == 0
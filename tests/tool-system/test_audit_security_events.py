@@ -107,7 +107,9 @@ def test_execution_failure_emits_failure_class_event(tmp_path, monkeypatch) -> N
 
         from app.api import tools as tools_mod
 
-        async def _fake_post_json(url: str, payload, timeout_ms: int, headers=None, max_response_bytes=1_000_000):
+        async def _fake_post_json(
+            url: str, payload, timeout_ms: int, headers=None, max_response_bytes=1_000_000, endpoints=None
+        ):
             response = httpx.Response(status_code=500, request=httpx.Request("POST", url))
             raise httpx.HTTPStatusError("boom", request=response.request, response=response)
 
@@ -0,0 +1,145 @@
+import asyncio
+import random
+
+import httpx
+
+
+def test_n8n_endpoints_parse_weights_and_fall_back_to_single_url(monkeypatch) -> None:
+    from app.core.policy import get_n8n_endpoints, get_tool_backend_chain
+
+    monkeypatch.setenv("N8N_WEB_SEARCH_URL", "http://n8n:5678/webhook/tools/web.search")
+    assert get_n8n_endpoints("web.search") == [("http://n8n:5678/webhook/tools/web.search", 1.0)]
+
+    monkeypatch.setenv(
+        "N8N_WEB_SEARCH_URLS",
+        "http://n8n-a/webhook/s weight=3, http://n8n-b/webhook/s, http://n8n-c/webhook/s weight=0",
+    )
+    assert get_n8n_endpoints("web.search") == [("http://n8n-a/webhook/s", 3.0), ("http://n8n-b/webhook/s", 1.0)]
+
+    monkeypatch.setenv("TOOL_BACKEND", "n8n")
+    assert get_tool_backend_chain("web.fetch") == ["n8n"]
+    monkeypatch.setenv("TOOL_BACKEND_CHAIN_WEB_FETCH", "n8n, local")
+    assert get_tool_backend_chain("web.fetch") == ["n8n", "local"]
+
+
+def test_weighted_pick_follows_weights(monkeypatch) -> None:
+    from app.core import http as http_mod
+    from app.core.backends import BALANCE_WEIGHTED, EndpointPool
+
+    http_mod.breakers.clear()
+    random.seed(3)
+    pool = EndpointPool([("http://n8n-a/hook", 3.0), ("http://n8n-b/hook", 1.0)])
+    picks = [pool.pick(BALANCE_WEIGHTED).url for _ in range(4000)]
+    share = picks.count("http://n8n-a/hook") / len(picks)
+    assert 0.70 < share < 0.80
+
+
+def test_latency_pick_avoids_slow_and_open_endpoints(monkeypatch) -> None:
+    from app.core import http as http_mod
+    from app.core.backends import BALANCE_LATENCY, EndpointPool
+
+    monkeypatch.setenv("CIRCUIT_FAILURE_THRESHOLD", "1")
+    http_mod.breakers.clear()
+    pool = EndpointPool([("http://n8n-a/hook", 1.0), ("http://n8n-b/hook", 1.0)])
+    slow, fast = pool.endpoints
+    slow.observe(500.0)
+    fast.observe(20.0)
+    assert {pool.pick(BALANCE_LATENCY).url for _ in range(50)} == {"http://n8n-b/hook"}
+
+    # An endpoint with an open circuit is skipped even when it is the fastest.
+    http_mod.breakers.get("n8n:n8n-b").record_failure()
+    assert {pool.pick(BALANCE_LATENCY).url for _ in range(50)} == {"http://n8n-a/hook"}
+    http_mod.breakers.clear()
+
+
+def test_search_spreads_load_across_n8n_endpoints(monkeypatch) -> None:
+    async def _run() -> None:
+        monkeypatch.setenv("TOOL_BACKEND", "n8n")
+        monkeypatch.setenv("N8N_BALANCE", "weighted")
+        monkeypatch.setenv("N8N_WEB_SEARCH_URLS", "http://n8n-a/webhook/s,http://n8n-b/webhook/s")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.backends import backend_registry
+        from app.core.http import JsonResult
+
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        backend_registry.clear()
+        random.seed(5)
+        calls = []
+
+        async def _fake_post_json(url, payload, timeout_ms, headers=None, max_response_bytes=None, endpoints=None):
+            calls.append(url)
+            return JsonResult(data={"query": payload["query"], "results": []}, bytes_read=10)
+
+        monkeypatch.setattr(tools_mod, "post_json", _fake_post_json)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            responses = [
+                await client.post(
+                    "/tools/web.search",
+                    json={"agent_id": "lb", "purpose": "spread", "inputs": {"query": f"q{i}"}},
+                )
+                for i in range(20)
+            ]
+            health = await client.get("/health")
+
+        assert all(resp.status_code == 200 for resp in responses)
+        assert {resp.json()["source_meta"]["endpoint"] for resp in responses} == {"n8n-a", "n8n-b"}
+        assert set(calls) == {"http://n8n-a/webhook/s", "http://n8n-b/webhook/s"}
+        endpoints = health.json()["data"]["backends"]["n8n_endpoints"]["web.search"]
+        assert sum(item["selected"] for item in endpoints) == 20
+        backend_registry.clear()
+
+    asyncio.run(_run())
+
+
+def test_fetch_fails_over_from_n8n_to_local(monkeypatch) -> None:
+    async def _run() -> None:
+        monkeypatch.setenv("TOOL_BACKEND", "n8n")
+        monkeypatch.setenv("TOOL_BACKEND_CHAIN_WEB_FETCH", "n8n,local")
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.backends import backend_registry
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        backend_registry.clear()
+        state = {"status": 502}
+
+        async def _failing_post_json(url, payload, timeout_ms, headers=None, max_response_bytes=None, endpoints=None):
+            response = httpx.Response(status_code=state["status"], request=httpx.Request("POST", url))
+            raise httpx.HTTPStatusError("boom", request=response.request, response=response)
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(final_url=url, status_code=200, title="local", extracted_text="served locally")
+
+        monkeypatch.setattr(tools_mod, "post_json", _failing_post_json)
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        body = {"agent_id": "lb", "purpose": "failover", "inputs": {"url": "https://example.com/"}}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            resp = await client.post("/tools/web.fetch", json=body)
+            state["status"] = 400
+            rejected = await client.post("/tools/web.fetch", json=body)
+
+        assert resp.status_code == 200, resp.json()
+        assert resp.json()["source_meta"]["backend"] == "local"
+        assert resp.json()["source_meta"]["fallback_from"] == "n8n"
+        assert resp.json()["data"]["title"] == "local"
+        assert backend_registry.failovers == {"web.fetch:n8n": 1}
+        # A 4xx means the request is bad; another backend would not do better.
+        assert rejected.status_code == 400
+        assert rejected.json()["source_meta"]["backend"] == "n8n"
+        backend_registry.clear()
+
+    asyncio.run(_run())
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+
+
+def test_bulkhead_queues_then_rejects_and_hands_slots_over() -> None:
+    from app.core.bulkhead import Bulkhead
+
+    async def _run() -> None:
+        bulkhead = Bulkhead(limit=1, queue_max=1)
+        assert await bulkhead.acquire()
+        queued = asyncio.create_task(bulkhead.acquire())
+        await asyncio.sleep(0)
+        assert bulkhead.waiting == 1
+        assert not await bulkhead.acquire()
+
+        bulkhead.release()
+        assert await queued
+        assert (bulkhead.in_flight, bulkhead.waiting) == (1, 0)
+
+        # A cancelled waiter gives up its place without leaking a slot.
+        cancelled = asyncio.create_task(bulkhead.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        bulkhead.release()
+        assert (bulkhead.in_flight, bulkhead.waiting) == (0, 0)
+        assert bulkhead.as_dict()["rejected"] == 1
+
+    asyncio.run(_run())
+
+
+def test_fetch_burst_is_bounded_and_overflow_fails_fast(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(audit_path))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("TOOL_CONCURRENCY_WEB_FETCH", "2")
+        monkeypatch.setenv("CONCURRENCY_QUEUE_MAX", "1")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.bulkhead import bulkheads
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        bulkheads.clear()
+        in_flight = 0
+        peak = 0
+
+        async def _slow_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return FetchResult(final_url=url, status_code=200, title="t", extracted_text=f"body {url}")
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _slow_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            responses = await asyncio.gather(
+                *[
+                    client.post(
+                        "/tools/web.fetch",
+                        json={
+                            "agent_id": "burst",
+                            "purpose": "bulkhead",
+                            "request_id": f"bh-{idx}",
+                            "inputs": {"url": f"https://example.com/page/{idx}"},
+                        },
+                    )
+                    for idx in range(4)
+                ]
+            )
+            health = await client.get("/health")
+
+        codes = sorted(r.status_code for r in responses)
+        assert codes == [200, 200, 200, 503]
+        assert peak == 2
+        limited = next(r for r in responses if r.status_code == 503)
+        assert limited.headers["Retry-After"] == "1"
+        error = limited.json()["error"]
+        assert error["code"] == "CONCURRENCY_LIMITED"
+        assert error["details"] == {"scope": "tool", "key": "tool:web.fetch", "limit": 2, "queue_max": 1}
+        waits = sorted(r.json()["timings_ms"]["queue"] for r in responses if r.status_code == 200)
+        assert waits[-1] >= 30.0
+
+        stats = health.json()["data"]["concurrency"]["tool:web.fetch"]
+        assert (stats["limit"], stats["in_flight"], stats["rejected"]) == (2, 0, 1)
+
+        events = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+        failures = [e for e in events if e.get("event_type") == "tool.execution.failure"]
+        assert [(e["reason_code"], e["attempts"]) for e in failures] == [("CONCURRENCY_LIMITED", 0)]
+        bulkheads.clear()
+
+    asyncio.run(_run())
+
+
+def test_registry_does_not_accumulate_per_host_bulkheads(monkeypatch) -> None:
+    from app.core import bulkhead as bulkhead_mod
+
+    monkeypatch.setattr(bulkhead_mod, "_MAX_TRACKED_BULKHEADS", 4)
+
+    async def _run() -> None:
+        registry = bulkhead_mod.BulkheadRegistry()
+        busy = await registry.acquire([("host", "host:busy.example", 2)], 1)
+        for idx in range(50):
+            held = await registry.acquire([("tool", "tool:web.fetch", 8), ("host", f"host:h{idx}.example", 2)], 1)
+            registry.release(held)
+
+        stats = registry.stats()
+        assert len(stats) == 4
+        # Busy and recently used entries are kept; idle hosts were evicted oldest first.
+        assert {"host:busy.example", "tool:web.fetch", "host:h49.example"} <= set(stats)
+        assert stats["host:busy.example"]["in_flight"] == 1
+        registry.release(busy)
+
+    asyncio.run(_run())
@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+
+from app.core.sniff import BodyDecoder, charset_from_content_type, is_text_content_type, sniff_charset
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+        self.served = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.served += 1
+            yield chunk
+
+
+def _fetch(monkeypatch, handler) -> object:
+    from app.core import http as http_mod
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
+    return asyncio.run(http_mod.fetch_url("https://example.com/", timeout_ms=1000, max_bytes=1_000_000, user_agent="t"))
+
+
+def test_content_type_gating_and_header_charset() -> None:
+    assert is_text_content_type("text/html; charset=utf-8")
+    assert is_text_content_type("application/xhtml+xml")
+    assert is_text_content_type(None)
+    assert not is_text_content_type("application/pdf")
+    assert not is_text_content_type("image/png")
+    assert charset_from_content_type('text/html; charset="Shift_JIS"') == "shift_jis"
+    assert charset_from_content_type("text/html; charset=ISO-8859-1") == "cp1252"
+    assert charset_from_content_type("text/html; charset=bogus") is None
+
+
+def test_sniff_prefers_bom_then_meta_then_utf8_validation() -> None:
+    assert sniff_charset(b"\xef\xbb\xbf<html>") == "utf-8"
+    assert sniff_charset(b'<head><meta charset="windows-1251"></head>') == "cp1251"
+    assert sniff_charset(b'<meta http-equiv="Content-Type" content="text/html; charset=koi8-r">') == "koi8-r"
+    assert sniff_charset("<p>café</p>".encode("utf-8")) == "utf-8"
+    assert sniff_charset("<p>café</p>".encode("cp1252")) == "cp1252"
+    # A multi-byte character cut by the sniff window still counts as UTF-8.
+    assert sniff_charset("<p>é".encode("utf-8")[:-1]) == "utf-8"
+
+
+def test_decoder_handles_charset_split_across_chunks() -> None:
+    body = ('<meta charset="cp1251"><title>Новости</title>' + "<p>текст</p>" * 1000).encode("cp1251")
+    decoder = BodyDecoder("text/html")
+    text = "".join(decoder.feed(body[i : i + 100]) for i in range(0, len(body), 100)) + decoder.finish()
+    assert decoder.charset == "cp1251"
+    assert text.startswith('<meta charset="cp1251"><title>Новости</title><p>текст</p>')
+
+
+def test_fetch_decodes_legacy_encoded_page(monkeypatch) -> None:
+    page = "<html><head><title>Überblick</title></head><body><p>Größe und Maße</p></body></html>"
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"Content-Type": "text/html; charset=iso-8859-1"}, content=page.encode("latin-1")
+        )
+
+    result = _fetch(monkeypatch, _handler)
+    assert result.title == "Überblick"
+    assert "Größe und Maße" in result.extracted_text
+    assert result.charset == "cp1252"
+    assert result.content_type == "text/html"
+
+
+def test_fetch_skips_binary_bodies_without_reading_them(monkeypatch) -> None:
+    typed = _CountingStream([b"%PDF-1.7\n" + b"\x00" * 1024] * 50)
+    untyped = _CountingStream([b"\x89PNG\r\n\x1a\n" + b"\x00" * 8192] * 50)
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/":
+            return httpx.Response(200, headers={"Content-Type": "application/pdf"}, stream=typed)
+        return httpx.Response(200, stream=untyped)
+
+    pdf = _fetch(monkeypatch, _handler)
+    assert pdf.extracted_text == "" and pdf.bytes_read == 0
+    assert pdf.content_type == "application/pdf"
+    assert typed.served == 0
+
+    from app.core import http as http_mod
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
+    png = asyncio.run(
+        http_mod.fetch_url("https://example.com/img", timeout_ms=1000, max_bytes=1_000_000, user_agent="t")
+    )
+    assert png.extracted_text == "" and png.title == ""
+    assert untyped.served == 1
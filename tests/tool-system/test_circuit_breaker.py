@@ -0,0 +1,141 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+
+def test_circuit_opens_fast_fails_and_recovers_through_half_open_probe(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        monkeypatch.setenv("CIRCUIT_FAILURE_THRESHOLD", "3")
+        monkeypatch.setenv("CIRCUIT_OPEN_MS", "50")
+        monkeypatch.setenv("N8N_RETRY_MAX_ATTEMPTS", "1")
+        http_mod.breakers.clear()
+        state = {"calls": 0, "status": 502}
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            state["calls"] += 1
+            return httpx.Response(state["status"], json={"ok": state["status"] < 400})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
+
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await http_mod.post_json("http://n8n:5678/webhook", {}, 1000)
+        breaker = http_mod.breakers.get("n8n:n8n")
+        assert breaker.state == http_mod.CIRCUIT_OPEN
+
+        with pytest.raises(http_mod.CircuitOpenError) as excinfo:
+            await http_mod.post_json("http://n8n:5678/webhook", {}, 1000)
+        assert state["calls"] == 3
+        assert 0 < excinfo.value.retry_after_s <= 0.05
+
+        # A 4xx is the caller's problem, not an upstream failure.
+        await asyncio.sleep(0.06)
+        state["status"] = 400
+        with pytest.raises(httpx.HTTPStatusError):
+            await http_mod.post_json("http://n8n:5678/webhook", {}, 1000)
+        assert breaker.state == http_mod.CIRCUIT_HALF_OPEN
+
+        state["status"] = 200
+        assert (await http_mod.post_json("http://n8n:5678/webhook", {}, 1000)).data == {"ok": True}
+        assert breaker.state == http_mod.CIRCUIT_CLOSED
+        assert state["calls"] == 5
+        http_mod.breakers.clear()
+
+    asyncio.run(_run())
+
+
+def test_half_open_probe_failure_reopens_circuit(monkeypatch) -> None:
+    from app.core.http import CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, CircuitOpenError
+
+    monkeypatch.setenv("CIRCUIT_FAILURE_THRESHOLD", "1")
+    monkeypatch.setenv("CIRCUIT_OPEN_MS", "0")
+    breaker = CircuitBreaker("web:example.com")
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+
+    breaker.before_call()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+
+
+def test_breaker_registry_stays_bounded_when_every_circuit_is_open(monkeypatch) -> None:
+    from app.core import http as http_mod
+
+    monkeypatch.setenv("CIRCUIT_FAILURE_THRESHOLD", "1")
+    monkeypatch.setattr(http_mod, "_MAX_TRACKED_UPSTREAMS", 2)
+    registry = http_mod.BreakerRegistry()
+    registry.get("web:closed.example")
+    for host in ("a", "b", "c"):
+        registry.get(f"web:{host}.example").record_failure()
+
+    # The closed circuit goes first, then the least recently used open one.
+    assert list(registry.stats()) == ["web:b.example", "web:c.example"]
+    assert all(breaker["state"] == http_mod.CIRCUIT_OPEN for breaker in registry.stats().values())
+
+
+def test_adaptive_timeout_tracks_latency_within_bounds(monkeypatch) -> None:
+    from app.core.http import CircuitBreaker
+
+    breaker = CircuitBreaker("web:example.com")
+    for _ in range(10):
+        breaker.record_success(40.0)
+    assert breaker.timeout_ms(8000) == 8000  # not enough samples yet
+
+    for _ in range(20):
+        breaker.record_success(40.0)
+    assert breaker.timeout_ms(8000) == 1000  # floor
+
+    monkeypatch.setenv("ADAPTIVE_TIMEOUT_MIN_MS", "10")
+    assert breaker.timeout_ms(8000) == 160  # p99 x 4
+    assert breaker.timeout_ms(100) == 100  # never above the configured maximum
+
+    monkeypatch.setenv("ADAPTIVE_TIMEOUT_ENABLED", "false")
+    assert breaker.timeout_ms(8000) == 8000
+
+
+def test_open_circuit_returns_503_and_shows_in_health(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        os.environ["AUDIT_LOG_PATH"] = str(tmp_path / "audit.jsonl")
+        monkeypatch.setenv("TOOL_BACKEND", "n8n")
+
+        from app.api import tools as tools_mod
+        from app.core import http as http_mod
+        from app.core import policy
+
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        http_mod.breakers.clear()
+        http_mod.breakers.get("n8n:n8n").record_success(12.0)
+
+        async def _open_post_json(url, payload, timeout_ms, headers=None, max_response_bytes=None, endpoints=None):
+            raise http_mod.CircuitOpenError("n8n:n8n", 12.2)
+
+        monkeypatch.setattr(tools_mod, "post_json", _open_post_json)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            resp = await client.post(
+                "/tools/web.search",
+                json={"agent_id": "cb", "purpose": "circuit", "inputs": {"query": "q"}},
+            )
+            health = await client.get("/health")
+
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "13"
+        assert resp.json()["error"]["code"] == "UPSTREAM_CIRCUIT_OPEN"
+        assert resp.json()["error"]["details"]["upstream"] == "n8n:n8n"
+        circuits = health.json()["data"]["circuits"]
+        assert circuits["n8n:n8n"]["state"] == "closed"
+        assert circuits["n8n:n8n"]["latency_p50_ms"] == 12.0
+        http_mod.breakers.clear()
+
+    asyncio.run(_run())
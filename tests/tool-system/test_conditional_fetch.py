@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import json
+
+import httpx
+
+
+def _fetch_body(url: str, if_none_match=None) -> dict:
+    inputs = {"url": url}
+    if if_none_match is not None:
+        inputs["if_none_match"] = if_none_match
+    return {"agent_id": "digest", "purpose": "poll", "inputs": inputs}
+
+
+def test_unchanged_page_returns_unchanged_envelope_without_body(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(audit_path))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.cache import validator_store
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        validator_store.clear()
+        text = "morning headlines"
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        sent = []
+
+        async def _fake_fetch_url(url, timeout_ms, max_bytes, user_agent, extra_headers=None) -> FetchResult:
+            sent.append(extra_headers)
+            if extra_headers and extra_headers.get("If-None-Match") == '"v1"':
+                return FetchResult(final_url=url, status_code=304, title="", extracted_text="", not_modified=True)
+            return FetchResult(
+                final_url=url,
+                status_code=200,
+                title="News",
+                extracted_text=text,
+                bytes_read=4096,
+                etag='"v1"',
+                last_modified="Mon, 05 Oct 2026 06:00:00 GMT",
+            )
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/news"))
+            second = await client.post(
+                "/tools/web.fetch", json=_fetch_body("https://EXAMPLE.com/news#top", if_none_match=digest)
+            )
+            health = await client.get("/health")
+
+        assert first.json()["content_hash"] == digest
+        assert sent == [
+            None,
+            {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 05 Oct 2026 06:00:00 GMT"},
+        ]
+        body = second.json()
+        assert body["ok"] is True
+        assert body["content_hash"] == digest
+        assert body["data"]["unchanged"] is True
+        assert body["data"]["status"] == 304
+        assert body["data"]["extracted_text"] == ""
+        assert body["source_meta"]["bytes_read"] == 0
+        assert health.json()["data"]["fetch_validators"] == {
+            "conditional_sent": 1,
+            "not_modified": 1,
+            "unchanged": 1,
+            "entries": 1,
+        }
+
+        events = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+        results = [e for e in events if e.get("event_type") == "tool.execution.result"]
+        assert [e["unchanged"] for e in results] == [False, True]
+        validator_store.clear()
+
+    asyncio.run(_run())
+
+
+def test_stale_hash_gets_full_body_and_matching_hash_without_validators_is_unchanged(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.cache import validator_store
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        validator_store.clear()
+        text = "page without validators"
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        sent = []
+
+        async def _fake_fetch_url(url, timeout_ms, max_bytes, user_agent, extra_headers=None) -> FetchResult:
+            sent.append(extra_headers)
+            return FetchResult(final_url=url, status_code=200, title="Page", extracted_text=text)
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            stale = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/p", "0" * 64))
+            same = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/p", digest))
+
+        # A hash the gateway never saw for this URL must not trigger a conditional request.
+        assert sent == [None, None]
+        assert stale.json()["data"]["extracted_text"] == text
+        assert "unchanged" not in stale.json()["data"]
+        assert same.json()["data"]["unchanged"] is True
+        assert same.json()["data"]["status"] == 200
+        assert same.json()["data"]["extracted_text"] == ""
+        validator_store.clear()
+
+    asyncio.run(_run())
@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import json
+import os
+
+import httpx
+import pytest
+
+
+def _fetch_body(url: str, known_hashes=None) -> dict:
+    inputs = {"url": url}
+    if known_hashes is not None:
+        inputs["known_hashes"] = known_hashes
+    return {"agent_id": "research", "purpose": "dedup", "inputs": inputs}
+
+
+def test_content_store_writes_each_hash_once(tmp_path) -> None:
+    from app.core.content_store import ContentStore
+
+    store = ContentStore()
+    text = "same article text"
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    assert store.put(str(tmp_path), digest, text) is True
+    assert store.put(str(tmp_path), digest, text) is False
+    assert store.get(str(tmp_path), digest) == text
+    assert store.get(str(tmp_path), "0" * 64) is None
+    assert store.stats.objects_written == 1
+    assert store.stats.dedup_hits == 1
+    assert os.listdir(tmp_path / digest[:2]) == [digest]
+    with pytest.raises(ValueError):
+        store.put(str(tmp_path), "../escape", text)
+
+
+def test_known_hash_returns_reference_and_content_is_stored_once(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        store_dir = tmp_path / "store"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(audit_path))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com,mirror.example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("CONTENT_STORE_DIR", str(store_dir))
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        text = "syndicated story body " * 50
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(final_url=url, status_code=200, title="Story", extracted_text=text)
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/story"))
+            digest = first.json()["content_hash"]
+            second = await client.post(
+                "/tools/web.fetch", json=_fetch_body("https://mirror.example.com/story", known_hashes=[digest])
+            )
+            resolved = await client.get(f"/content/{digest}")
+            missing = await client.get(f"/content/{'0' * 64}")
+
+        assert first.json()["data"]["extracted_text"] == text
+        assert "content_ref" not in first.json()["data"]
+        body = second.json()
+        assert body["ok"] is True
+        assert body["content_hash"] == digest
+        assert body["data"]["extracted_text"] == ""
+        assert body["data"]["content_ref"] == digest
+        assert len(second.content) < len(first.content) / 2
+
+        assert resolved.status_code == 200
+        assert resolved.json()["data"]["extracted_text"] == text
+        assert missing.status_code == 404
+        assert missing.json()["error"]["code"] == "NOT_FOUND"
+        assert [path.name for path in store_dir.rglob("*") if path.is_file()] == [digest]
+
+        events = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+        results = [e for e in events if e.get("event_type") == "tool.execution.result"]
+        assert [e["content_ref"] for e in results] == [False, True]
+
+    asyncio.run(_run())
+
+
+def test_cache_keeps_full_text_when_response_is_a_reference(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("WEB_FETCH_CACHE_TTL_S", "60")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.cache import response_cache
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        response_cache.clear()
+        text = "cached page text"
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(final_url=url, status_code=200, title="Page", extracted_text=text)
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            ref = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/a", [digest]))
+            full = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/a"))
+
+        assert ref.json()["data"]["content_ref"] == digest
+        assert full.json()["source_meta"]["cache"] == "hit"
+        assert full.json()["data"]["extracted_text"] == text
+        assert "content_ref" not in full.json()["data"]
+        response_cache.clear()
+
+    asyncio.run(_run())
+
+
+def test_content_store_failure_is_an_error_envelope_per_batch_item(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(audit_path))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("CONTENT_STORE_DIR", str(tmp_path / "store"))
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.content_store import content_store
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(final_url=url, status_code=200, title="Page", extracted_text=f"text of {url}")
+
+        def _full_disk(store_dir: str, digest: str, text: str) -> bool:
+            if text.endswith("/full"):
+                raise OSError(28, "No space left on device")
+            return True
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+        monkeypatch.setattr(content_store, "put", _full_disk)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            resp = await client.post(
+                "/tools/web.fetch:batch",
+                json={
+                    "agent_id": "research",
+                    "purpose": "store",
+                    "request_id": "cs-1",
+                    "inputs": {"items": [{"url": "https://example.com/full"}, {"url": "https://example.com/ok"}]},
+                },
+            )
+
+        assert resp.status_code == 200
+        items = resp.json()["data"]["items"]
+        assert items[0]["http_status"] == 500
+        assert items[0]["envelope"]["error"]["code"] == "INTERNAL_ERROR"
+        assert items[1]["envelope"]["ok"] is True
+
+        events = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+        failures = [e for e in events if e.get("event_type") == "tool.execution.failure"]
+        assert [(e["correlation_id"], e["reason_code"]) for e in failures] == [("cs-1#0", "INTERNAL_ERROR")]
+
+    asyncio.run(_run())
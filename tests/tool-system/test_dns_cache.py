@@ -0,0 +1,178 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import httpx
+import pytest
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        body = f"<html><head><title>{self.headers.get('Host')}</title></head><body><p>ok</p></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A003
+        return
+
+
+@pytest.fixture()
+def fake_resolver(monkeypatch):
+    from app.core.dns import dns_cache
+
+    zone = {"news.example": "93.184.216.34", "intranet.example": "10.1.2.3"}
+    lookups = []
+
+    def _getaddrinfo(host, port, *args, **kwargs):
+        lookups.append(host)
+        if host not in zone:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (zone[host], port or 0))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", _getaddrinfo)
+    dns_cache.clear()
+    yield zone, lookups
+    dns_cache.clear()
+
+
+def test_resolutions_and_failures_are_cached(fake_resolver, monkeypatch) -> None:
+    from app.core.dns import dns_cache
+
+    zone, lookups = fake_resolver
+    monkeypatch.setenv("DNS_NEGATIVE_TTL_S", "30")
+
+    async def _run() -> None:
+        results = await asyncio.gather(*[dns_cache.resolve("news.example") for _ in range(5)])
+        assert set(results) == {("93.184.216.34",)}
+        assert await dns_cache.resolve("NEWS.example.") == ("93.184.216.34",)
+        for _ in range(3):
+            with pytest.raises(socket.gaierror):
+                await dns_cache.resolve("missing.example")
+
+    asyncio.run(_run())
+    assert lookups == ["news.example", "missing.example"]
+    stats = dns_cache.as_dict()
+    assert (stats["negative_hits"], stats["failures"], stats["entries"]) == (2, 1, 2)
+
+
+def test_guard_blocks_private_addresses_unless_allowlisted_by_name_or_ip(fake_resolver, monkeypatch) -> None:
+    from app.core import policy
+    from app.core.dns import AddressBlockedError, dns_cache, is_public_address
+
+    assert not is_public_address("169.254.169.254")
+    assert not is_public_address("::ffff:127.0.0.1")
+    assert is_public_address("2606:4700::1111")
+
+    async def _run() -> None:
+        monkeypatch.setenv("WEB_ALLOWLIST", "*.example")
+        policy.load_allowlist.cache_clear()
+        with pytest.raises(AddressBlockedError) as blocked:
+            await dns_cache.resolve("intranet.example", guard=True)
+        assert blocked.value.address == "10.1.2.3"
+        with pytest.raises(AddressBlockedError):
+            await dns_cache.resolve("127.0.0.1", guard=True)
+        # Unguarded lookups (n8n), exact hostname entries and IP/CIDR entries are not blocked.
+        assert await dns_cache.resolve("intranet.example") == ("10.1.2.3",)
+        monkeypatch.setenv("WEB_ALLOWLIST", "intranet.example")
+        policy.load_allowlist.cache_clear()
+        assert await dns_cache.resolve("INTRANET.example.", guard=True) == ("10.1.2.3",)
+        monkeypatch.setenv("WEB_ALLOWLIST", "*.example,10.0.0.0/8")
+        policy.load_allowlist.cache_clear()
+        assert await dns_cache.resolve("intranet.example", guard=True) == ("10.1.2.3",)
+
+    asyncio.run(_run())
+    policy.load_allowlist.cache_clear()
+
+
+def test_fetch_connects_to_cached_address_and_denies_private_targets(fake_resolver, tmp_path, monkeypatch) -> None:
+    zone, lookups = fake_resolver
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    zone["origin.example"] = "127.0.0.1"
+
+    async def _run() -> None:
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("WEB_ALLOWLIST", "*.example")
+
+        from app.core import http as http_mod
+        from app.core import policy
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        http_mod.breakers.clear()
+
+        from app.main import app
+
+        body = {"agent_id": "dns", "purpose": "ssrf", "inputs": {"url": f"http://origin.example:{port}/"}}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            denied = await client.post("/tools/web.fetch", json={**body, "request_id": "d-1"})
+            monkeypatch.setenv("WEB_ALLOWLIST", "*.example,127.0.0.1")
+            policy.load_allowlist.cache_clear()
+            first = await client.post("/tools/web.fetch", json={**body, "request_id": "d-2"})
+            second = await client.post(
+                "/tools/web.fetch",
+                json={**body, "request_id": "d-3", "inputs": {"url": f"http://origin.example:{port}/again"}},
+            )
+            health = await client.get("/health")
+
+        assert denied.status_code == 403
+        error = denied.json()["error"]
+        assert error["code"] == "POLICY_DENIED"
+        assert error["details"] == {"hostname": "origin.example", "address": "127.0.0.1"}
+        assert first.status_code == 200 and second.status_code == 200
+        # Connected by address; the origin still saw its hostname.
+        assert first.json()["data"]["title"] == f"origin.example:{port}"
+        assert lookups.count("origin.example") == 1
+        assert health.json()["data"]["dns"]["blocked"] == 1
+
+    try:
+        asyncio.run(_run())
+    finally:
+        server.shutdown()
+        thread.join(timeout=1)
+
+
+def test_warmup_resolves_allowlisted_hosts_and_preconnects_n8n(fake_resolver, monkeypatch) -> None:
+    zone, lookups = fake_resolver
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+
+    async def _run() -> None:
+        monkeypatch.setenv("WEB_ALLOWLIST_FILE", "")
+        monkeypatch.setenv("WEB_ALLOWLIST", "*.wild.example,missing.example,10.0.0.0/8")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("TOOL_BACKEND_CHAIN_WEB_SEARCH", "n8n")
+        monkeypatch.setenv("N8N_WEB_SEARCH_URL", f"http://127.0.0.1:{port}/webhook/tools/web.search")
+
+        from app.core import policy
+        from app.core.dns import dns_cache
+        from app.core.http import client_registry
+
+        policy.load_allowlist.cache_clear()
+        result = await client_registry.warm_up(5)
+        await client_registry.aclose()
+        assert result == {"targets": 2, "connected": 1}
+        assert lookups == ["missing.example"]
+        assert dns_cache.stats.warmed == 1
+
+    try:
+        asyncio.run(_run())
+    finally:
+        server.shutdown()
+        thread.join(timeout=1)
+        from app.core import policy
+
+        policy.load_allowlist.cache_clear()
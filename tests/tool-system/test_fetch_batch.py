@@ -0,0 +1,164 @@
+import asyncio
+import json
+import os
+
+import httpx
+
+
+def _read_events(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def _batch_body(urls) -> dict:
+    return {
+        "agent_id": "batch-agent",
+        "purpose": "batch test",
+        "request_id": "batch-1",
+        "inputs": {"items": [{"url": url} for url in urls]},
+    }
+
+
+def _setup(tmp_path, monkeypatch, delays):
+    os.environ["AUDIT_LOG_PATH"] = str(tmp_path / "audit.jsonl")
+    os.environ["WEB_ALLOWLIST"] = "example.com"
+    os.environ["TOOL_BACKEND"] = "local"
+
+    from app.api import tools as tools_mod
+    from app.core import policy
+    from app.core.http import FetchResult
+
+    policy.load_allowlist.cache_clear()
+    policy.rate_limiter._events.clear()  # noqa: SLF001
+    state = {"in_flight": 0, "peak": 0}
+
+    async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await asyncio.sleep(delays.get(url, 0.01))
+        finally:
+            state["in_flight"] -= 1
+        return FetchResult(final_url=url, status_code=200, title="T", extracted_text=f"body of {url}")
+
+    monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+    return state
+
+
+def test_batch_applies_policy_per_item_and_bounds_concurrency(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        monkeypatch.setenv("WEB_FETCH_BATCH_CONCURRENCY", "3")
+        state = _setup(tmp_path, monkeypatch, {})
+        urls = [f"https://example.com/{i}" for i in range(9)] + ["https://blocked.test/x"]
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            resp = await client.post("/tools/web.fetch:batch", json=_batch_body(urls))
+
+        assert resp.status_code == 200
+        body = resp.json()
+        items = body["data"]["items"]
+        assert [item["index"] for item in items] == list(range(10))
+        assert all(item["envelope"]["ok"] for item in items[:9])
+        assert items[3]["envelope"]["data"]["extracted_text"] == "body of https://example.com/3"
+        assert items[9]["http_status"] == 403
+        assert items[9]["envelope"]["error"]["code"] == "POLICY_DENIED"
+        assert body["source_meta"] == {
+            "tool": "web.fetch:batch",
+            "backend": "local",
+            "items": 10,
+            "succeeded": 9,
+            "failed": 1,
+        }
+        assert state["peak"] == 3
+
+        events = _read_events(tmp_path / "audit.jsonl")
+        results = [e for e in events if e.get("event_type") == "tool.execution.result"]
+        assert len(results) == 9
+        assert {e["correlation_id"] for e in results} == {f"batch-1#{i}" for i in range(9)}
+
+    asyncio.run(_run())
+
+
+def test_batch_rejects_too_many_items(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        monkeypatch.setenv("WEB_FETCH_BATCH_MAX_ITEMS", "2")
+        _setup(tmp_path, monkeypatch, {})
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            resp = await client.post("/tools/web.fetch:batch", json=_batch_body(["https://example.com/"] * 3))
+
+        assert resp.status_code == 400
+        assert resp.json()["error"]["details"] == {"field": "inputs.items", "max_items": 2}
+
+    asyncio.run(_run())
+
+
+def test_batch_streams_ndjson_in_completion_order(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        slow, fast = "https://example.com/slow", "https://example.com/fast"
+        _setup(tmp_path, monkeypatch, {slow: 0.2, fast: 0.0})
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            resp = await client.post("/tools/web.fetch:batch?stream=true", json=_batch_body([slow, fast]))
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [line.get("index") for line in lines[:2]] == [1, 0]
+        assert lines[0]["envelope"]["data"]["final_url"] == fast
+        assert lines[2]["done"] is True
+        assert lines[2]["source_meta"]["succeeded"] == 2
+
+    asyncio.run(_run())
+
+
+def test_batch_stream_cancels_pending_fetches_when_client_disconnects(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        slow, fast = "https://example.com/slow", "https://example.com/fast"
+        state = _setup(tmp_path, monkeypatch, {slow: 5.0, fast: 0.0})
+
+        from app.main import app
+
+        body = json.dumps(_batch_body([slow, fast])).encode("utf-8")
+        first_line = asyncio.Event()
+        sent = []
+
+        async def _receive():
+            if not sent:
+                sent.append(True)
+                return {"type": "http.request", "body": body, "more_body": False}
+            await first_line.wait()
+            return {"type": "http.disconnect"}
+
+        async def _send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_line.set()
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/tools/web.fetch:batch",
+            "raw_path": b"/tools/web.fetch:batch",
+            "query_string": b"stream=true",
+            "headers": [(b"host", b"testserver"), (b"content-type", b"application/json")],
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        started = asyncio.get_running_loop().time()
+        await asyncio.wait_for(app(scope, _receive, _send), timeout=3)
+        await asyncio.sleep(0)
+        assert asyncio.get_running_loop().time() - started < 1.0
+        assert state["in_flight"] == 0
+
+    asyncio.run(_run())
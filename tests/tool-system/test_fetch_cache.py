@@ -0,0 +1,239 @@
+import asyncio
+import json
+import os
+
+import httpx
+
+
+def _read_events(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def _fetch_body(url: str) -> dict:
+    return {"agent_id": "cache-agent", "purpose": "cache test", "inputs": {"url": url}}
+
+
+def test_canonical_url_normalizes_cache_keys() -> None:
+    from app.core.cache import canonical_url
+
+    assert canonical_url("HTTPS://Example.COM:443/a?b=2&a=1#frag") == "https://example.com/a?a=1&b=2"
+    assert canonical_url("http://example.com") == "http://example.com/"
+    assert canonical_url("http://example.com:8080/x") == "http://example.com:8080/x"
+
+
+def test_fresh_entry_is_served_without_upstream_call(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        os.environ["AUDIT_LOG_PATH"] = str(audit_path)
+        os.environ["WEB_ALLOWLIST"] = "example.com"
+        os.environ["TOOL_BACKEND"] = "local"
+        monkeypatch.setenv("WEB_FETCH_CACHE_TTL_S", "60")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.cache import response_cache
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        response_cache.clear()
+        calls = []
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            calls.append(url)
+            return FetchResult(final_url=url, status_code=200, title="Cached", extracted_text="cache me")
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/page?b=1&a=2"))
+            second = await client.post("/tools/web.fetch", json=_fetch_body("https://EXAMPLE.com/page?a=2&b=1"))
+
+        assert len(calls) == 1
+        assert first.json()["source_meta"]["cache"] == "miss"
+        assert second.json()["source_meta"]["cache"] == "hit"
+        assert second.json()["data"]["extracted_text"] == "cache me"
+        assert second.json()["content_hash"] == first.json()["content_hash"]
+        assert response_cache.stats.hits == 1
+        assert response_cache.stats.misses == 1
+
+        results = [e for e in _read_events(audit_path) if e.get("event_type") == "tool.execution.result"]
+        assert [e["cache"] for e in results] == ["miss", "hit"]
+        response_cache.clear()
+
+    asyncio.run(_run())
+
+
+def test_stale_entry_revalidates_with_conditional_request(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        os.environ["AUDIT_LOG_PATH"] = str(tmp_path / "audit.jsonl")
+        os.environ["WEB_ALLOWLIST"] = "example.com"
+        os.environ["TOOL_BACKEND"] = "local"
+        monkeypatch.setenv("WEB_FETCH_CACHE_TTL_S", "60")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.cache import canonical_url, response_cache
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        response_cache.clear()
+        seen_headers = []
+
+        async def _fake_fetch_url(url, timeout_ms, max_bytes, user_agent, extra_headers=None) -> FetchResult:
+            seen_headers.append(extra_headers)
+            if extra_headers and extra_headers.get("If-None-Match") == '"v1"':
+                return FetchResult(final_url=url, status_code=304, title="", extracted_text="", etag='"v1"', not_modified=True)
+            return FetchResult(final_url=url, status_code=200, title="T", extracted_text="body v1", etag='"v1"')
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/news"))
+            response_cache._entries[canonical_url("https://example.com/news")].expires_at = 0  # noqa: SLF001
+            second = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/news"))
+
+        assert seen_headers == [None, {"If-None-Match": '"v1"'}]
+        assert second.json()["source_meta"]["cache"] == "revalidated"
+        assert second.json()["data"]["extracted_text"] == "body v1"
+        assert second.json()["content_hash"] == first.json()["content_hash"]
+        assert response_cache._entries[canonical_url("https://example.com/news")].is_fresh()  # noqa: SLF001
+        response_cache.clear()
+
+    asyncio.run(_run())
+
+
+def test_cache_evicts_by_bytes_and_persists_to_sqlite_tier(tmp_path) -> None:
+    async def _run() -> None:
+        from app.core.cache import CacheEntry, ResponseCache
+
+        db_path = str(tmp_path / "cache.sqlite3")
+        cache = ResponseCache()
+        for idx in range(4):
+            entry = CacheEntry(key=f"k{idx}", content={"n": idx}, size=400, expires_at=1e12)
+            await cache.put(entry, max_bytes=1000, sqlite_path=db_path)
+
+        assert cache.stats.evictions == 2
+        assert cache.stats.bytes == 800
+        assert await cache.get("k0") is None
+
+        restarted = ResponseCache()
+        persisted = await restarted.get("k3", sqlite_path=db_path, max_bytes=1000)
+        assert persisted is not None
+        assert persisted.content == {"n": 3}
+        assert await restarted.get("k0", sqlite_path=db_path) is None
+        # The disk hit was promoted, so the next lookup is served from memory.
+        assert (restarted.stats.entries, restarted.stats.bytes) == (1, 400)
+        assert await restarted.get("k3") is persisted
+        cache.clear()
+        restarted.clear()
+
+    asyncio.run(_run())
+
+
+def test_unopenable_sqlite_tier_falls_back_to_memory(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(audit_path))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("WEB_FETCH_CACHE_TTL_S", "60")
+        monkeypatch.setenv("WEB_FETCH_CACHE_SQLITE_PATH", str(tmp_path / "missing" / "cache.db"))
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.cache import response_cache
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        response_cache.clear()
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(final_url=url, status_code=200, title="T", extracted_text="memory only")
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/disk"))
+            second = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/disk"))
+
+        assert (first.status_code, second.status_code) == (200, 200)
+        assert [r.json()["source_meta"]["cache"] for r in (first, second)] == ["miss", "hit"]
+        assert response_cache.stats.disk_errors >= 2
+        results = [e for e in _read_events(audit_path) if e.get("event_type") == "tool.execution.result"]
+        assert len(results) == 2
+        response_cache.clear()
+
+    asyncio.run(_run())
+
+
+def test_failing_sqlite_put_still_returns_the_fetch(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        import sqlite3
+
+        from app.core import cache as cache_mod
+
+        def _disk_full(self, entry) -> None:
+            raise sqlite3.OperationalError("database or disk is full")
+
+        monkeypatch.setattr(cache_mod._SQLiteTier, "put", _disk_full)  # noqa: SLF001
+        cache = cache_mod.ResponseCache()
+        entry = cache_mod.CacheEntry(key="k", content={"n": 1}, size=10, expires_at=1e12)
+        assert await cache.put(entry, max_bytes=1000, sqlite_path=str(tmp_path / "cache.db")) == 0
+        assert cache.stats.disk_errors == 1
+        assert await cache.get("k") is entry
+        cache.clear()
+
+    asyncio.run(_run())
+
+
+def test_non_integer_n8n_status_passes_through_uncached(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "n8n")
+        monkeypatch.setenv("WEB_FETCH_CACHE_TTL_S", "60")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.cache import response_cache, validator_store
+        from app.core.http import JsonResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        response_cache.clear()
+        validator_store.clear()
+
+        async def _fake_post_json(
+            url: str, payload, timeout_ms: int, headers=None, max_response_bytes=None, endpoints=None
+        ):
+            data = {"url": payload["url"], "status": "OK", "title": "N", "extracted_text": "n8n text"}
+            return JsonResult(data=data, bytes_read=64)
+
+        monkeypatch.setattr(tools_mod, "post_json", _fake_post_json)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/ok"))
+            second = await client.post("/tools/web.fetch", json=_fetch_body("https://example.com/ok"))
+
+        assert (first.status_code, second.status_code) == (200, 200)
+        assert first.json()["data"]["status"] == "OK"
+        assert second.json()["source_meta"]["cache"] == "miss"
+        assert validator_store.stats.entries == 0
+        response_cache.clear()
+
+    asyncio.run(_run())
@@ -0,0 +1,35 @@
+from app.core.extract import TextExtractor, extract
+
+PAGE = (
+    "<!doctype html><html><head><title>\n  Example   Title </title>"
+    "<style>body { color: red; }</style>"
+    "<script type='text/javascript'>var s = '<p>not text</p>';</script>"
+    "</head><body><!-- hidden --><h1>Heading</h1><p>Fish &amp; chips</p>"
+    "<p>a   b\n c</p><SCRIPT>ignored()</SCRIPT>1 < 2<br/>end</body></html>"
+)
+
+
+def test_extract_drops_script_style_and_collapses_whitespace() -> None:
+    title, text = extract(PAGE)
+    assert title == "Example Title"
+    assert text == "Example Title Heading Fish & chips a b c 1 < 2 end"
+
+
+def test_chunked_feed_matches_single_pass() -> None:
+    expected = extract(PAGE)
+    for size in (1, 3, 7, 64):
+        extractor = TextExtractor()
+        for start in range(0, len(PAGE), size):
+            extractor.feed(PAGE[start : start + size])
+        extractor.close()
+        assert (extractor.title, extractor.text) == expected
+
+
+def test_extractor_finishes_once_text_budget_is_spent() -> None:
+    extractor = TextExtractor(max_chars=100)
+    extractor.feed("<title>T</title><p>" + "word " * 100)
+    assert extractor.finished
+    assert extractor.title == "T"
+    assert len(extractor.text) == 100
+    extractor.feed("<p>more text that must be ignored</p>")
+    assert len(extractor.text) == 100
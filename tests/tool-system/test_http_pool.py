@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import httpx
+import pytest
+
+
+class _KeepAliveN8NHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", "0"))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        body = json.dumps(
+            {"query": payload.get("query", ""), "results": [], "searched_at": "2026-01-01T00:00:00Z"}
+        ).encode("utf-8")
+        self.server.ports.add(self.client_address[1])  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A003
+        return
+
+
+@pytest.fixture()
+def keepalive_n8n():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveN8NHandler)
+    server.ports = set()  # type: ignore[attr-defined]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        thread.join(timeout=1)
+
+
+def test_n8n_calls_reuse_pooled_connection_and_report_stats(keepalive_n8n, tmp_path) -> None:
+    async def _run() -> None:
+        host, port = keepalive_n8n.server_address
+        os.environ["AUDIT_LOG_PATH"] = str(tmp_path / "audit.jsonl")
+        os.environ["TOOL_BACKEND"] = "n8n"
+        os.environ["TOOL_SHARED_SECRET"] = ""
+        os.environ["N8N_WEB_SEARCH_URL"] = f"http://{host}:{port}/webhook/tools/web.search"
+
+        from app.core import policy
+
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            for idx in range(3):
+                resp = await client.post(
+                    "/tools/web.search",
+                    json={"agent_id": "pool", "purpose": "reuse", "request_id": f"p-{idx}", "inputs": {"query": "x"}},
+                )
+                assert resp.status_code == 200
+            health = await client.get("/health")
+
+        # All three upstream calls rode one keep-alive connection.
+        assert len(keepalive_n8n.ports) == 1
+        pools = health.json()["data"]["http_pools"]
+        assert pools["n8n"]["requests"] >= 3
+        assert pools["n8n"]["connections"] == 1
+
+    asyncio.run(_run())
+
+
+def test_registry_lifespan_opens_and_closes_clients() -> None:
+    async def _run() -> None:
+        from app.core.http import BACKEND_N8N, BACKEND_WEB, ClientRegistry
+
+        registry = ClientRegistry()
+        await registry.startup()
+        web = registry.get(BACKEND_WEB)
+        assert registry.get(BACKEND_WEB) is web
+        assert registry.get(BACKEND_N8N) is not web
+        assert set(registry.stats()) == {BACKEND_WEB, BACKEND_N8N}
+
+        await registry.aclose()
+        assert web.is_closed
+        assert registry.stats() == {}
+
+    asyncio.run(_run())
+
+
+def test_loop_change_closes_clients_of_a_running_loop_and_logs_dropped_ones(caplog) -> None:
+    from app.core.http import BACKEND_WEB, ClientRegistry
+
+    registry = ClientRegistry()
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+
+    async def _open() -> httpx.AsyncClient:
+        return registry.get(BACKEND_WEB)
+
+    async def _switch() -> httpx.AsyncClient:
+        return registry.get(BACKEND_WEB)
+
+    try:
+        first = asyncio.run_coroutine_threadsafe(_open(), other).result(timeout=5)
+        second = asyncio.run(_switch())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), other).result(timeout=5)
+        assert first.is_closed and second is not first
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(timeout=5)
+        other.close()
+
+    with caplog.at_level("WARNING", logger="app.core.http"):
+        third = asyncio.run(_switch())
+    assert third is not second
+    assert "Dropping 1 pooled HTTP client(s)" in caplog.text
+
+
+def test_http2_without_h2_logs_a_warning(monkeypatch, caplog) -> None:
+    from app.core import http as http_mod
+
+    monkeypatch.setenv("HTTP2_ENABLED", "true")
+    monkeypatch.setattr(http_mod, "_h2_available", lambda: False)
+    with caplog.at_level("WARNING", logger="app.core.http"):
+        asyncio.run(http_mod.ClientRegistry().startup())
+    assert "h2 package is not installed" in caplog.text
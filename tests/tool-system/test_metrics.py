@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+
+import httpx
+
+
+def test_histogram_buckets_are_cumulative_in_prometheus_text() -> None:
+    from app.core.metrics import PHASE_METRIC, MetricsRegistry
+
+    registry = MetricsRegistry()
+    for elapsed_ms in (0.2, 3.0, 3.0, 40.0, 20_000.0):
+        registry.observe_phase("web.fetch", "local", "upstream", elapsed_ms)
+
+    text = registry.render()
+    base = f'{PHASE_METRIC}_bucket{{tool="web.fetch",backend="local",phase="upstream"'
+    assert f'{base},le="0.0005"}} 1' in text
+    assert f'{base},le="0.005"}} 3' in text
+    assert f'{base},le="0.05"}} 4' in text
+    assert f'{base},le="10"}} 4' in text
+    assert f'{base},le="+Inf"}} 5' in text
+    assert f"# TYPE {PHASE_METRIC} histogram" in text
+
+
+def test_tool_calls_feed_metrics_endpoint(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        os.environ["AUDIT_LOG_PATH"] = str(tmp_path / "audit.jsonl")
+        os.environ["WEB_ALLOWLIST"] = "example.com"
+        os.environ["TOOL_BACKEND"] = "local"
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.http import FetchResult
+        from app.core.metrics import PHASE_METRIC, REQUEST_METRIC, metrics
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        metrics.reset()
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(
+                final_url=url,
+                status_code=200,
+                title="T",
+                extracted_text="hello",
+                phases={"upstream_ttfb": 12.0, "upstream_body": 3.0, "extraction": 0.5},
+            )
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            body = {"agent_id": "m", "purpose": "metrics", "inputs": {"url": "https://example.com/"}}
+            assert (await client.post("/tools/web.fetch", json=body)).status_code == 200
+            denied = {**body, "inputs": {"url": "https://blocked.test/"}}
+            assert (await client.post("/tools/web.fetch", json=denied)).status_code == 403
+            resp = await client.get("/metrics")
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = resp.text
+        assert f'{REQUEST_METRIC}_count{{tool="web.fetch",backend="local",outcome="ok"}} 1' in text
+        assert f'{REQUEST_METRIC}_count{{tool="web.fetch",backend="local",outcome="POLICY_DENIED"}} 1' in text
+        for phase in ("validation", "rate_limit", "allowlist", "upstream", "upstream_ttfb", "extraction", "serialization"):
+            assert f'{PHASE_METRIC}_count{{tool="web.fetch",backend="local",phase="{phase}"}}' in text
+        ttfb = metrics.histogram(PHASE_METRIC, tool="web.fetch", backend="local", phase="upstream_ttfb")
+        assert ttfb is not None and ttfb.sum == 0.012
+        metrics.reset()
+
+    asyncio.run(_run())
+
+
+def test_timings_ms_carry_the_same_phase_keys_for_both_backends(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        os.environ["AUDIT_LOG_PATH"] = str(audit_path)
+        os.environ["WEB_ALLOWLIST"] = "example.com"
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.http import FetchResult, JsonResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(
+                final_url=url,
+                status_code=200,
+                title="T",
+                extracted_text="local text",
+                phases={"upstream_connect": 2.0, "upstream_ttfb": 5.0, "upstream_body": 1.0, "extraction": 0.25},
+            )
+
+        async def _fake_post_json(
+            url: str, payload, timeout_ms: int, headers=None, max_response_bytes=None, endpoints=None
+        ):
+            data = {"url": payload["url"], "status": 200, "title": "N", "extracted_text": "n8n text"}
+            return JsonResult(data=data, bytes_read=64, phases={"upstream_ttfb": 7.0, "upstream_body": 0.5})
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+        monkeypatch.setattr(tools_mod, "post_json", _fake_post_json)
+
+        from app.main import app
+
+        body = {"agent_id": "t", "purpose": "timings", "inputs": {"url": "https://example.com/"}}
+        transport = httpx.ASGITransport(app=app)
+        timings = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            for backend in ("local", "n8n"):
+                monkeypatch.setenv("TOOL_BACKEND", backend)
+                resp = await client.post("/tools/web.fetch", json=body)
+                assert resp.status_code == 200
+                timings[backend] = resp.json()["timings_ms"]
+            denied = await client.post("/tools/web.fetch", json={**body, "inputs": {"url": "https://blocked.test/"}})
+
+        assert set(timings["local"]) == set(timings["n8n"]) == {"total", "fetch", *tools_mod.PHASE_KEYS}
+        assert timings["local"]["upstream_connect"] == 2.0
+        assert timings["local"]["extraction"] == 0.25
+        assert timings["n8n"]["upstream_ttfb"] == 7.0
+        assert timings["n8n"]["upstream_connect"] == 0.0
+        assert timings["local"]["hashing"] > 0 and timings["n8n"]["hashing"] > 0
+        assert timings["local"]["fetch"] == timings["local"]["upstream"]
+        assert set(denied.json()["timings_ms"]) == set(timings["local"])
+
+        events = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+        results = [e for e in events if e.get("event_type") == "tool.execution.result"]
+        assert [e["timings_ms"] for e in results] == [timings["local"], timings["n8n"]]
+        failure = [e for e in events if e.get("event_type") == "tool.execution.failure"][-1]
+        assert failure["timings_ms"] == denied.json()["timings_ms"]
+
+    asyncio.run(_run())
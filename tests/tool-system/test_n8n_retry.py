@@ -0,0 +1,180 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+
+def _mock_n8n(monkeypatch, handler) -> None:
+    from app.core import http as http_mod
+
+    http_mod.breakers.clear()
+    http_mod.retry_budget.reset()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
+
+
+def test_transient_502_is_retried_and_attempts_reported(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        monkeypatch.setenv("N8N_RETRY_BACKOFF_MS", "0")
+        statuses = [502, 200]
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            status = statuses.pop(0)
+            return httpx.Response(status, json={"ok": status == 200})
+
+        _mock_n8n(monkeypatch, _handler)
+        result = await http_mod.post_json("http://n8n:5678/webhook", {}, 1000)
+        assert result.data == {"ok": True}
+        assert result.attempts == 2
+        assert result.hedged is False
+        assert http_mod.retry_budget.retries == 1
+
+    asyncio.run(_run())
+
+
+def test_non_idempotent_calls_and_client_errors_are_not_retried(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        monkeypatch.setenv("N8N_RETRY_BACKOFF_MS", "0")
+        state = {"calls": 0, "status": 502}
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            state["calls"] += 1
+            return httpx.Response(state["status"], json={})
+
+        _mock_n8n(monkeypatch, _handler)
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await http_mod.post_json("http://n8n:5678/webhook", {}, 1000, idempotent=False)
+        assert excinfo.value.attempts == 1
+        assert state["calls"] == 1
+
+        state["status"] = 400
+        with pytest.raises(httpx.HTTPStatusError):
+            await http_mod.post_json("http://n8n:5678/webhook", {}, 1000)
+        assert state["calls"] == 2
+
+    asyncio.run(_run())
+
+
+def test_exhausted_retry_budget_stops_retries(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        monkeypatch.setenv("N8N_RETRY_BACKOFF_MS", "0")
+        monkeypatch.setenv("N8N_RETRY_BUDGET_PERCENT", "0")
+        state = {"calls": 0}
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            state["calls"] += 1
+            return httpx.Response(503, json={})
+
+        _mock_n8n(monkeypatch, _handler)
+        http_mod.retry_budget.tokens = 1.0
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await http_mod.post_json("http://n8n:5678/webhook", {}, 1000)
+        assert excinfo.value.attempts == 2  # one retry, then the budget is empty
+        assert http_mod.retry_budget.exhausted == 1
+
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await http_mod.post_json("http://n8n:5678/webhook", {}, 1000)
+        assert excinfo.value.attempts == 1
+        assert state["calls"] == 3
+
+    asyncio.run(_run())
+
+
+def test_slow_request_is_hedged_after_p95(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        monkeypatch.setenv("N8N_HEDGE_ENABLED", "true")
+        state = {"calls": 0}
+
+        async def _handler(request: httpx.Request) -> httpx.Response:
+            state["calls"] += 1
+            if state["calls"] == 1:
+                await asyncio.sleep(1.0)
+                return httpx.Response(200, json={"which": "first"})
+            return httpx.Response(200, json={"which": "hedge"})
+
+        _mock_n8n(monkeypatch, _handler)
+        breaker = http_mod.breakers.get("n8n:n8n")
+        for _ in range(30):
+            breaker.record_success(10.0)
+
+        started = asyncio.get_running_loop().time()
+        result = await http_mod.post_json("http://n8n:5678/webhook", {}, 5000)
+        assert asyncio.get_running_loop().time() - started < 0.5
+        assert result.data == {"which": "hedge"}
+        assert result.attempts == 2
+        assert result.hedged is True
+        http_mod.breakers.clear()
+
+    asyncio.run(_run())
+
+
+def test_search_envelope_and_audit_report_attempts(monkeypatch, tmp_path) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(audit_path))
+        monkeypatch.setenv("TOOL_BACKEND", "n8n")
+        monkeypatch.setenv("N8N_RETRY_BACKOFF_MS", "0")
+
+        from app.core import policy
+
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        statuses = [504, 200]
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            status = statuses.pop(0)
+            return httpx.Response(status, json={"query": "q", "results": []})
+
+        _mock_n8n(monkeypatch, _handler)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            resp = await client.post(
+                "/tools/web.search",
+                json={"agent_id": "retry", "purpose": "retry", "inputs": {"query": "q"}},
+            )
+
+        body = resp.json()
+        assert resp.status_code == 200, body
+        assert body["source_meta"]["attempts"] == 2
+        assert body["source_meta"]["hedged"] is False
+        event = json.loads(audit_path.read_text(encoding="utf-8").splitlines()[-1])
+        assert event["attempts"] == 2
+
+    asyncio.run(_run())
+
+
+def test_retry_moves_to_another_endpoint(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+        from app.core.backends import EndpointPool
+
+        monkeypatch.setenv("N8N_RETRY_BACKOFF_MS", "0")
+        hosts = []
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            hosts.append(request.url.host)
+            status = 503 if request.url.host == "n8n-a" else 200
+            return httpx.Response(status, json={"host": request.url.host})
+
+        _mock_n8n(monkeypatch, _handler)
+        pool = EndpointPool([("http://n8n-a:5678/webhook", 1.0), ("http://n8n-b:5678/webhook", 1.0)])
+        result = await http_mod.post_json(
+            "http://n8n-a:5678/webhook", {}, 1000, endpoints=pool.selection("weighted")
+        )
+        assert hosts == ["n8n-a", "n8n-b"]
+        assert result.data == {"host": "n8n-b"}
+        assert result.endpoint == "n8n-b:5678"
+        assert [endpoint.inflight for endpoint in pool.endpoints] == [0, 0]
+
+    asyncio.run(_run())
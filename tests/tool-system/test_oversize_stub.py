@@ -1,35 +1,34 @@
 import asyncio
 
 import httpx
+import pytest
 
 
-class _FakeResponse:
-    def __init__(self, *, url: str, status_code: int, content: bytes) -> None:
-        self.url = httpx.URL(url)
-        self.status_code = status_code
-        self.content = content
+def _streaming_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
 
 
-class _FakeAsyncClient:
-    def __init__(self, *args, **kwargs) -> None:
-        pass
+class _CountingStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+        self.served = 0
 
-    async def __aenter__(self):
-        return self
-
-    async def __aexit__(self, exc_type, exc, tb):
-        return False
-
-    async def get(self, url: str):
-        big = (b"<title>Big</title>" + (b"A" * 10_000))
-        return _FakeResponse(url=url, status_code=200, content=big)
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.served += 1
+            yield chunk
 
 
 def test_oversize_content_handling_truncates_to_max_bytes(monkeypatch) -> None:
     async def _run() -> None:
         from app.core import http as http_mod
 
-        monkeypatch.setattr(http_mod.httpx, "AsyncClient", _FakeAsyncClient)
+        def _handler(request: httpx.Request) -> httpx.Response:
+            big = b"<title>Big</title>" + (b"A" * 10_000)
+            return httpx.Response(200, content=big)
+
+        client = _streaming_client(_handler)
+        monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
 
         result = await http_mod.fetch_url(
             "https://example.com",
@@ -41,5 +40,87 @@ def test_oversize_content_handling_truncates_to_max_bytes(monkeypatch) -> None:
         assert result.title == "Big"
         assert len(result.extracted_text) > 0
         assert len(result.extracted_text) < 5000
+        assert result.bytes_read == 50
+        assert result.truncated is True
+
+    asyncio.run(_run())
+
+
+def test_fetch_stops_reading_stream_at_byte_cap(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        stream = _CountingStream([b"<title>Chunked</title>"] + [b"B" * 1024] * 1000)
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, stream=stream)
+
+        client = _streaming_client(_handler)
+        monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
+
+        result = await http_mod.fetch_url("https://example.com", timeout_ms=1000, max_bytes=4096, user_agent="t")
+
+        assert result.title == "Chunked"
+        assert result.bytes_read == 4096
+        assert result.truncated is True
+        assert stream.served < 10
+
+    asyncio.run(_run())
+
+
+def test_post_json_rejects_oversized_content_length_before_reading(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        stream = _CountingStream([b"{}"])
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, headers={"Content-Length": "999999"}, stream=stream)
+
+        client = _streaming_client(_handler)
+        monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
+
+        with pytest.raises(ValueError):
+            await http_mod.post_json("http://n8n/webhook", {}, 1000, max_response_bytes=1000)
+        assert stream.served == 0
+
+    asyncio.run(_run())
+
+
+def test_post_json_rejects_streamed_body_over_cap_and_reports_bytes_read(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/big"):
+                return httpx.Response(200, stream=_CountingStream([b'{"a":"', b"A" * 5000, b'"}']))
+            return httpx.Response(200, json={"ok": True})
+
+        client = _streaming_client(_handler)
+        monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
+
+        with pytest.raises(ValueError):
+            await http_mod.post_json("http://n8n/big", {}, 1000, max_response_bytes=1000)
+
+        result = await http_mod.post_json("http://n8n/small", {}, 1000, max_response_bytes=1000)
+        assert result.data == {"ok": True}
+        assert result.bytes_read == len(b'{"ok":true}')
+
+    asyncio.run(_run())
+
+
+def test_post_json_error_status_keeps_body_for_details(monkeypatch) -> None:
+    async def _run() -> None:
+        from app.core import http as http_mod
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(401, json={"code": "UNAUTHORIZED"})
+
+        client = _streaming_client(_handler)
+        monkeypatch.setattr(http_mod.client_registry, "get", lambda backend: client)
+
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await http_mod.post_json("http://n8n/webhook", {}, 1000, max_response_bytes=1000)
+        assert excinfo.value.response.json() == {"code": "UNAUTHORIZED"}
 
     asyncio.run(_run())
@@ -0,0 +1,179 @@
+import asyncio
+import os
+
+import httpx
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_gcra_allows_burst_then_refills_at_steady_rate(monkeypatch) -> None:
+    from app.core import policy
+
+    clock = _Clock()
+    monkeypatch.setattr(policy.time, "monotonic", clock)
+    limiter = policy.RateLimiter()
+
+    assert all(limiter.allow("t", 60) for _ in range(60))
+    denied = limiter.acquire([("tool", "t", 60)])
+    assert not denied.allowed
+    assert denied.retry_after_s == 1.0
+
+    clock.now += 1.0
+    assert limiter.allow("t", 60)
+    assert not limiter.allow("t", 60)
+    assert len(limiter._events) == 1  # noqa: SLF001
+
+
+def test_composite_keys_are_checked_atomically(monkeypatch) -> None:
+    from app.core import policy
+
+    monkeypatch.setattr(policy.time, "monotonic", _Clock())
+    limiter = policy.RateLimiter()
+    keys_a = [("tool", "web.fetch", 10), ("agent", "agent:web.fetch:a", 2)]
+    keys_b = [("tool", "web.fetch", 10), ("agent", "agent:web.fetch:b", 2)]
+
+    assert limiter.acquire(keys_a).allowed
+    assert limiter.acquire(keys_a).allowed
+    denied = limiter.acquire(keys_a)
+    assert not denied.allowed
+    assert denied.key_class == "agent"
+
+    # The denied call did not spend a tool-level token: 8 remain for other agents.
+    assert all(limiter.acquire(keys_b).allowed for _ in range(2))
+    others = [("tool", "web.fetch", 10), ("agent", "agent:web.fetch:c", 100)]
+    assert sum(limiter.acquire(others).allowed for _ in range(10)) == 6
+
+
+def test_idle_keys_are_pruned(monkeypatch) -> None:
+    from app.core import policy
+
+    clock = _Clock()
+    monkeypatch.setattr(policy.time, "monotonic", clock)
+    limiter = policy.RateLimiter()
+    for idx in range(limiter._PRUNE_MIN_KEYS):  # noqa: SLF001
+        limiter.allow(f"k{idx}", 600)
+    clock.now += 1.0
+    limiter.allow("fresh-a", 600)
+    limiter.allow("fresh-b", 600)
+    assert set(limiter._events) == {"fresh-a", "fresh-b"}  # noqa: SLF001
+
+
+def test_domain_limit_returns_429_with_retry_after(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        os.environ["AUDIT_LOG_PATH"] = str(tmp_path / "audit.jsonl")
+        os.environ["WEB_ALLOWLIST"] = "example.com"
+        os.environ["TOOL_BACKEND"] = "local"
+        monkeypatch.setenv("DOMAIN_RATE_LIMIT_PER_MINUTE", "1")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(final_url=url, status_code=200, title="t", extracted_text="x")
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        body = {"agent_id": "a", "purpose": "p", "inputs": {"url": "https://example.com/one"}}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/tools/web.fetch", json=body)
+            second = await client.post("/tools/web.fetch", json=body)
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert second.headers["Retry-After"] == "60"
+        details = second.json()["error"]["details"]
+        assert details["key_class"] == "domain"
+        assert details["limit_per_minute"] == 1
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+    asyncio.run(_run())
+
+
+def _hammer_sqlite_limiter(path: str, calls: int) -> int:
+    from app.core.policy import SQLiteRateLimiter
+
+    limiter = SQLiteRateLimiter(path)
+    try:
+        return sum(limiter.allow("web.fetch", 60) for _ in range(calls))
+    finally:
+        limiter.close()
+
+
+def test_sqlite_limiter_enforces_one_budget_across_processes(tmp_path) -> None:
+    import multiprocessing
+
+    path = str(tmp_path / "ratelimit.sqlite3")
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(4) as pool:
+        allowed = pool.starmap(_hammer_sqlite_limiter, [(path, 40)] * 4)
+
+    # 160 attempts from 4 workers against a 60/min budget: exactly 60 pass.
+    assert sum(allowed) == 60
+
+
+def test_sqlite_backend_is_selected_by_env(tmp_path, monkeypatch) -> None:
+    from app.core import policy
+
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "sqlite")
+    monkeypatch.setenv("RATE_LIMIT_SQLITE_PATH", str(tmp_path / "rl.sqlite3"))
+    limiter = policy.get_rate_limiter()
+    try:
+        assert isinstance(limiter, policy.SQLiteRateLimiter)
+        assert policy.get_rate_limiter() is limiter
+        assert limiter.acquire([("tool", "web.search", 1)]).allowed
+        denied = limiter.acquire([("tool", "web.search", 1)])
+        assert not denied.allowed and denied.retry_after_s > 59
+    finally:
+        limiter.close()
+        policy._sqlite_rate_limiter = None  # noqa: SLF001
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "memory")
+    assert policy.get_rate_limiter() is policy.rate_limiter
+
+
+def test_unopenable_sqlite_limiter_degrades_to_per_worker_limits(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("RATE_LIMIT_BACKEND", "sqlite")
+        monkeypatch.setenv("RATE_LIMIT_SQLITE_PATH", str(tmp_path / "missing" / "rl.sqlite3"))
+        monkeypatch.setenv("DOMAIN_RATE_LIMIT_PER_MINUTE", "1")
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(final_url=url, status_code=200, title="t", extracted_text="x")
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        body = {"agent_id": "a", "purpose": "p", "inputs": {"url": "https://example.com/one"}}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            first = await client.post("/tools/web.fetch", json=body)
+            second = await client.post("/tools/web.fetch", json=body)
+
+        assert (first.status_code, second.status_code) == (200, 429)
+        assert policy._sqlite_rate_limiter is None  # noqa: SLF001
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+    asyncio.run(_run())
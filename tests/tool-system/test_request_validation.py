@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+import httpx
+
+
+def test_requests_are_validated_from_raw_bytes(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(audit_path))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+
+        from app.core import policy
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+        from app.main import app
+
+        headers = {"Content-Type": "application/json"}
+        # Pretty-printed on purpose: bytes_in is the body as sent, not a re-dump.
+        denied_body = json.dumps(
+            {"agent_id": "v", "purpose": "raw", "request_id": "r-1", "inputs": {"url": "https://other.test/"}},
+            indent=2,
+        ).encode("utf-8")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            broken = await client.post("/tools/web.fetch", content=b'{"agent_id": "v",', headers=headers)
+            not_object = await client.post("/tools/web.search", content=b"[1, 2]", headers=headers)
+            batch = await client.post(
+                "/tools/web.fetch:batch",
+                content=b'{"agent_id": "v", "request_id": "b-1", "purpose": "raw", "inputs": {"items": []}}',
+                headers=headers,
+            )
+            denied = await client.post("/tools/web.fetch", content=denied_body, headers=headers)
+
+        assert broken.status_code == 400
+        errors = broken.json()["error"]["details"]["errors"]
+        assert errors[0]["type"] == "json_invalid"
+        assert "input" not in errors[0]
+        assert not_object.status_code == 400
+        assert not_object.json()["error"]["code"] == "BAD_REQUEST"
+        assert batch.status_code == 400
+        assert denied.status_code == 403
+
+        events = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+        failures = [e for e in events if e.get("event_type") == "tool.execution.failure"]
+        assert [e["bytes_in"] for e in failures[:2]] == [len(b'{"agent_id": "v",'), len(b"[1, 2]")]
+        assert (failures[2]["requester"], failures[2]["correlation_id"]) == ("v", "b-1")
+        assert failures[3]["reason_code"] == "POLICY_DENIED"
+        assert failures[3]["bytes_in"] == len(denied_body)
+
+    asyncio.run(_run())
@@ -122,3 +122,43 @@ def test_schema_validation_rejects_missing_correlation_context() -> None:
 
     with pytest.raises(jsonschema.ValidationError):
         _validator(req_schema).validate(invalid_req)
+
+
+def test_schema_validation_web_fetch_batch_request_and_response() -> None:
+    req_schema = _load_schema("web.fetch.batch.request.schema.json")
+    resp_schema = _load_schema("web.fetch.batch.response.schema.json")
+
+    req = {
+        "agent_id": "demo-agent",
+        "purpose": "schema validation",
+        "context": {"correlation_id": "corr-3"},
+        "inputs": {"items": [{"url": "https://example.com/a"}, {"url": "https://example.com/b"}]},
+    }
+    item_envelope = {
+        "ok": True,
+        "data": {
+            "url": "https://example.com/a",
+            "final_url": "https://example.com/a",
+            "status": 200,
+            "title": "A",
+            "extracted_text": "a",
+            "fetched_at": "2026-01-01T00:00:00Z",
+        },
+        "error": None,
+        "source_meta": {"tool": "web.fetch", "backend": "local", "cache": "bypass", "coalesced": False},
+        "timings_ms": {"total": 1.0},
+        "content_hash": None,
+    }
+    ok_resp = {
+        "ok": True,
+        "data": {"items": [{"index": 0, "http_status": 200, "envelope": item_envelope}]},
+        "error": None,
+        "source_meta": {"tool": "web.fetch:batch", "backend": "local", "items": 1, "succeeded": 1, "failed": 0},
+        "timings_ms": {"total": 2.0},
+        "content_hash": None,
+    }
+
+    _validator(req_schema).validate(req)
+    _validator(resp_schema).validate(ok_resp)
+    with pytest.raises(jsonschema.ValidationError):
+        _validator(req_schema).validate({**req, "inputs": {}})
@@ -0,0 +1,59 @@
+import json
+import time
+
+import pytest
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_encode_envelope_matches_model_dump_and_reports_serialization(monkeypatch, use_orjson) -> None:
+    from app.api import tools
+    from app.core import serialize
+    from app.core.schemas import Envelope, ErrorObject
+
+    if not use_orjson:
+        monkeypatch.setattr(serialize, "orjson", None)
+    elif serialize.orjson is None:
+        pytest.skip("orjson not installed")
+
+    envelope = Envelope(
+        ok=False,
+        data={"text": "café ☃", "n": [1, 2.5, None]},
+        error=ErrorObject(code="X", message="m"),
+        source_meta={"tool": "web.fetch", "backend": "local"},
+        timings_ms={"total": 1.0},
+        content_hash=None,
+    )
+    phases = tools._Phases("web.fetch", "local")  # noqa: SLF001
+    content, body = tools._encode_envelope(envelope, phases, time.perf_counter() - 0.0035)  # noqa: SLF001
+
+    decoded = json.loads(body)
+    assert decoded == content
+    assert decoded == {**envelope.model_dump(), "timings_ms": content["timings_ms"]}
+    assert decoded["timings_ms"]["serialization"] > 0
+    # `total` is taken after encoding, so it covers the serialization span.
+    assert decoded["timings_ms"]["total"] >= 3.5 + decoded["timings_ms"]["serialization"] - 0.01
+    assert "café" in body.decode("utf-8")
+
+
+def test_append_raw_splices_fields() -> None:
+    from app.core.serialize import append_raw
+
+    assert json.loads(append_raw(b'{"a":1}', "b", b"[2]")) == {"a": 1, "b": [2]}
+    assert json.loads(append_raw(b"{}", "b", b"null")) == {"b": None}
+
+
+def test_dumps_falls_back_to_stdlib_for_values_orjson_rejects(monkeypatch) -> None:
+    import types
+
+    from app.core import serialize
+
+    def _orjson_dumps(obj):
+        raise TypeError("Integer exceeds 64-bit range")
+
+    monkeypatch.setattr(serialize, "orjson", types.SimpleNamespace(dumps=_orjson_dumps))
+    payload = {"results": [{"id": 123456789012345678901234567890}]}
+    assert json.loads(serialize.dumps(payload)) == payload
+
+    # And with whichever encoder is really installed.
+    monkeypatch.undo()
+    assert json.loads(serialize.dumps(payload)) == payload
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+
+def _read_events(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_concurrent_identical_fetches_share_one_upstream_call(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        os.environ["AUDIT_LOG_PATH"] = str(audit_path)
+        os.environ["WEB_ALLOWLIST"] = "example.com"
+        os.environ["TOOL_BACKEND"] = "local"
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        calls = []
+
+        async def _slow_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            calls.append(url)
+            await asyncio.sleep(0.05)
+            return FetchResult(final_url=url, status_code=200, title="Shared", extracted_text="shared body")
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _slow_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            responses = await asyncio.gather(
+                *[
+                    client.post(
+                        "/tools/web.fetch",
+                        json={
+                            "agent_id": f"agent-{idx}",
+                            "purpose": "fan-out",
+                            "request_id": f"sf-{idx}",
+                            "inputs": {"url": "https://example.com/burst"},
+                        },
+                    )
+                    for idx in range(5)
+                ]
+            )
+
+        assert len(calls) == 1
+        assert all(resp.status_code == 200 for resp in responses)
+        assert sorted(resp.json()["source_meta"]["coalesced"] for resp in responses) == [False] + [True] * 4
+
+        results = [e for e in _read_events(audit_path) if e.get("event_type") == "tool.execution.result"]
+        assert sorted(e["correlation_id"] for e in results) == [f"sf-{idx}" for idx in range(5)]
+        assert sum(1 for e in results if e["coalesced"]) == 4
+
+    asyncio.run(_run())
+
+
+def test_coalesced_failure_is_audited_for_every_caller(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        os.environ["AUDIT_LOG_PATH"] = str(audit_path)
+        os.environ["TOOL_BACKEND"] = "n8n"
+        os.environ["N8N_WEB_SEARCH_URL"] = "http://mock-n8n/webhook/tools/web.search"
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+        calls = []
+
+        async def _slow_timeout(url, payload, timeout_ms, headers=None, max_response_bytes=None, endpoints=None):
+            calls.append(payload["query"])
+            await asyncio.sleep(0.05)
+            raise httpx.TimeoutException("timed out")
+
+        monkeypatch.setattr(tools_mod, "post_json", _slow_timeout)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            responses = await asyncio.gather(
+                *[
+                    client.post(
+                        "/tools/web.search",
+                        json={"agent_id": "a", "purpose": "p", "request_id": f"st-{idx}", "inputs": {"query": " same   query "}},
+                    )
+                    for idx in range(3)
+                ]
+            )
+
+        assert calls == [" same   query "]
+        assert all(resp.status_code == 504 for resp in responses)
+        failures = [e for e in _read_events(audit_path) if e.get("reason_code") == "UPSTREAM_TIMEOUT"]
+        assert len(failures) == 3
+        assert sorted(e["coalesced"] for e in failures) == [False, True, True]
+
+    asyncio.run(_run())
+
+
+def test_cancelled_leader_does_not_cancel_followers() -> None:
+    async def _run() -> None:
+        from app.core.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def _call() -> str:
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(flights.do("k", _call))
+        await asyncio.sleep(0)
+        assert "k" in flights
+        follower = asyncio.ensure_future(flights.do("k", _call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        release.set()
+
+        assert await follower == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert len(flights) == 0
+
+    asyncio.run(_run())
+
+
+def test_shared_call_is_cancelled_when_every_caller_is() -> None:
+    async def _run() -> None:
+        from app.core.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def _call() -> str:
+            started.set()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "done"
+
+        callers = [asyncio.ensure_future(flights.do("k", _call)) for _ in range(2)]
+        await started.wait()
+        callers[0].cancel()
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+        callers[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert len(flights) == 0
+
+    asyncio.run(_run())
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import sqlite3
+import threading
+
+import httpx
+
+from app.core.recorder import ToolCallRecorder
+
+
+def _envelope(ok: bool = True, text: str = "body") -> bytes:
+    return json.dumps(
+        {
+            "ok": ok,
+            "data": {
+                "url": "https://example.com/",
+                "final_url": "https://example.com/",
+                "status": 200,
+                "title": "t",
+                "extracted_text": text,
+                "fetched_at": "2026-10-01T00:00:00+00:00",
+            },
+            "source_meta": {"tool": "web.fetch", "backend": "local", "cache": "bypass"},
+            "content_hash": "a" * 64,
+        }
+    ).encode("utf-8")
+
+
+def _count(db_path, table: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _recorder(dsn: str, spool_path, **overrides) -> ToolCallRecorder:
+    options = {"max_queue": 1000, "batch_rows": 50, "flush_interval_s": 10.0, "retry_interval_s": 0.0}
+    options.update(overrides)
+    return ToolCallRecorder(dsn, spool_path=str(spool_path), **options)
+
+
+def test_recorder_batches_rows_into_sqlite_stand_in(tmp_path) -> None:
+    db_path = tmp_path / "core.sqlite3"
+    recorder = _recorder(f"sqlite:///{db_path}", tmp_path / "spool.jsonl")
+    for idx in range(120):
+        recorder.submit("web.fetch", {"inputs": {"url": f"https://example.com/{idx}"}}, _envelope())
+    recorder.close()
+
+    stats = recorder.stats()
+    assert stats["tool_calls_written"] == stats["web_fetches_written"] == 120
+    # 50-row size threshold twice, then the remainder on shutdown.
+    assert stats["batches"] == 3
+    assert _count(db_path, "tool_calls") == _count(db_path, "web_fetches") == 120
+    with sqlite3.connect(db_path) as conn:
+        response = json.loads(conn.execute("SELECT response FROM tool_calls LIMIT 1").fetchone()[0])
+        text = conn.execute("SELECT extracted_text FROM web_fetches LIMIT 1").fetchone()[0]
+    assert "extracted_text" not in response["data"]
+    assert text == "body"
+
+
+def test_recorder_spools_while_database_is_down_and_replays(tmp_path) -> None:
+    db_dir = tmp_path / "not-yet"
+    db_path = db_dir / "core.sqlite3"
+    spool_path = tmp_path / "spool.jsonl"
+    recorder = _recorder(f"sqlite:///{db_path}", spool_path, batch_rows=5)
+    for _ in range(5):
+        recorder.submit("web.fetch", {}, _envelope())
+    recorder.submit("web.fetch", {}, _envelope(ok=False))
+    recorder.flush()
+
+    assert recorder.stats()["write_errors"] >= 1
+    assert recorder.stats()["spooled"] == 6
+    assert len(spool_path.read_text(encoding="utf-8").splitlines()) == 11
+
+    db_dir.mkdir()
+    assert recorder.replay_spool() == 6
+    # Replaying twice must not duplicate rows.
+    assert recorder.replay_spool() == 0
+    recorder.close()
+    assert _count(db_path, "tool_calls") == 6
+    assert _count(db_path, "web_fetches") == 5
+    assert not spool_path.exists() or spool_path.read_text(encoding="utf-8") == ""
+
+
+def test_full_queue_spools_instead_of_blocking(tmp_path) -> None:
+    spool_path = tmp_path / "spool.jsonl"
+    recorder = _recorder(f"sqlite:///{tmp_path / 'core.sqlite3'}", spool_path, max_queue=1)
+    accepted = [recorder.submit("web.search", {}, b'{"ok":true,"data":{}}') for _ in range(50)]
+    recorder.close()
+
+    stats = recorder.stats()
+    assert accepted.count(False) == stats["spooled"] > 0
+    assert stats["tool_calls_written"] == accepted.count(True)
+
+
+def test_full_queue_is_spooled_off_the_calling_thread(tmp_path, monkeypatch) -> None:
+    recorder = _recorder(f"sqlite:///{tmp_path / 'core.sqlite3'}", tmp_path / "spool.jsonl", max_queue=1)
+    spooling_threads = set()
+    spool = recorder._spool  # noqa: SLF001
+
+    def _tracking_spool(rows):
+        spooling_threads.add(threading.current_thread().name)
+        spool(rows)
+
+    monkeypatch.setattr(recorder, "_spool", _tracking_spool)
+    accepted = [recorder.submit("web.search", {}, b'{"ok":true,"data":{}}') for _ in range(50)]
+    recorder.flush()
+    recorder.close()
+
+    assert accepted.count(False) == recorder.stats()["spooled"] > 0
+    assert spooling_threads == {"tool-recorder"}
+
+
+def test_replay_quarantines_corrupt_spool_lines(tmp_path) -> None:
+    db_path = tmp_path / "core.sqlite3"
+    spool_path = tmp_path / "spool.jsonl"
+    recorder = _recorder(f"sqlite:///{db_path}", spool_path)
+    good = json.loads(_envelope())
+    row = ["00000000-0000-0000-0000-000000000001", None, "web.fetch", "{}", json.dumps(good), True, "2026-10-01"]
+    spool_path.write_text(
+        "\n".join(
+            [
+                json.dumps({"table": "tool_calls", "row": row}),
+                '{"table": "tool_calls", "row": [',
+                json.dumps({"table": "tool_calls", "row": ["short"]}),
+            ]
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+
+    assert recorder.replay_spool() == 1
+    assert recorder.replay_spool() == 0
+    recorder.close()
+    assert _count(db_path, "tool_calls") == 1
+    assert recorder.stats()["quarantined"] == 2
+    assert len((tmp_path / "spool.jsonl.corrupt").read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_gateway_records_tool_calls_when_dsn_is_set(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        db_path = tmp_path / "core.sqlite3"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(tmp_path / "audit.jsonl"))
+        monkeypatch.setenv("WEB_ALLOWLIST", "example.com")
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+        monkeypatch.setenv("TOOL_RECORD_DSN", f"sqlite:///{db_path}")
+        monkeypatch.setenv("TOOL_RECORD_SPOOL_PATH", str(tmp_path / "spool.jsonl"))
+
+        from app.api import tools as tools_mod
+        from app.core import policy, recorder
+        from app.core.http import FetchResult
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+        async def _fake_fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
+            return FetchResult(final_url=url, status_code=200, title="Page", extracted_text="recorded text")
+
+        monkeypatch.setattr(tools_mod, "fetch_url", _fake_fetch_url)
+
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                ok = await client.post(
+                    "/tools/web.fetch",
+                    json={"agent_id": "rec", "purpose": "persist", "inputs": {"url": "https://example.com/a"}},
+                )
+                denied = await client.post(
+                    "/tools/web.fetch",
+                    json={"agent_id": "rec", "purpose": "persist", "inputs": {"url": "https://blocked.test/"}},
+                )
+            recorder.flush_tool_recorder()
+        finally:
+            recorder.shutdown_tool_recorder()
+
+        assert ok.status_code == 200
+        assert denied.status_code == 403
+        with sqlite3.connect(db_path) as conn:
+            calls = conn.execute("SELECT tool, ok, request FROM tool_calls ORDER BY ok DESC").fetchall()
+            fetches = conn.execute("SELECT url, status_code, extracted_text FROM web_fetches").fetchall()
+        assert [(tool, bool(flag)) for tool, flag, _ in calls] == [("web.fetch", True), ("web.fetch", False)]
+        assert json.loads(calls[0][2])["agent_id"] == "rec"
+        assert fetches == [("https://example.com/a", 200, "recorded text")]
+
+    asyncio.run(_run())
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from typing import Any
+
+import httpx
+from pydantic import BaseModel
+
+
+class _EchoInputs(BaseModel):
+    text: str
+
+
+class _EchoRequest(BaseModel):
+    agent_id: str
+    purpose: str
+    request_id: str | None = None
+    inputs: _EchoInputs
+
+
+def test_registered_tool_runs_through_shared_pipeline(tmp_path, monkeypatch) -> None:
+    async def _run() -> None:
+        audit_path = tmp_path / "audit.jsonl"
+        monkeypatch.setenv("AUDIT_LOG_PATH", str(audit_path))
+        monkeypatch.setenv("TOOL_BACKEND", "local")
+
+        from fastapi import FastAPI
+
+        from app.api import tools as tools_mod
+        from app.core import policy
+        from app.core.registry import ToolSpec, tool_registry
+        from app.core.schemas import Envelope
+
+        policy.load_allowlist.cache_clear()
+        policy.rate_limiter._events.clear()  # noqa: SLF001
+
+        in_flight = 0
+        peak = 0
+
+        async def _echo(call: Any) -> Envelope:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return Envelope(
+                ok=True,
+                data={"text": call.req.inputs.text},
+                source_meta={"tool": "test.echo", "backend": call.backend},
+            )
+
+        tools_mod.register_tool(
+            ToolSpec(name="test.echo", request_model=_EchoRequest, executors={"local": _echo}, max_concurrency=1)
+        )
+        assert "test.echo" in tool_registry.names()
+
+        app = FastAPI()
+        app.include_router(tools_mod.router)
+        payload = {"agent_id": "reg", "purpose": "registry", "inputs": {"text": "hi"}}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            responses = await asyncio.gather(
+                *[
+                    client.post("/tools/test.echo", json={**payload, "request_id": f"e-{i}"})
+                    for i in range(3)
+                ]
+            )
+            invalid = await client.post("/tools/test.echo", json={"agent_id": "reg", "inputs": {}})
+
+        assert [r.status_code for r in responses] == [200, 200, 200]
+        body = responses[0].json()
+        assert body["data"] == {"text": "hi"}
+        assert body["source_meta"]["coalesced"] is False
+        assert "upstream" in body["timings_ms"]
+        assert peak == 1
+        assert invalid.status_code == 400
+        assert invalid.json()["error"]["code"] == "BAD_REQUEST"
+
+        events = [json.loads(line) for line in audit_path.read_text(encoding="utf-8").splitlines()]
+        results = [e for e in events if e.get("event_type") == "tool.execution.result"]
+        assert len(results) == 3
+        assert {e["tool_name"] for e in results} == {"test.echo"}
+        assert {e["correlation_id"] for e in results} == {"e-0", "e-1", "e-2"}
+
+    asyncio.run(_run())
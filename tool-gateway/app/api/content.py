@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, status
+from fastapi.responses import Response
+
+from app.core.content_store import content_store, is_content_hash
+from app.core.policy import get_content_store_dir
+from app.core.schemas import Envelope, ErrorObject
+from app.core.serialize import dumps, envelope_content, json_response
+
+router = APIRouter(prefix="/content")
+
+
+def _envelope_response(envelope: Envelope, status_code: int) -> Response:
+    return json_response(dumps(envelope_content(envelope)), status_code=status_code)
+
+
+@router.get("/{content_hash}")
+async def get_content(content_hash: str) -> Response:
+    """Resolve a `content_ref` from web.fetch to the stored extracted text."""
+    started = time.perf_counter()
+    store_dir = get_content_store_dir()
+    text = None
+    if store_dir and is_content_hash(content_hash):
+        text = await asyncio.to_thread(content_store.get, store_dir, content_hash)
+    elapsed = round((time.perf_counter() - started) * 1000, 2)
+    source_meta = {"tool": "content", "backend": "content_store"}
+    if text is None:
+        error = ErrorObject(code="NOT_FOUND", message="No stored content for this hash.", details=None)
+        if not store_dir:
+            error = ErrorObject(code="NOT_CONFIGURED", message="Content store is not configured.", details=None)
+        return _envelope_response(
+            Envelope(ok=False, data={}, error=error, source_meta=source_meta, timings_ms={"total": elapsed}),
+            status.HTTP_404_NOT_FOUND,
+        )
+    return _envelope_response(
+        Envelope(
+            ok=True,
+            data={"content_hash": content_hash, "extracted_text": text},
+            error=None,
+            source_meta=source_meta,
+            timings_ms={"total": elapsed},
+            content_hash=content_hash,
+        ),
+        status.HTTP_200_OK,
+    )
@@ -1,6 +1,14 @@
 from fastapi import APIRouter
 
+from app.core.audit import audit_sink_stats
+from app.core.backends import backend_registry
+from app.core.bulkhead import bulkheads
+from app.core.cache import response_cache, validator_store
+from app.core.content_store import content_store
+from app.core.dns import dns_cache
+from app.core.http import breakers, client_registry, retry_budget
 from app.core.policy import get_tool_backend
+from app.core.recorder import tool_recorder_stats
 from app.core.schemas import Envelope
 
 router = APIRouter()
@@ -10,7 +18,21 @@ router = APIRouter()
 async def health() -> Envelope:
     return Envelope(
         ok=True,
-        data={"status": "healthy", "service": "tool-gateway"},
+        data={
+            "status": "healthy",
+            "service": "tool-gateway",
+            "http_pools": client_registry.stats(),
+            "dns": dns_cache.as_dict(),
+            "backends": backend_registry.stats(),
+            "circuits": breakers.stats(),
+            "concurrency": bulkheads.stats(),
+            "retry_budget": retry_budget.stats(),
+            "fetch_cache": response_cache.stats.as_dict(),
+            "fetch_validators": validator_store.stats.as_dict(),
+            "content_store": content_store.stats.as_dict(),
+            "audit_sink": audit_sink_stats(),
+            "tool_recorder": tool_recorder_stats(),
+        },
         error=None,
         source_meta={"backend": get_tool_backend()},
         timings_ms={"total": 1.0},
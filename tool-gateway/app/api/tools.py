@@ -1,32 +1,79 @@
+import asyncio
 import json
 import hashlib
+import math
+import sqlite3
 import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Tuple, TypeVar
 from urllib.parse import urlparse
 
 import httpx
-from fastapi import APIRouter, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request, status
+from fastapi.responses import Response, StreamingResponse
 from pydantic import ValidationError
+from starlette.types import Receive, Scope, Send
 
 from app.core.audit import emit_tool_event
-from app.core.http import fetch_url, post_json
+from app.core.backends import BACKEND_LOCAL, backend_registry
+from app.core.bulkhead import ConcurrencyLimited, bulkheads
+from app.core.cache import (
+    CACHE_BYPASS,
+    CACHE_HIT,
+    CACHE_MISS,
+    CACHE_REVALIDATED,
+    CacheEntry,
+    Validators,
+    canonical_url,
+    response_cache,
+    validator_store,
+)
+from app.core.content_store import content_store
+from app.core.dns import AddressBlockedError
+from app.core.http import BACKEND_N8N, CircuitOpenError, JsonResult, fetch_url, post_json
+from app.core.metrics import metrics
 from app.core.policy import (
+    RateDecision,
+    concurrency_keys,
+    get_coalesce_enabled,
+    get_concurrency_queue_max,
+    get_content_store_dir,
+    get_fetch_batch_concurrency,
+    get_fetch_batch_max_items,
+    get_fetch_cache_max_bytes,
+    get_fetch_cache_sqlite_path,
+    get_fetch_cache_ttl_s,
+    get_fetch_validators_max_entries,
     get_max_bytes,
-    get_n8n_web_fetch_url,
-    get_n8n_web_search_url,
-    get_rate_limit_per_minute,
+    get_n8n_balance,
+    get_rate_limit_backend,
+    get_rate_limit_retry_after_enabled,
+    get_rate_limiter,
     get_timeout_ms,
-    get_tool_backend,
     get_tool_shared_secret,
     is_allowed_host,
+    rate_limit_keys,
     rate_limiter,
 )
-from app.core.schemas import Envelope, ErrorObject, WebFetchRequest, WebSearchRequest
+from app.core.recorder import record_tool_call
+from app.core.registry import CachePolicy, ToolSpec, tool_registry
+from app.core.serialize import append_raw, dumps, envelope_content, json_response
+from app.core.schemas import (
+    Envelope,
+    ErrorObject,
+    WebFetchBatchRequest,
+    WebFetchInputs,
+    WebFetchRequest,
+    WebSearchRequest,
+)
+from app.core.singleflight import fetch_key, search_key, singleflight
 
 router = APIRouter(prefix="/tools")
 
+T = TypeVar("T")
+
 
 def _sanitize_url_for_audit(url: str | None) -> str | None:
     if not url:
@@ -40,8 +87,85 @@ def _sanitize_url_for_audit(url: str | None) -> str | None:
     return f"{parsed.scheme}://{safe_netloc}{parsed.path or ''}"
 
 
-def _json_size_bytes(obj: Any) -> int:
-    return len(json.dumps(obj, separators=(",", ":"), ensure_ascii=True).encode("utf-8"))
+def _validation_errors(exc: ValidationError) -> List[Dict[str, Any]]:
+    # Invalid JSON reports the raw body bytes as its input; leave them out.
+    return [
+        {k: v for k, v in error.items() if not (k == "input" and isinstance(v, bytes))} for error in exc.errors()
+    ]
+
+
+def _peek_request_fields(body: bytes) -> Dict[str, Any]:
+    """Top-level fields of a body that failed validation, for its audit event."""
+    try:
+        doc = json.loads(body)
+    except ValueError:
+        return {}
+    return doc if isinstance(doc, dict) else {}
+
+
+# Keys reported in every envelope's timings_ms (besides `total`); 0.0 means the
+# phase did not run. Upstream connect includes DNS resolution.
+PHASE_KEYS = (
+    "validation",
+    "rate_limit",
+    "allowlist",
+    "cache",
+    "queue",
+    "upstream",
+    "upstream_connect",
+    "upstream_tls",
+    "upstream_ttfb",
+    "upstream_body",
+    "extraction",
+    "hashing",
+    "content_store",
+    "serialization",
+)
+
+
+class _Phases:
+    """
+    Per-call phase stopwatch.
+
+    Every completed span is observed into the phase latency histogram for the
+    call's tool and backend, and reported in the envelope's `timings_ms`.
+    """
+
+    def __init__(self, tool: str, backend: str) -> None:
+        self.tool = tool
+        self.backend = backend
+        self.ms: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        self.ms[name] = round(self.ms.get(name, 0.0) + elapsed_ms, 3)
+        metrics.observe_phase(self.tool, self.backend, name, elapsed_ms)
+
+    def add_upstream(self, phases: Dict[str, float]) -> None:
+        for name, elapsed_ms in phases.items():
+            self.add(name, elapsed_ms)
+
+    def timings(self, total_ms: float) -> Dict[str, float]:
+        timings = {"total": round(total_ms, 2)}
+        for name in PHASE_KEYS:
+            timings[name] = round(self.ms.get(name, 0.0), 3)
+        # `fetch` predates the phase breakdown; kept as an alias of `upstream`.
+        timings["fetch"] = timings["upstream"]
+        return timings
+
+
+def _content_hash(text: str, phases: _Phases) -> str | None:
+    if not text:
+        return None
+    with phases.span("hashing"):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
 def _envelope_error(
@@ -54,7 +178,11 @@ def _envelope_error(
     backend: str,
     timings: Dict[str, float],
     audit: Dict[str, Any] | None = None,
-) -> JSONResponse:
+    headers: Dict[str, str] | None = None,
+    phases: _Phases | None = None,
+) -> Response:
+    if phases is not None:
+        timings = phases.timings(timings.get("total", 0.0))
     payload = Envelope(
         ok=False,
         data={},
@@ -63,7 +191,9 @@ def _envelope_error(
         timings_ms=timings,
         content_hash=None,
     )
-    content = payload.model_dump()
+    content = envelope_content(payload)
+    body = dumps(content)
+    metrics.observe_request(tool, backend, code, float(timings.get("total", 0.0)))
     if audit is not None:
         emit_tool_event(
             {
@@ -72,17 +202,36 @@ def _envelope_error(
                 "event_phase": "result",
                 "http_status": http_code,
                 "duration_ms": float(timings.get("total", 0.0)),
-                "bytes_out": _json_size_bytes(content),
+                "bytes_out": len(body),
                 "error_code": code,
                 "failure_class": code,
+                "timings_ms": content["timings_ms"],
             }
         )
-    return JSONResponse(status_code=http_code, content=content)
+    return json_response(body, status_code=http_code, headers=headers)
+
 
+def _encode_envelope(envelope: Envelope, phases: _Phases, started: float) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Encode a result envelope exactly once.
 
-def _normalize_n8n_fetch_response(raw: Dict[str, Any], backend: str, elapsed_ms: float) -> Envelope:
+    `timings_ms` is appended after the rest of the body is encoded so it can
+    report the serialization span itself, and `total` (measured from the
+    `perf_counter()` value `started`) includes it. Returns the content dict
+    (with timings) and the response body.
+    """
+    content = envelope_content(envelope)
+    del content["timings_ms"]
+    with phases.span("serialization"):
+        body = dumps(content)
+    content["timings_ms"] = phases.timings((time.perf_counter() - started) * 1000)
+    return content, append_raw(body, "timings_ms", dumps(content["timings_ms"]))
+
+
+def _normalize_n8n_fetch_response(upstream: JsonResult, backend: str, elapsed_ms: float, phases: _Phases) -> Envelope:
+    raw = upstream.data
     text = str(raw.get("extracted_text", ""))
-    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest() if text else None
+    content_hash = _content_hash(text, phases)
     return Envelope(
         ok=True,
         data={
@@ -94,13 +243,22 @@ def _normalize_n8n_fetch_response(raw: Dict[str, Any], backend: str, elapsed_ms:
             "fetched_at": raw.get("fetched_at") or datetime.now(timezone.utc).isoformat(),
         },
         error=None,
-        source_meta={"tool": "web.fetch", "backend": backend},
+        source_meta={
+            "tool": "web.fetch",
+            "backend": backend,
+            "bytes_read": upstream.bytes_read,
+            "truncated": False,
+            "attempts": upstream.attempts,
+            "hedged": upstream.hedged,
+            "endpoint": upstream.endpoint,
+        },
         timings_ms={"total": elapsed_ms},
         content_hash=content_hash,
     )
 
 
-def _normalize_n8n_search_response(raw: Dict[str, Any], backend: str, elapsed_ms: float) -> Envelope:
+def _normalize_n8n_search_response(upstream: JsonResult, backend: str, elapsed_ms: float) -> Envelope:
+    raw = upstream.data
     return Envelope(
         ok=True,
         data={
@@ -109,13 +267,97 @@ def _normalize_n8n_search_response(raw: Dict[str, Any], backend: str, elapsed_ms
             "searched_at": raw.get("searched_at") or datetime.now(timezone.utc).isoformat(),
         },
         error=None,
-        source_meta={"tool": "web.search", "backend": backend},
+        source_meta={
+            "tool": "web.search",
+            "backend": backend,
+            "bytes_read": upstream.bytes_read,
+            "truncated": False,
+            "attempts": upstream.attempts,
+            "hedged": upstream.hedged,
+            "endpoint": upstream.endpoint,
+        },
         timings_ms={"total": elapsed_ms},
         content_hash=None,
     )
 
 
-def _check_rate_limit(
+def _reference_content(envelope: Envelope) -> None:
+    """Replace extracted text the caller already holds with a reference to its content_hash."""
+    envelope.data = {**envelope.data, "extracted_text": "", "content_ref": envelope.content_hash}
+
+
+def _mark_unchanged(envelope: Envelope) -> None:
+    """Drop the text of a page whose content_hash matches the caller's copy."""
+    data = {k: v for k, v in envelope.data.items() if k != "content_ref"}
+    envelope.data = {**data, "extracted_text": "", "unchanged": True}
+
+
+def _envelope_from_cache(entry: CacheEntry, cache_status: str, started: float) -> Envelope:
+    envelope = Envelope.model_validate(entry.content)
+    # Upstream attempt details belong to the call that filled the cache.
+    source_meta = {k: v for k, v in envelope.source_meta.items() if k not in ("attempts", "hedged", "endpoint")}
+    envelope.source_meta = {**source_meta, "cache": cache_status}
+    envelope.timings_ms = {"total": round((time.perf_counter() - started) * 1000, 2)}
+    return envelope
+
+
+async def _store_fetch_in_cache(
+    cache_key: str,
+    content: Dict[str, Any],
+    size: int,
+    *,
+    etag: str | None,
+    last_modified: str | None,
+) -> None:
+    entry = CacheEntry(
+        key=cache_key,
+        content=content,
+        size=size,
+        expires_at=time.time() + get_fetch_cache_ttl_s(),
+        etag=etag,
+        last_modified=last_modified,
+        content_hash=content.get("content_hash"),
+    )
+    evicted = await response_cache.put(
+        entry,
+        max_bytes=get_fetch_cache_max_bytes(),
+        sqlite_path=get_fetch_cache_sqlite_path(),
+    )
+    if evicted:
+        emit_tool_event(
+            {
+                "event_type": "tool.cache.evicted",
+                "event_phase": "result",
+                "tool_name": "web.fetch",
+                "decision": "allow",
+                "reason_code": "CACHE_EVICTED",
+                "domain": "",
+                "url": None,
+                "http_status": 200,
+                "duration_ms": 0.0,
+                "bytes_in": 0,
+                "bytes_out": 0,
+                "requester": None,
+                "correlation_id": None,
+                "upstream": "cache",
+                "error_code": None,
+                "cache_stats": response_cache.stats.as_dict(),
+            }
+        )
+
+
+async def _acquire_rate_limit(keys: List[Tuple[str, str, int]]) -> RateDecision:
+    if get_rate_limit_backend() != "sqlite":
+        return rate_limiter.acquire(keys)
+    try:
+        # Opening the shared limiter and its transaction both block on SQLite; keep them off the event loop.
+        return await asyncio.to_thread(lambda: get_rate_limiter().acquire(keys))
+    except sqlite3.Error:
+        # Degrade to per-worker enforcement rather than failing the request.
+        return rate_limiter.acquire(keys)
+
+
+async def _check_rate_limit(
     tool: str,
     backend: str,
     started: float,
@@ -123,16 +365,25 @@ def _check_rate_limit(
     bytes_in: int,
     requester: str | None,
     correlation_id: str | None,
-) -> JSONResponse | None:
-    limit_per_minute = get_rate_limit_per_minute()
-    if rate_limiter.allow(tool, limit_per_minute):
+    hostname: str | None = None,
+    phases: _Phases | None = None,
+) -> Response | None:
+    decision = await _acquire_rate_limit(rate_limit_keys(tool, requester, hostname))
+    if decision.allowed:
         return None
     elapsed = round((time.perf_counter() - started) * 1000, 2)
+    headers = None
+    if get_rate_limit_retry_after_enabled():
+        headers = {"Retry-After": str(max(1, math.ceil(decision.retry_after_s)))}
     return _envelope_error(
         http_code=status.HTTP_429_TOO_MANY_REQUESTS,
         code="RATE_LIMITED",
         message="Tool rate limit exceeded.",
-        details={"limit_per_minute": limit_per_minute},
+        details={
+            "limit_per_minute": decision.limit_per_minute,
+            "key_class": decision.key_class,
+            "retry_after_s": decision.retry_after_s,
+        },
         tool=tool,
         backend=backend,
         timings={"total": elapsed},
@@ -140,13 +391,15 @@ def _check_rate_limit(
             "tool_name": tool,
             "decision": "deny",
             "reason_code": "RATE_LIMITED",
-            "domain": "",
+            "domain": hostname or "",
             "url": None,
             "bytes_in": bytes_in,
             "requester": requester,
             "correlation_id": correlation_id,
             "upstream": backend,
         },
+        headers=headers,
+        phases=phases,
     )
 
 
@@ -158,6 +411,61 @@ def _n8n_headers() -> Dict[str, str]:
     return headers
 
 
+@dataclass
+class _ToolCall:
+    """State shared between a tool handler and the backend executing the call."""
+
+    req: Any
+    started: float
+    phases: _Phases
+    backend: str
+    fallback_from: str | None = None
+    coalesced: bool = False
+    cache_key: str | None = None
+    cached: CacheEntry | None = None
+    cache_status: str = CACHE_BYPASS
+    conditional: Dict[str, str] | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    validators: Validators | None = None
+    reshape: Callable[[Envelope], None] | None = None
+    audit: Dict[str, Any] = field(default_factory=dict)
+    concurrency: List[Tuple[str, str, int]] = field(default_factory=list)
+
+
+async def _admitted(call: _ToolCall, upstream: Callable[[], Awaitable[T]]) -> T:
+    """Run an upstream call inside the call's bulkheads; the wait is timed as `queue`."""
+    with call.phases.span("queue"):
+        held = await bulkheads.acquire(call.concurrency, get_concurrency_queue_max())
+    try:
+        return await upstream()
+    finally:
+        bulkheads.release(held)
+
+
+async def _single_flight(call: _ToolCall, key: str, upstream: Callable[[], Awaitable[T]]) -> T:
+    # Only the leader takes bulkhead slots; followers wait on its flight instead.
+    if not get_coalesce_enabled():
+        return await _admitted(call, upstream)
+    return await singleflight.do(key, lambda: _admitted(call, upstream))
+
+
+async def _post_n8n(tool: str, payload: Dict[str, Any]) -> JsonResult:
+    """POST to the tool's n8n webhook endpoints, picked by N8N_BALANCE for every attempt."""
+    selection = backend_registry.endpoints(tool).selection(get_n8n_balance())
+    url = selection.select(set())
+    result = await post_json(
+        url,
+        payload,
+        get_timeout_ms(),
+        headers=_n8n_headers(),
+        max_response_bytes=get_max_bytes(),
+        endpoints=selection,
+    )
+    result.endpoint = result.endpoint or urlparse(url).netloc
+    return result
+
+
 def _emit_request_event(
     *,
     tool: str,
@@ -190,6 +498,45 @@ def _emit_request_event(
     )
 
 
+def _circuit_open_error(
+    exc: CircuitOpenError,
+    *,
+    tool: str,
+    backend: str,
+    started: float,
+    phases: _Phases,
+    audit: Dict[str, Any],
+) -> Response:
+    elapsed = round((time.perf_counter() - started) * 1000, 2)
+    return _envelope_error(
+        http_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        code="UPSTREAM_CIRCUIT_OPEN",
+        message="Upstream is failing; request was not sent.",
+        details={"upstream": exc.upstream, "retry_after_s": round(exc.retry_after_s, 3)},
+        tool=tool,
+        backend=backend,
+        timings={"total": elapsed},
+        audit={**audit, "decision": "deny", "reason_code": "UPSTREAM_CIRCUIT_OPEN", "fail_closed": True},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after_s)))},
+        phases=phases,
+    )
+
+
+def _concurrency_limited_error(exc: ConcurrencyLimited, call: _ToolCall, audit: Dict[str, Any]) -> Response:
+    return _envelope_error(
+        http_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        code="CONCURRENCY_LIMITED",
+        message="Too many calls in flight; request was not sent.",
+        details={"scope": exc.scope, "key": exc.key, "limit": exc.limit, "queue_max": exc.queue_max},
+        tool=call.phases.tool,
+        backend=call.backend,
+        timings={"total": round((time.perf_counter() - call.started) * 1000, 2)},
+        audit={**audit, "decision": "deny", "reason_code": "CONCURRENCY_LIMITED"},
+        headers={"Retry-After": "1"},
+        phases=call.phases,
+    )
+
+
 def _upstream_error_code(http_code: int) -> str:
     if http_code == 401:
         return "UNAUTHORIZED"
@@ -200,465 +547,665 @@ def _upstream_error_code(http_code: int) -> str:
     return "UPSTREAM_ERROR"
 
 
-@router.post("/web.fetch")
-async def web_fetch(payload: Dict[str, Any]) -> JSONResponse:
-    started = time.perf_counter()
-    backend = get_tool_backend()
-    bytes_in = _json_size_bytes(payload)
-
-    try:
-        req = WebFetchRequest.model_validate(payload)
-    except ValidationError as exc:
+def _upstream_failure(exc: Exception, call: _ToolCall, audit: Dict[str, Any]) -> Response:
+    """Map an exception from the upstream stage to its error envelope and audit event."""
+    tool = call.phases.tool
+    audit = {**audit, "upstream": call.backend, "coalesced": call.coalesced, "attempts": getattr(exc, "attempts", 1)}
+    if isinstance(exc, ConcurrencyLimited):
+        return _concurrency_limited_error(exc, call, audit)
+    if isinstance(exc, AddressBlockedError):
         return _envelope_error(
-            http_code=status.HTTP_400_BAD_REQUEST,
-            code="BAD_REQUEST",
-            message="Invalid payload.",
-            details={"errors": exc.errors()},
-            tool="web.fetch",
-            backend=backend,
-            timings={"total": 0.0},
-            audit={
-                "tool_name": "web.fetch",
-                "decision": "deny",
-                "reason_code": "BAD_REQUEST",
-                "domain": "",
-                "url": None,
-                "bytes_in": bytes_in,
-                "requester": payload.get("agent_id"),
-                "correlation_id": payload.get("request_id"),
-                "upstream": backend,
-            },
+            http_code=status.HTTP_403_FORBIDDEN,
+            code="POLICY_DENIED",
+            message="Hostname resolves to a non-public address.",
+            details={"hostname": exc.hostname, "address": exc.address},
+            tool=tool,
+            backend=call.backend,
+            timings={"total": round((time.perf_counter() - call.started) * 1000, 2)},
+            phases=call.phases,
+            audit={**audit, "decision": "deny", "reason_code": "POLICY_DENIED"},
+        )
+    if isinstance(exc, CircuitOpenError):
+        return _circuit_open_error(
+            exc, tool=tool, backend=call.backend, started=call.started, phases=call.phases, audit=audit
+        )
+    extra: Dict[str, Any] = {}
+    if isinstance(exc, httpx.TimeoutException):
+        http_code, code, message, details = (
+            status.HTTP_504_GATEWAY_TIMEOUT,
+            "UPSTREAM_TIMEOUT",
+            "Upstream request timed out.",
+            None,
+        )
+        extra["fail_closed"] = True
+    elif isinstance(exc, httpx.HTTPStatusError):
+        try:
+            details = exc.response.json()
+        except ValueError:
+            details = {"text": exc.response.text}
+        http_code = exc.response.status_code
+        code, message = _upstream_error_code(http_code), "Upstream request failed."
+    elif isinstance(exc, ValueError):
+        http_code, code, message, details = (
+            status.HTTP_502_BAD_GATEWAY,
+            "UPSTREAM_TOO_LARGE",
+            "Upstream response exceeded byte limit.",
+            {"error": str(exc)},
+        )
+    else:
+        http_code, code, message, details = (
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "INTERNAL_ERROR",
+            "Unexpected server error.",
+            {"error": str(exc)},
         )
+    return _envelope_error(
+        http_code=http_code,
+        code=code,
+        message=message,
+        details=details,
+        tool=tool,
+        backend=call.backend,
+        timings={"total": round((time.perf_counter() - call.started) * 1000, 2)},
+        phases=call.phases,
+        audit={**audit, "decision": "deny", "reason_code": code, **extra},
+    )
 
-    limited = _check_rate_limit(
-        "web.fetch",
-        backend,
-        started,
-        bytes_in=bytes_in,
-        requester=req.agent_id,
-        correlation_id=req.request_id,
+
+def _not_configured(call: _ToolCall) -> Envelope:
+    tool = call.phases.tool
+    return Envelope(
+        ok=False,
+        data={},
+        error=ErrorObject(
+            code="NOT_CONFIGURED",
+            message=f"{tool.split('.')[-1].capitalize()} backend is not configured.",
+            details=None,
+        ),
+        source_meta={"tool": tool, "backend": call.backend},
+        timings_ms={"total": round((time.perf_counter() - call.started) * 1000, 2)},
+        content_hash=None,
     )
-    if limited:
-        return limited
 
-    parsed = urlparse(req.inputs.url)
-    hostname = (parsed.hostname or "").lower()
-    if not hostname:
+
+async def _execute(spec: ToolSpec, req: Any, *, bytes_in: int, started: float, phases: _Phases) -> Response:
+    """
+    Run one validated call through the shared pipeline.
+
+    Stages: target check, rate limit, request audit, allowlist, cache lookup,
+    upstream (through the tool's backend chain, under its concurrency limit),
+    finalize, single-pass encoding, cache store and result audit.
+    """
+    tool = spec.name
+    backend = phases.backend
+    url = spec.target_url(req) if spec.target_url is not None else None
+    hostname = (urlparse(url).hostname or "").lower() if url is not None else None
+    audit: Dict[str, Any] = {
+        "tool_name": tool,
+        "domain": hostname or "",
+        "url": None,
+        "bytes_in": bytes_in,
+        "requester": req.agent_id,
+        "correlation_id": req.request_id,
+        "upstream": backend,
+    }
+    if url is not None and not hostname:
         return _envelope_error(
             http_code=status.HTTP_400_BAD_REQUEST,
             code="BAD_REQUEST",
             message="Invalid URL.",
             details={"field": "inputs.url"},
-            tool="web.fetch",
+            tool=tool,
             backend=backend,
             timings={"total": 0.0},
-            audit={
-                "tool_name": "web.fetch",
-                "decision": "deny",
-                "reason_code": "BAD_REQUEST",
-                "domain": "",
-                "url": req.inputs.url,
-                "bytes_in": bytes_in,
-                "requester": req.agent_id,
-                "correlation_id": req.request_id,
-                "upstream": backend,
-            },
+            phases=phases,
+            audit={**audit, "decision": "deny", "reason_code": "BAD_REQUEST", "url": url},
+        )
+
+    with phases.span("rate_limit"):
+        limited = await _check_rate_limit(
+            tool,
+            backend,
+            started,
+            bytes_in=bytes_in,
+            requester=req.agent_id,
+            correlation_id=req.request_id,
+            hostname=hostname,
+            phases=phases,
         )
+    if limited:
+        return limited
 
     _emit_request_event(
-        tool="web.fetch",
+        tool=tool,
         backend=backend,
         bytes_in=bytes_in,
         requester=req.agent_id,
         correlation_id=req.request_id,
-        domain=hostname,
-        url=req.inputs.url,
+        domain=hostname or "",
+        url=url,
     )
 
-    if not is_allowed_host(hostname):
-        elapsed = round((time.perf_counter() - started) * 1000, 2)
-        return _envelope_error(
-            http_code=status.HTTP_403_FORBIDDEN,
-            code="POLICY_DENIED",
-            message="Hostname is not allowlisted.",
-            details={"hostname": hostname},
-            tool="web.fetch",
-            backend=backend,
-            timings={"total": elapsed},
-            audit={
-                "tool_name": "web.fetch",
-                "decision": "deny",
-                "reason_code": "POLICY_DENIED",
-                "domain": hostname,
-                "url": _sanitize_url_for_audit(req.inputs.url),
-                "bytes_in": bytes_in,
-                "bytes_out": 0,
-                "requester": req.agent_id,
-                "correlation_id": req.request_id,
-                "upstream": backend,
-            },
-        )
+    audit["url"] = _sanitize_url_for_audit(url)
+    if hostname is not None:
+        with phases.span("allowlist"):
+            allowed = is_allowed_host(hostname)
+        if not allowed:
+            return _envelope_error(
+                http_code=status.HTTP_403_FORBIDDEN,
+                code="POLICY_DENIED",
+                message="Hostname is not allowlisted.",
+                details={"hostname": hostname},
+                tool=tool,
+                backend=backend,
+                timings={"total": round((time.perf_counter() - started) * 1000, 2)},
+                phases=phases,
+                audit={**audit, "decision": "deny", "reason_code": "POLICY_DENIED", "bytes_out": 0},
+            )
 
+    call = _ToolCall(req=req, started=started, phases=phases, backend=backend)
     try:
-        if backend == "n8n":
-            raw = await post_json(
-                get_n8n_web_fetch_url(),
-                {
-                    "url": req.inputs.url,
-                    "agent_id": req.agent_id,
-                    "purpose": req.purpose,
-                    "request_id": req.request_id,
+        envelope = await spec.cache.lookup(call) if spec.cache is not None else None
+        if envelope is None:
+            if backend_registry.chain(tool):
+                call.concurrency = concurrency_keys(tool, req.agent_id, hostname, spec.max_concurrency)
+                queued = phases.ms.get("queue", 0.0)
+                upstream_started = time.perf_counter()
+                try:
+                    if spec.coalesces:
+                        envelope = await backend_registry.execute(tool, call)
+                    else:
+                        envelope = await _admitted(call, lambda: backend_registry.execute(tool, call))
+                finally:
+                    # Time spent waiting for a bulkhead slot is reported as `queue` only.
+                    waited = phases.ms.get("queue", 0.0) - queued
+                    phases.add("upstream", (time.perf_counter() - upstream_started) * 1000 - waited)
+            else:
+                envelope = _not_configured(call)
+        envelope.source_meta["coalesced"] = call.coalesced
+        if call.fallback_from:
+            envelope.source_meta["fallback_from"] = call.fallback_from
+        if envelope.ok and spec.finalize is not None:
+            await spec.finalize(call, envelope)
+    except Exception as exc:  # noqa: BLE001
+        return _upstream_failure(exc, call, audit)
+
+    storable = spec.cache is not None and spec.cache.storable(call, envelope)
+    if storable or call.reshape is None:
+        content, body = _encode_envelope(envelope, phases, started)
+    if storable:
+        await spec.cache.store(call, content, body)
+    if call.reshape is not None:
+        call.reshape(envelope)
+        content, body = _encode_envelope(envelope, phases, started)
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    error_code = None if envelope.ok else (envelope.error.code if envelope.error else "ERROR")
+    metrics.observe_request(tool, call.backend, error_code or "ok", duration_ms)
+    emit_tool_event(
+        {
+            **audit,
+            "event_type": "tool.execution.result",
+            "event_phase": "result",
+            "decision": "allow" if envelope.ok else "deny",
+            "reason_code": error_code or "OK",
+            "http_status": status.HTTP_200_OK,
+            "duration_ms": duration_ms,
+            "bytes_out": len(body),
+            "upstream": call.backend,
+            "error_code": error_code,
+            "coalesced": call.coalesced,
+            "attempts": 0 if call.cache_status == CACHE_HIT else envelope.source_meta.get("attempts", 1),
+            **call.audit,
+            "timings_ms": content["timings_ms"],
+        }
+    )
+    return json_response(body, status_code=status.HTTP_200_OK)
+
+
+def _endpoint(spec: ToolSpec) -> Callable[[Request], Awaitable[Response]]:
+    async def handler(request: Request) -> Response:
+        started = time.perf_counter()
+        backend = backend_registry.primary(spec.name)
+        body = await request.body()
+        bytes_in = len(body)
+        phases = _Phases(spec.name, backend)
+
+        try:
+            with phases.span("validation"):
+                req = spec.request_model.model_validate_json(body)
+        except ValidationError as exc:
+            payload = _peek_request_fields(body)
+            return _envelope_error(
+                http_code=status.HTTP_400_BAD_REQUEST,
+                code="BAD_REQUEST",
+                message="Invalid payload.",
+                details={"errors": _validation_errors(exc)},
+                tool=spec.name,
+                backend=backend,
+                timings={"total": 0.0},
+                phases=phases,
+                audit={
+                    "tool_name": spec.name,
+                    "decision": "deny",
+                    "reason_code": "BAD_REQUEST",
+                    "domain": "",
+                    "url": None,
+                    "bytes_in": bytes_in,
+                    "requester": payload.get("agent_id"),
+                    "correlation_id": payload.get("request_id"),
+                    "upstream": backend,
                 },
-                get_timeout_ms(),
-                headers=_n8n_headers(),
-                max_response_bytes=get_max_bytes(),
-            )
-            elapsed = round((time.perf_counter() - started) * 1000, 2)
-            envelope = _normalize_n8n_fetch_response(raw, backend, elapsed)
-            status_code = 200
-        else:
-            fetch_started = time.perf_counter()
-            result = await fetch_url(
-                req.inputs.url,
-                timeout_ms=get_timeout_ms(),
-                max_bytes=get_max_bytes(),
-                user_agent="corestack-tool-gateway/0.1",
             )
-            fetch_ms = (time.perf_counter() - fetch_started) * 1000
-            elapsed = (time.perf_counter() - started) * 1000
-            fetched_at = datetime.now(timezone.utc).isoformat()
-            content_hash = (
-                hashlib.sha256(result.extracted_text.encode("utf-8")).hexdigest()
-                if result.extracted_text
-                else None
-            )
-            envelope = Envelope(
-                ok=True,
-                data={
-                    "url": req.inputs.url,
-                    "final_url": result.final_url,
-                    "status": result.status_code,
-                    "title": result.title,
-                    "extracted_text": result.extracted_text,
-                    "fetched_at": fetched_at,
-                },
-                error=None,
-                source_meta={"tool": "web.fetch", "backend": backend},
-                timings_ms={"total": round(elapsed, 2), "fetch": round(fetch_ms, 2)},
-                content_hash=content_hash,
+
+        response = await _execute(spec, req, bytes_in=bytes_in, started=started, phases=phases)
+        record_tool_call(spec.name, req, response.body)
+        return response
+
+    handler.__name__ = spec.name.replace(".", "_")
+    return handler
+
+
+def register_tool(spec: ToolSpec) -> None:
+    """Register a tool and expose it as `POST /tools/<name>` on the shared pipeline."""
+    tool_registry.register(spec)
+    router.add_api_route(f"/{spec.name}", _endpoint(spec), methods=["POST"], name=spec.name)
+
+
+async def _lookup_fetch_cache(call: _ToolCall) -> Envelope | None:
+    req = call.req
+    call.cache_key = canonical_url(req.inputs.url) if get_fetch_cache_ttl_s() > 0 else None
+    if call.cache_key is not None:
+        with call.phases.span("cache"):
+            call.cached = await response_cache.get(
+                call.cache_key, sqlite_path=get_fetch_cache_sqlite_path(), max_bytes=get_fetch_cache_max_bytes()
             )
-            status_code = 200
-    except httpx.TimeoutException:
-        elapsed = round((time.perf_counter() - started) * 1000, 2)
-        return _envelope_error(
-            http_code=status.HTTP_504_GATEWAY_TIMEOUT,
-            code="UPSTREAM_TIMEOUT",
-            message="Upstream request timed out.",
-            details=None,
-            tool="web.fetch",
-            backend=backend,
-            timings={"total": elapsed, "fetch": elapsed},
-            audit={
-                "tool_name": "web.fetch",
-                "decision": "deny",
-                "reason_code": "UPSTREAM_TIMEOUT",
-                "domain": hostname,
-                "url": _sanitize_url_for_audit(req.inputs.url),
-                "bytes_in": bytes_in,
-                "requester": req.agent_id,
-                "correlation_id": req.request_id,
-                "upstream": backend,
-                "fail_closed": True,
-            },
+        call.cache_status = CACHE_HIT if call.cached is not None and call.cached.is_fresh() else CACHE_MISS
+    if call.cached is not None:
+        call.etag = call.cached.etag
+        call.last_modified = call.cached.last_modified
+        call.conditional = call.cached.conditional_headers()
+        if call.cache_status == CACHE_HIT:
+            return _envelope_from_cache(call.cached, CACHE_HIT, call.started)
+    elif req.inputs.if_none_match is not None:
+        validators = validator_store.get(canonical_url(req.inputs.url))
+        # Validators for another version would make a 304 mean the wrong text.
+        if validators is not None and validators.content_hash == req.inputs.if_none_match:
+            call.validators = validators
+            call.etag = validators.etag
+            call.last_modified = validators.last_modified
+            call.conditional = validators.conditional_headers()
+    return None
+
+
+def _upstream_status(envelope: Envelope) -> int | None:
+    """The fetched page's HTTP status, or None when `data.status` (passed through from n8n) is not an integer."""
+    value = envelope.data.get("status")
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def _fetch_storable(call: _ToolCall, envelope: Envelope) -> bool:
+    upstream_status = _upstream_status(envelope)
+    return (
+        call.cache_key is not None
+        and call.cache_status != CACHE_HIT
+        and upstream_status is not None
+        and 200 <= upstream_status < 300
+    )
+
+
+async def _store_fetch(call: _ToolCall, content: Dict[str, Any], body: bytes) -> None:
+    # The cache keeps the full text; only the response may be reduced to a reference.
+    await _store_fetch_in_cache(call.cache_key, content, len(body), etag=call.etag, last_modified=call.last_modified)
+
+
+async def _finalize_fetch(call: _ToolCall, envelope: Envelope) -> None:
+    req = call.req
+    cache_status = call.cache_status
+    envelope.source_meta["cache"] = cache_status
+    response_cache.record(cache_status)
+    store_dir = get_content_store_dir()
+    text = envelope.data.get("extracted_text") or ""
+    if store_dir and envelope.content_hash and text and cache_status != CACHE_HIT:
+        with call.phases.span("content_store"):
+            await asyncio.to_thread(content_store.put, store_dir, envelope.content_hash, text)
+    upstream_status = _upstream_status(envelope)
+    if (
+        envelope.content_hash
+        and cache_status != CACHE_HIT
+        and upstream_status is not None
+        and (200 <= upstream_status < 300 or upstream_status == 304)
+    ):
+        validator_store.put(
+            canonical_url(req.inputs.url),
+            Validators(etag=call.etag, last_modified=call.last_modified, content_hash=envelope.content_hash),
+            max_entries=get_fetch_validators_max_entries(),
         )
-    except httpx.HTTPStatusError as exc:
-        elapsed = round((time.perf_counter() - started) * 1000, 2)
-        detail = None
-        try:
-            detail = exc.response.json()
-        except ValueError:
-            detail = {"text": exc.response.text}
-        return _envelope_error(
-            http_code=exc.response.status_code,
-            code=_upstream_error_code(exc.response.status_code),
-            message="Upstream request failed.",
-            details=detail,
-            tool="web.fetch",
-            backend=backend,
-            timings={"total": elapsed},
-            audit={
-                "tool_name": "web.fetch",
-                "decision": "deny",
-                "reason_code": _upstream_error_code(exc.response.status_code),
-                "domain": hostname,
-                "url": _sanitize_url_for_audit(req.inputs.url),
-                "bytes_in": bytes_in,
-                "requester": req.agent_id,
-                "correlation_id": req.request_id,
-                "upstream": backend,
+    unchanged = req.inputs.if_none_match is not None and envelope.content_hash == req.inputs.if_none_match
+    referenced = (
+        not unchanged and envelope.content_hash is not None and envelope.content_hash in req.inputs.known_hashes
+    )
+    if unchanged:
+        validator_store.stats.unchanged += 1
+        call.reshape = _mark_unchanged
+    elif referenced:
+        call.reshape = _reference_content
+    call.audit = {"cache": cache_status, "content_ref": referenced, "unchanged": unchanged}
+
+
+def _fetch_flight_key(call: _ToolCall) -> str:
+    return fetch_key(call.backend, call.cache_key or canonical_url(call.req.inputs.url), call.conditional or {})
+
+
+async def _fetch_via_n8n(call: _ToolCall) -> Envelope:
+    req = call.req
+    flight_key = _fetch_flight_key(call)
+    call.coalesced = get_coalesce_enabled() and flight_key in singleflight
+    upstream = await _single_flight(
+        call,
+        flight_key,
+        lambda: _post_n8n(
+            "web.fetch",
+            {
+                "url": req.inputs.url,
+                "agent_id": req.agent_id,
+                "purpose": req.purpose,
+                "request_id": req.request_id,
             },
-        )
-    except ValueError as exc:
-        elapsed = round((time.perf_counter() - started) * 1000, 2)
-        return _envelope_error(
-            http_code=status.HTTP_502_BAD_GATEWAY,
-            code="UPSTREAM_TOO_LARGE",
-            message="Upstream response exceeded byte limit.",
-            details={"error": str(exc)},
-            tool="web.fetch",
-            backend=backend,
-            timings={"total": elapsed},
-            audit={
-                "tool_name": "web.fetch",
-                "decision": "deny",
-                "reason_code": "UPSTREAM_TOO_LARGE",
-                "domain": hostname,
-                "url": _sanitize_url_for_audit(req.inputs.url),
-                "bytes_in": bytes_in,
-                "requester": req.agent_id,
-                "correlation_id": req.request_id,
-                "upstream": backend,
+        ),
+    )
+    if not call.coalesced:
+        call.phases.add_upstream(upstream.phases)
+    elapsed = round((time.perf_counter() - call.started) * 1000, 2)
+    envelope = _normalize_n8n_fetch_response(upstream, call.backend, elapsed, call.phases)
+    if call.cached is not None and call.cached.content_hash == envelope.content_hash:
+        # n8n has no conditional GET; an identical content_hash revalidates the entry.
+        call.cache_status = CACHE_REVALIDATED
+    return envelope
+
+
+async def _fetch_via_local(call: _ToolCall) -> Envelope:
+    req = call.req
+    flight_key = _fetch_flight_key(call)
+    call.coalesced = get_coalesce_enabled() and flight_key in singleflight
+    conditional = call.conditional
+    result = await _single_flight(
+        call,
+        flight_key,
+        lambda: fetch_url(
+            req.inputs.url,
+            timeout_ms=get_timeout_ms(),
+            max_bytes=get_max_bytes(),
+            user_agent="corestack-tool-gateway/0.1",
+            **({"extra_headers": conditional} if conditional else {}),
+        ),
+    )
+    if not call.coalesced:
+        call.phases.add_upstream(result.phases)
+        if conditional:
+            validator_store.stats.conditional_sent += 1
+            validator_store.stats.not_modified += int(result.not_modified)
+    call.etag = result.etag or call.etag
+    call.last_modified = result.last_modified or call.last_modified
+    if call.cached is not None and result.not_modified:
+        call.cache_status = CACHE_REVALIDATED
+        return _envelope_from_cache(call.cached, CACHE_REVALIDATED, call.started)
+    elapsed = (time.perf_counter() - call.started) * 1000
+    if call.validators is not None and result.not_modified:
+        # Nothing was downloaded or extracted; the caller's copy is current.
+        return Envelope(
+            ok=True,
+            data={
+                "url": req.inputs.url,
+                "final_url": result.final_url,
+                "status": result.status_code,
+                "title": "",
+                "extracted_text": "",
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
             },
+            error=None,
+            source_meta={"tool": "web.fetch", "backend": call.backend, "bytes_read": 0, "truncated": False},
+            timings_ms={"total": round(elapsed, 2)},
+            content_hash=call.validators.content_hash,
         )
-    except Exception as exc:  # noqa: BLE001
-        elapsed = round((time.perf_counter() - started) * 1000, 2)
-        return _envelope_error(
-            http_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            code="INTERNAL_ERROR",
-            message="Unexpected server error.",
-            details={"error": str(exc)},
-            tool="web.fetch",
-            backend=backend,
-            timings={"total": elapsed},
-            audit={
-                "tool_name": "web.fetch",
-                "decision": "deny",
-                "reason_code": "INTERNAL_ERROR",
-                "domain": hostname,
-                "url": _sanitize_url_for_audit(req.inputs.url),
-                "bytes_in": bytes_in,
-                "requester": req.agent_id,
-                "correlation_id": req.request_id,
-                "upstream": backend,
-            },
+    content_hash = _content_hash(result.extracted_text, call.phases)
+    return Envelope(
+        ok=True,
+        data={
+            "url": req.inputs.url,
+            "final_url": result.final_url,
+            "status": result.status_code,
+            "title": result.title,
+            "extracted_text": result.extracted_text,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        },
+        error=None,
+        source_meta={
+            "tool": "web.fetch",
+            "backend": call.backend,
+            "bytes_read": result.bytes_read,
+            "truncated": result.truncated,
+            "content_type": result.content_type,
+            "charset": result.charset,
+        },
+        timings_ms={"total": round(elapsed, 2)},
+        content_hash=content_hash,
+    )
+
+
+async def _fetch_batch_item(
+    index: int,
+    req: WebFetchRequest,
+    backend: str,
+    semaphore: asyncio.Semaphore,
+) -> Tuple[int, Response]:
+    async with semaphore:
+        bytes_in = len(req.model_dump_json())
+        response = await _execute(
+            WEB_FETCH,
+            req,
+            bytes_in=bytes_in,
+            started=time.perf_counter(),
+            phases=_Phases("web.fetch", backend),
         )
+    record_tool_call("web.fetch", req, response.body)
+    return index, response
+
+
+def _with_batch_known_hashes(item: WebFetchInputs, known_hashes: List[str]) -> WebFetchInputs:
+    if not known_hashes:
+        return item
+    return item.model_copy(update={"known_hashes": item.known_hashes + known_hashes})
 
-    content = envelope.model_dump()
-    emit_tool_event(
-        {
-            "tool_name": "web.fetch",
-            "event_type": "tool.execution.result",
-            "event_phase": "result",
-            "decision": "allow",
-            "reason_code": "OK",
-            "domain": hostname,
-            "url": _sanitize_url_for_audit(req.inputs.url),
-            "http_status": status_code,
-            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
-            "bytes_in": bytes_in,
-            "bytes_out": _json_size_bytes(content),
-            "requester": req.agent_id,
-            "correlation_id": req.request_id,
-            "upstream": backend,
-            "error_code": None,
-        }
-    )
-    return JSONResponse(status_code=status_code, content=content)
 
+def _batch_item_line(index: int, response: Response) -> bytes:
+    # The item envelope is already encoded; splice it in rather than re-encoding.
+    return b'{"index":%d,"http_status":%d,"envelope":%s}' % (index, response.status_code, response.body)
 
-@router.post("/web.search")
-async def web_search(payload: Dict[str, Any]) -> JSONResponse:
+
+class _BatchStream(StreamingResponse):
+    """NDJSON batch stream that cancels the batch's unfinished fetches however the response ends."""
+
+    def __init__(self, content: AsyncIterator[bytes], tasks: List["asyncio.Task[Tuple[int, Response]]"]) -> None:
+        super().__init__(content, media_type="application/x-ndjson")
+        self._tasks = tasks
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # On client disconnect Starlette abandons the body iterator without closing it.
+            for task in self._tasks:
+                task.cancel()
+            await self.body_iterator.aclose()  # type: ignore[union-attr]
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+@router.post("/web.fetch:batch")
+async def web_fetch_batch(request: Request, stream: bool = False) -> Response:
+    """
+    Fetch many URLs in one call.
+
+    Every item goes through the same rate limit, allowlist, cache and audit path
+    as /tools/web.fetch, with at most WEB_FETCH_BATCH_CONCURRENCY in flight.
+    With `?stream=true` results are sent as NDJSON lines in completion order,
+    followed by a summary line; otherwise one envelope lists every item in
+    input order.
+    """
     started = time.perf_counter()
-    backend = get_tool_backend()
-    bytes_in = _json_size_bytes(payload)
+    backend = backend_registry.primary("web.fetch")
+    body = await request.body()
+    bytes_in = len(body)
+    audit = {
+        "tool_name": "web.fetch",
+        "decision": "deny",
+        "reason_code": "BAD_REQUEST",
+        "domain": "",
+        "url": None,
+        "bytes_in": bytes_in,
+        "requester": None,
+        "correlation_id": None,
+        "upstream": backend,
+    }
 
     try:
-        req = WebSearchRequest.model_validate(payload)
+        batch = WebFetchBatchRequest.model_validate_json(body)
     except ValidationError as exc:
+        payload = _peek_request_fields(body)
+        audit["requester"] = payload.get("agent_id")
+        audit["correlation_id"] = payload.get("request_id")
         return _envelope_error(
             http_code=status.HTTP_400_BAD_REQUEST,
             code="BAD_REQUEST",
             message="Invalid payload.",
-            details={"errors": exc.errors()},
-            tool="web.search",
+            details={"errors": _validation_errors(exc)},
+            tool="web.fetch",
             backend=backend,
             timings={"total": 0.0},
-            audit={
-                "tool_name": "web.search",
-                "decision": "deny",
-                "reason_code": "BAD_REQUEST",
-                "domain": "",
-                "url": None,
-                "bytes_in": bytes_in,
-                "requester": payload.get("agent_id"),
-                "correlation_id": payload.get("request_id"),
-                "upstream": backend,
-            },
+            audit=audit,
         )
 
-    limited = _check_rate_limit(
-        "web.search",
-        backend,
-        started,
-        bytes_in=bytes_in,
-        requester=req.agent_id,
-        correlation_id=req.request_id,
-    )
-    if limited:
-        return limited
-
-    _emit_request_event(
-        tool="web.search",
-        backend=backend,
-        bytes_in=bytes_in,
-        requester=req.agent_id,
-        correlation_id=req.request_id,
-        domain="",
-        url=None,
-    )
+    audit["requester"] = batch.agent_id
+    audit["correlation_id"] = batch.request_id
+    max_items = get_fetch_batch_max_items()
+    if len(batch.inputs.items) > max_items:
+        return _envelope_error(
+            http_code=status.HTTP_400_BAD_REQUEST,
+            code="BAD_REQUEST",
+            message="Too many batch items.",
+            details={"field": "inputs.items", "max_items": max_items},
+            tool="web.fetch",
+            backend=backend,
+            timings={"total": 0.0},
+            audit=audit,
+        )
 
-    if backend == "n8n":
-        try:
-            raw = await post_json(
-                get_n8n_web_search_url(),
-                {
-                    "query": req.inputs.query,
-                    "max_results": req.inputs.max_results,
-                    "agent_id": req.agent_id,
-                    "purpose": req.purpose,
-                    "request_id": req.request_id,
-                },
-                get_timeout_ms(),
-                headers=_n8n_headers(),
-                max_response_bytes=get_max_bytes(),
+    semaphore = asyncio.Semaphore(get_fetch_batch_concurrency())
+    tasks = [
+        asyncio.create_task(
+            _fetch_batch_item(
+                index,
+                WebFetchRequest(
+                    agent_id=batch.agent_id,
+                    purpose=batch.purpose,
+                    request_id=f"{batch.request_id}#{index}" if batch.request_id else None,
+                    inputs=_with_batch_known_hashes(item, batch.inputs.known_hashes),
+                ),
+                backend,
+                semaphore,
             )
-            elapsed = round((time.perf_counter() - started) * 1000, 2)
-            envelope = _normalize_n8n_search_response(raw, backend, elapsed)
-            status_code = 200
-        except httpx.TimeoutException:
-            return _envelope_error(
-                http_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                code="UPSTREAM_TIMEOUT",
-                message="Upstream request timed out.",
-                details=None,
-                tool="web.search",
-                backend=backend,
-                timings={"total": round((time.perf_counter() - started) * 1000, 2)},
-                audit={
-                    "tool_name": "web.search",
-                    "decision": "deny",
-                    "reason_code": "UPSTREAM_TIMEOUT",
-                    "domain": "",
-                    "url": None,
-                    "bytes_in": bytes_in,
-                    "requester": req.agent_id,
-                    "correlation_id": req.request_id,
-                    "upstream": backend,
-                    "fail_closed": True,
-                },
-            )
-        except httpx.HTTPStatusError as exc:
-            detail = None
-            try:
-                detail = exc.response.json()
-            except ValueError:
-                detail = {"text": exc.response.text}
-            return _envelope_error(
-                http_code=exc.response.status_code,
-                code=_upstream_error_code(exc.response.status_code),
-                message="Upstream request failed.",
-                details=detail,
-                tool="web.search",
-                backend=backend,
-                timings={"total": round((time.perf_counter() - started) * 1000, 2)},
-                audit={
-                    "tool_name": "web.search",
-                    "decision": "deny",
-                    "reason_code": _upstream_error_code(exc.response.status_code),
-                    "domain": "",
-                    "url": None,
-                    "bytes_in": bytes_in,
-                    "requester": req.agent_id,
-                    "correlation_id": req.request_id,
-                    "upstream": backend,
-                },
-            )
-        except ValueError as exc:
-            return _envelope_error(
-                http_code=status.HTTP_502_BAD_GATEWAY,
-                code="UPSTREAM_TOO_LARGE",
-                message="Upstream response exceeded byte limit.",
-                details={"error": str(exc)},
-                tool="web.search",
-                backend=backend,
-                timings={"total": round((time.perf_counter() - started) * 1000, 2)},
-                audit={
-                    "tool_name": "web.search",
-                    "decision": "deny",
-                    "reason_code": "UPSTREAM_TOO_LARGE",
-                    "domain": "",
-                    "url": None,
-                    "bytes_in": bytes_in,
-                    "requester": req.agent_id,
-                    "correlation_id": req.request_id,
-                    "upstream": backend,
-                },
-            )
-        except Exception as exc:  # noqa: BLE001
-            return _envelope_error(
-                http_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                code="INTERNAL_ERROR",
-                message="Unexpected server error.",
-                details={"error": str(exc)},
-                tool="web.search",
-                backend=backend,
-                timings={"total": round((time.perf_counter() - started) * 1000, 2)},
-                audit={
-                    "tool_name": "web.search",
-                    "decision": "deny",
-                    "reason_code": "INTERNAL_ERROR",
-                    "domain": "",
-                    "url": None,
-                    "bytes_in": bytes_in,
-                    "requester": req.agent_id,
-                    "correlation_id": req.request_id,
-                    "upstream": backend,
-                },
-            )
-    else:
-        elapsed = round((time.perf_counter() - started) * 1000, 2)
-        envelope = Envelope(
-            ok=False,
-            data={},
-            error=ErrorObject(
-                code="NOT_CONFIGURED",
-                message="Search backend is not configured.",
-                details=None,
-            ),
-            source_meta={"tool": "web.search", "backend": backend},
-            timings_ms={"total": elapsed},
-            content_hash=None,
         )
-        status_code = 200
+        for index, item in enumerate(batch.inputs.items)
+    ]
 
-    content = envelope.model_dump()
-    emit_tool_event(
-        {
-            "tool_name": "web.search",
-            "event_type": "tool.execution.result",
-            "event_phase": "result",
-            "decision": "allow" if envelope.ok else "deny",
-            "reason_code": "OK" if envelope.ok else (envelope.error.code if envelope.error else "ERROR"),
-            "domain": "",
-            "url": None,
-            "http_status": status_code,
-            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
-            "bytes_in": bytes_in,
-            "bytes_out": _json_size_bytes(content),
-            "requester": req.agent_id,
-            "correlation_id": req.request_id,
-            "upstream": backend,
-            "error_code": None if envelope.ok else (envelope.error.code if envelope.error else "ERROR"),
+    def _summary(succeeded: int) -> Dict[str, Any]:
+        return {
+            "tool": "web.fetch:batch",
+            "backend": backend,
+            "items": len(tasks),
+            "succeeded": succeeded,
+            "failed": len(tasks) - succeeded,
         }
+
+    if stream:
+
+        async def _lines() -> AsyncIterator[bytes]:
+            succeeded = 0
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    index, response = await next_done
+                    succeeded += response.status_code < 400
+                    yield _batch_item_line(index, response) + b"\n"
+                elapsed = round((time.perf_counter() - started) * 1000, 2)
+                summary = {"done": True, "source_meta": _summary(succeeded), "timings_ms": {"total": elapsed}}
+                yield dumps(summary) + b"\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return _BatchStream(_lines(), tasks)
+
+    results = sorted(await asyncio.gather(*tasks), key=lambda pair: pair[0])
+    items = b",".join(_batch_item_line(index, response) for index, response in results)
+    envelope = Envelope(
+        ok=True,
+        data={},
+        error=None,
+        source_meta=_summary(sum(response.status_code < 400 for _, response in results)),
+        timings_ms={"total": round((time.perf_counter() - started) * 1000, 2)},
+        content_hash=None,
     )
-    return JSONResponse(status_code=status_code, content=content)
+    content = envelope_content(envelope)
+    del content["data"]
+    body = append_raw(dumps(content), "data", b'{"items":[' + items + b"]}")
+    return json_response(body, status_code=status.HTTP_200_OK)
+
+
+async def _search_via_n8n(call: _ToolCall) -> Envelope:
+    req = call.req
+    flight_key = search_key(call.backend, req.inputs.query, req.inputs.max_results)
+    call.coalesced = get_coalesce_enabled() and flight_key in singleflight
+    upstream = await _single_flight(
+        call,
+        flight_key,
+        lambda: _post_n8n(
+            "web.search",
+            {
+                "query": req.inputs.query,
+                "max_results": req.inputs.max_results,
+                "agent_id": req.agent_id,
+                "purpose": req.purpose,
+                "request_id": req.request_id,
+            },
+        ),
+    )
+    if not call.coalesced:
+        call.phases.add_upstream(upstream.phases)
+    elapsed = round((time.perf_counter() - call.started) * 1000, 2)
+    return _normalize_n8n_search_response(upstream, call.backend, elapsed)
+
+
+WEB_FETCH = ToolSpec(
+    name="web.fetch",
+    request_model=WebFetchRequest,
+    executors={BACKEND_N8N: _fetch_via_n8n, BACKEND_LOCAL: _fetch_via_local},
+    target_url=lambda req: req.inputs.url,
+    cache=CachePolicy(lookup=_lookup_fetch_cache, storable=_fetch_storable, store=_store_fetch),
+    finalize=_finalize_fetch,
+    # With the default 20-connection n8n pool, fetch bursts still leave room for search.
+    max_concurrency=16,
+    coalesces=True,
+)
+WEB_SEARCH = ToolSpec(
+    name="web.search",
+    request_model=WebSearchRequest,
+    executors={BACKEND_N8N: _search_via_n8n},
+    max_concurrency=4,
+    coalesces=True,
+)
+
+register_tool(WEB_FETCH)
+register_tool(WEB_SEARCH)
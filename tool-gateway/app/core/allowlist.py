@@ -0,0 +1,208 @@
+import ipaddress
+import os
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+# A loader returns the raw allowlist entries plus the file to watch for changes
+# ("" when the entries did not come from a file).
+AllowlistLoader = Callable[[], Tuple[List[str], str]]
+
+
+def _file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class CompiledAllowlist:
+    """
+    Allowlist compiled for O(label count) host checks.
+
+    Entry forms:
+    - `*` allows every host
+    - `example.com` exact hostname
+    - `*.gov.uk` any subdomain of gov.uk (not gov.uk itself)
+    - `10.0.0.0/8`, `2001:db8::/32` CIDR ranges; bare IPs are exact entries
+    """
+
+    def __init__(self, entries: Iterable[str]) -> None:
+        entries = list(entries)
+        self.entries: FrozenSet[str] = frozenset(e.strip().lower() for e in entries if e.strip())
+        self.allow_all = "*" in self.entries
+        exact = set()
+        suffixes = set()
+        networks: Dict[Tuple[int, int], Set[int]] = {}
+        # Plain hostnames in listing order (file order; WEB_ALLOWLIST is sorted).
+        self.hosts: Tuple[str, ...] = tuple(
+            dict.fromkeys(
+                e.strip().lower()
+                for e in entries
+                if e.strip() and "*" not in e and "/" not in e and _parse_ip(e.strip()) is None
+            )
+        )
+        for entry in self.entries:
+            if entry == "*":
+                continue
+            if entry.startswith("*."):
+                suffixes.add(entry[2:])
+                continue
+            if "/" in entry:
+                try:
+                    network = ipaddress.ip_network(entry, strict=False)
+                    networks.setdefault((network.version, network.prefixlen), set()).add(int(network.network_address))
+                    continue
+                except ValueError:
+                    pass
+            exact.add(_normalize_ip(entry) or entry)
+        self._exact = frozenset(exact)
+        self._suffixes = frozenset(suffixes)
+        # CIDR ranges are indexed by (version, prefix length) -> network addresses,
+        # so a lookup costs one mask + set probe per distinct prefix length.
+        self._networks: Dict[int, Tuple[Tuple[int, FrozenSet[int]], ...]] = {}
+        for version, bits in ((4, 32), (6, 128)):
+            self._networks[version] = tuple(
+                (((1 << bits) - 1) ^ ((1 << (bits - prefixlen)) - 1), frozenset(addresses))
+                for (v, prefixlen), addresses in sorted(networks.items())
+                if v == version
+            )
+
+    def __contains__(self, entry: object) -> bool:
+        return entry in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
+
+    def lists_host(self, hostname: str) -> bool:
+        """True only for an exact hostname entry; `*.suffix` and `*` do not count."""
+        return hostname.lower().rstrip(".") in self._exact
+
+    def matches_address(self, address: str) -> bool:
+        """True only for an explicit IP or CIDR entry; `*` does not count."""
+        ip = _parse_ip(address)
+        if ip is None:
+            return False
+        if str(ip) in self._exact:
+            return True
+        value = int(ip)
+        return any(value & mask in addresses for mask, addresses in self._networks[ip.version])
+
+    def matches(self, hostname: str) -> bool:
+        if self.allow_all:
+            return True
+        host = hostname.strip().lower().rstrip(".")
+        if not host:
+            return False
+        if host in self._exact:
+            return True
+        if ":" in host or host[-1].isdigit():
+            ip = _parse_ip(host)
+            if ip is not None:
+                if str(ip) in self._exact:
+                    return True
+                value = int(ip)
+                return any(value & mask in addresses for mask, addresses in self._networks[ip.version])
+        if self._suffixes:
+            dot = host.find(".")
+            while dot != -1:
+                if host[dot + 1 :] in self._suffixes:
+                    return True
+                dot = host.find(".", dot + 1)
+        return False
+
+
+def _parse_ip(value: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    try:
+        return ipaddress.ip_address(value.strip("[]"))
+    except ValueError:
+        return None
+
+
+def _normalize_ip(value: str) -> Optional[str]:
+    ip = _parse_ip(value)
+    return str(ip) if ip is not None else None
+
+
+class AllowlistStore:
+    """
+    Holds the compiled allowlist and swaps in a new one when the file changes.
+
+    Calling the store returns the current `CompiledAllowlist`. The watched file's
+    mtime is checked at most once per `reload_interval_s()`; a change starts a
+    background compile while requests keep using the previous allowlist.
+    `cache_clear()` drops the compiled allowlist so the next call reloads it
+    from the environment synchronously.
+    """
+
+    def __init__(self, loader: AllowlistLoader, reload_interval_s: Callable[[], float]) -> None:
+        self._loader = loader
+        self._reload_interval_s = reload_interval_s
+        self._lock = threading.Lock()
+        self._compiled: Optional[CompiledAllowlist] = None
+        self._path = ""
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._reloading = False
+        self.reloads = 0
+
+    def __call__(self) -> CompiledAllowlist:
+        compiled = self._compiled
+        if compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    self._load()
+                compiled = self._compiled
+            assert compiled is not None
+            return compiled
+        if self._path:
+            self._maybe_reload()
+        return compiled
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._compiled = None
+            self._path = ""
+            self._mtime = None
+
+    def _load(self) -> None:
+        entries, path = self._loader()
+        mtime = _file_mtime(path) if path else None
+        self._compiled = CompiledAllowlist(entries)
+        self._path = path
+        self._mtime = mtime
+        self._next_check = time.monotonic() + self._reload_interval_s()
+
+    def _maybe_reload(self) -> None:
+        interval = self._reload_interval_s()
+        now = time.monotonic()
+        if interval <= 0 or now < self._next_check or self._reloading:
+            return
+        with self._lock:
+            if self._reloading or now < self._next_check:
+                return
+            self._next_check = now + interval
+            if _file_mtime(self._path) == self._mtime:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name="allowlist-reload", daemon=True).start()
+
+    def _reload(self) -> None:
+        try:
+            entries, path = self._loader()
+            mtime = _file_mtime(path) if path else None
+            compiled = CompiledAllowlist(entries)
+            with self._lock:
+                if self._compiled is not None:
+                    self._compiled = compiled
+                    self._path = path
+                    self._mtime = mtime
+                    self.reloads += 1
+        except Exception:  # noqa: BLE001
+            # Keep serving the previous allowlist; the next interval retries.
+            pass
+        finally:
+            self._reloading = False
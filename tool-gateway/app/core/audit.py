@@ -1,7 +1,15 @@
+import asyncio
 import json
 import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Set, TextIO
+
+_STOP = object()
 
 
 def _now_iso() -> str:
@@ -12,12 +20,213 @@ def _audit_path() -> str:
     return os.getenv("AUDIT_LOG_PATH", "").strip()
 
 
+def _async_enabled() -> bool:
+    return os.getenv("AUDIT_ASYNC", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _queue_size() -> int:
+    return max(1, int(os.getenv("AUDIT_QUEUE_SIZE", "10000")))
+
+
+def _batch_lines() -> int:
+    return max(1, int(os.getenv("AUDIT_BATCH_LINES", "256")))
+
+
+def _flush_interval_s() -> float:
+    return max(0.001, float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "200")) / 1000.0)
+
+
+def _overflow_block_s() -> float:
+    # AUDIT_OVERFLOW=block waits up to AUDIT_BLOCK_MS for queue space before dropping.
+    if os.getenv("AUDIT_OVERFLOW", "drop").strip().lower() != "block":
+        return 0.0
+    return max(0.0, float(os.getenv("AUDIT_BLOCK_MS", "50")) / 1000.0)
+
+
+class AsyncAuditWriter:
+    """
+    Background JSONL writer for audit events.
+
+    Request handlers only enqueue pre-serialized lines; a daemon thread keeps
+    one file handle open and writes batches, flushing when `batch_lines` lines
+    are pending or `flush_interval_s` has passed. The queue is bounded: when it
+    is full an event is dropped and counted. With the block policy (`block_s`),
+    it first waits up to `block_s` for space; a call from the event loop hands
+    that wait to a helper thread so the loop itself never blocks.
+    """
+
+    def __init__(self, path: str, *, max_queue: int, batch_lines: int, flush_interval_s: float, block_s: float) -> None:
+        self.path = path
+        self.batch_lines = batch_lines
+        self.flush_interval_s = flush_interval_s
+        self.block_s = block_s
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._max_handoffs = max_queue
+        self._handoffs: Set["Future[bool]"] = set()
+        self._handoff_lock = threading.Lock()
+        self._handoff_pool: ThreadPoolExecutor | None = None
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, line: str) -> bool:
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            if self.block_s <= 0:
+                self.dropped += 1
+                return False
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return self._put_blocking(line)
+            return self._hand_off(line)
+        self.queued += 1
+        return True
+
+    def _put_blocking(self, line: str) -> bool:
+        try:
+            self._queue.put(line, timeout=self.block_s)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.queued += 1
+        return True
+
+    def _hand_off(self, line: str) -> bool:
+        with self._handoff_lock:
+            if len(self._handoffs) >= self._max_handoffs:
+                self.dropped += 1
+                return False
+            if self._handoff_pool is None:
+                self._handoff_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-overflow")
+            future = self._handoff_pool.submit(self._put_blocking, line)
+            self._handoffs.add(future)
+        future.add_done_callback(self._handoff_done)
+        return True
+
+    def _handoff_done(self, future: "Future[bool]") -> None:
+        with self._handoff_lock:
+            self._handoffs.discard(future)
+
+    def flush(self) -> None:
+        """Block until every line submitted so far is written or dropped."""
+        with self._handoff_lock:
+            pending = list(self._handoffs)
+        wait(pending)
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._handoff_pool is not None:
+            self._handoff_pool.shutdown(wait=True)
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "async",
+            "queued": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": self._queue.qsize(),
+            "write_errors": self.write_errors,
+        }
+
+    def _open(self) -> TextIO:
+        if self.path:
+            return open(self.path, "a", encoding="utf-8")
+        return sys.stdout
+
+    def _write(self, handle: TextIO, batch: List[str]) -> None:
+        try:
+            handle.write("\n".join(batch))
+            handle.write("\n")
+            handle.flush()
+            self.written += len(batch)
+        except Exception:  # noqa: BLE001
+            self.write_errors += 1
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self) -> None:
+        try:
+            handle = self._open()
+        except Exception:  # noqa: BLE001
+            handle = sys.stdout
+        batch: List[str] = []
+        deadline = time.monotonic() + self.flush_interval_s
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                if batch:
+                    self._write(handle, batch)
+                self._queue.task_done()
+                break
+            if item is not None:
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_lines or time.monotonic() >= deadline or self._queue.empty()):
+                self._write(handle, batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval_s
+        if handle is not sys.stdout:
+            handle.close()
+
+
+_writer: AsyncAuditWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def _async_writer(path: str) -> AsyncAuditWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None or _writer.path != path:
+            if _writer is not None:
+                _writer.close()
+            _writer = AsyncAuditWriter(
+                path,
+                max_queue=_queue_size(),
+                batch_lines=_batch_lines(),
+                flush_interval_s=_flush_interval_s(),
+                block_s=_overflow_block_s(),
+            )
+        return _writer
+
+
+def flush_audit_sink() -> None:
+    if _writer is not None:
+        _writer.flush()
+
+
+def shutdown_audit_sink() -> None:
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+def audit_sink_stats() -> Dict[str, Any]:
+    if _writer is None:
+        return {"mode": "async" if _async_enabled() else "sync"}
+    return _writer.stats()
+
+
 def emit_tool_event(event: Dict[str, Any]) -> None:
     """
     Emit a single JSONL audit event.
 
     Default sink: stdout.
     Optional sink: append to AUDIT_LOG_PATH.
+    With AUDIT_ASYNC enabled, events are queued to a background batched writer
+    instead of being written on the request path.
 
     Audit logging must never break tool execution; failures are swallowed.
     """
@@ -26,6 +235,9 @@ def emit_tool_event(event: Dict[str, Any]) -> None:
 
     try:
         path = _audit_path()
+        if _async_enabled():
+            _async_writer(path).submit(line)
+            return
         if path:
             with open(path, "a", encoding="utf-8") as f:
                 f.write(line)
@@ -39,4 +251,3 @@ def emit_tool_event(event: Dict[str, Any]) -> None:
             print(line, flush=True)
         except Exception:  # noqa: BLE001
             return
-
@@ -0,0 +1,202 @@
+import random
+import time
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Collection, Dict, List, Set, Tuple
+from urllib.parse import urlparse
+
+from app.core.http import BACKEND_N8N, CircuitOpenError, breakers, is_upstream_failure, upstream_key
+from app.core.policy import get_n8n_endpoints, get_tool_backend_chain
+
+BACKEND_LOCAL = "local"
+
+BALANCE_WEIGHTED = "weighted"
+BALANCE_LATENCY = "latency"
+
+# Weight of the newest sample in an endpoint's moving-average latency.
+_EWMA_ALPHA = 0.3
+
+Executor = Callable[[Any], Awaitable[Any]]
+
+
+@dataclass
+class Endpoint:
+    """One n8n webhook URL with its weight and live load/latency figures."""
+
+    url: str
+    weight: float = 1.0
+    inflight: int = 0
+    selected: int = 0
+    ewma_ms: float | None = None
+
+    def observe(self, latency_ms: float) -> None:
+        if self.ewma_ms is None:
+            self.ewma_ms = latency_ms
+        else:
+            self.ewma_ms += _EWMA_ALPHA * (latency_ms - self.ewma_ms)
+
+    def score(self) -> float:
+        # Expected wait per unit of weight; unmeasured endpoints score 0 so they get tried.
+        return (self.inflight + 1) * (self.ewma_ms or 0.0) / self.weight
+
+    def available(self) -> bool:
+        return breakers.get(upstream_key(BACKEND_N8N, self.url)).is_available()
+
+    def stats(self) -> Dict[str, Any]:
+        parsed = urlparse(self.url)
+        return {
+            "endpoint": parsed.netloc,
+            "weight": self.weight,
+            "inflight": self.inflight,
+            "selected": self.selected,
+            "latency_ewma_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+        }
+
+
+class EndpointPool:
+    """
+    Load balancer over the n8n webhook URLs configured for one tool.
+
+    Endpoints whose circuit is open are skipped while any other is available.
+    `weighted` picks at random in proportion to weight; `latency` draws two
+    weighted candidates and keeps the one with the lower in-flight-scaled
+    latency, so a slow instance sheds load without being starved of probes.
+    """
+
+    def __init__(self, endpoints: List[Tuple[str, float]]) -> None:
+        self.endpoints = [Endpoint(url, weight) for url, weight in endpoints]
+        self._by_url = {endpoint.url: endpoint for endpoint in self.endpoints}
+
+    def pick(self, mode: str, exclude: Collection[str] = ()) -> Endpoint:
+        available = [endpoint for endpoint in self.endpoints if endpoint.available()] or self.endpoints
+        candidates = [endpoint for endpoint in available if endpoint.url not in exclude] or available
+        chosen = self._weighted_choice(candidates)
+        if mode == BALANCE_LATENCY and len(candidates) > 1:
+            other = self._weighted_choice([endpoint for endpoint in candidates if endpoint is not chosen])
+            if other.score() < chosen.score():
+                chosen = other
+        chosen.selected += 1
+        return chosen
+
+    @staticmethod
+    def _weighted_choice(candidates: List[Endpoint]) -> Endpoint:
+        if len(candidates) == 1:
+            return candidates[0]
+        return random.choices(candidates, weights=[endpoint.weight for endpoint in candidates])[0]
+
+    @asynccontextmanager
+    async def track(self, endpoint: Endpoint) -> AsyncIterator[None]:
+        """Count a call against the endpoint and feed its latency (failures included) into the average."""
+        endpoint.inflight += 1
+        started = time.perf_counter()
+        completed = False
+        try:
+            yield
+            completed = True
+        except Exception:
+            completed = True
+            raise
+        finally:
+            endpoint.inflight -= 1
+            if completed:
+                endpoint.observe((time.perf_counter() - started) * 1000)
+
+    def selection(self, mode: str) -> "EndpointSelection":
+        return EndpointSelection(self, mode)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+
+class EndpointSelection:
+    """
+    Per-call view of a pool, passed to `post_json` as its endpoint selector.
+
+    Retries and hedges pick again with `exclude` (endpoints that failed or are
+    still busy for this call); `track` measures a single request.
+    """
+
+    def __init__(self, pool: EndpointPool, mode: str) -> None:
+        self._pool = pool
+        self._mode = mode
+
+    def select(self, exclude: Set[str]) -> str:
+        return self._pool.pick(self._mode, exclude).url
+
+    def track(self, url: str) -> AsyncContextManager[None]:
+        endpoint = self._pool._by_url.get(url)  # noqa: SLF001
+        return self._pool.track(endpoint) if endpoint is not None else nullcontext()
+
+
+def is_failover_error(exc: BaseException) -> bool:
+    """Errors that say the backend is unhealthy, as opposed to the request being bad."""
+    return isinstance(exc, CircuitOpenError) or is_upstream_failure(exc)
+
+
+class BackendRegistry:
+    """
+    Tool execution backends and the per-tool order they are tried in.
+
+    Executors are registered per (tool, backend) and receive the caller's call
+    object, which must have `backend` and `fallback_from` attributes. The chain
+    comes from `get_tool_backend_chain(tool)`; backends without an executor for
+    the tool are skipped. When an executor fails with `is_failover_error`, the
+    next backend in the chain is tried; the last error is re-raised.
+    """
+
+    def __init__(self) -> None:
+        self._executors: Dict[Tuple[str, str], Executor] = {}
+        self._pools: Dict[str, Tuple[List[Tuple[str, float]], EndpointPool]] = {}
+        self.failovers: Dict[str, int] = {}
+
+    def register(self, tool: str, backend: str, executor: Executor) -> None:
+        self._executors[(tool, backend)] = executor
+
+    def primary(self, tool: str) -> str:
+        return get_tool_backend_chain(tool)[0]
+
+    def chain(self, tool: str) -> List[Tuple[str, Executor]]:
+        return [
+            (backend, self._executors[(tool, backend)])
+            for backend in get_tool_backend_chain(tool)
+            if (tool, backend) in self._executors
+        ]
+
+    async def execute(self, tool: str, call: Any) -> Any:
+        chain = self.chain(tool)
+        if not chain:
+            raise LookupError(f"No backend configured for {tool}.")
+        for backend, executor in chain[:-1]:
+            call.backend = backend
+            try:
+                return await executor(call)
+            except Exception as exc:
+                if not is_failover_error(exc):
+                    raise
+                call.fallback_from = backend
+                key = f"{tool}:{backend}"
+                self.failovers[key] = self.failovers.get(key, 0) + 1
+        call.backend, executor = chain[-1]
+        return await executor(call)
+
+    def endpoints(self, tool: str) -> EndpointPool:
+        """The tool's n8n endpoint pool, rebuilt when its configuration changes."""
+        config = get_n8n_endpoints(tool)
+        current = self._pools.get(tool)
+        if current is None or current[0] != config:
+            current = self._pools[tool] = (config, EndpointPool(config))
+        return current[1]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chains": {tool: get_tool_backend_chain(tool) for tool in sorted({tool for tool, _ in self._executors})},
+            "n8n_endpoints": {tool: pool.stats() for tool, (_, pool) in self._pools.items()},
+            "failovers": dict(self.failovers),
+        }
+
+    def clear(self) -> None:
+        self._pools.clear()
+        self.failovers.clear()
+
+
+backend_registry = BackendRegistry()
@@ -0,0 +1,174 @@
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Tuple
+
+# Host and agent keys come from requests; keep the registry bounded.
+_MAX_TRACKED_BULKHEADS = 1024
+
+
+class ConcurrencyLimited(Exception):
+    """A bulkhead's wait queue was full, so the call was rejected without waiting."""
+
+    # No upstream attempt was made.
+    attempts = 0
+
+    def __init__(self, scope: str, key: str, limit: int, queue_max: int) -> None:
+        super().__init__(f"Concurrency limit reached for {key}.")
+        self.scope = scope
+        self.key = key
+        self.limit = limit
+        self.queue_max = queue_max
+
+
+@dataclass
+class BulkheadStats:
+    admitted: int = 0
+    queued: int = 0
+    rejected: int = 0
+    peak_in_flight: int = 0
+
+
+class Bulkhead:
+    """
+    Async semaphore with a bounded FIFO wait queue.
+
+    A released slot is handed straight to the oldest waiter. Waiters are plain
+    futures on the running loop, so one instance serves any event loop.
+    """
+
+    def __init__(self, limit: int, queue_max: int) -> None:
+        self.limit = limit
+        self.queue_max = queue_max
+        self.in_flight = 0
+        self.stats = BulkheadStats()
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting if needed; False when the wait queue is already full."""
+        if self.in_flight < self.limit and not self._waiters:
+            self._admit()
+            return True
+        if len(self._waiters) >= self.queue_max:
+            self.stats.rejected += 1
+            return False
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats.queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation.
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+        self.stats.admitted += 1
+        return True
+
+    def release(self) -> None:
+        # Hand the slot over unless the limit was lowered below what is in flight.
+        if self.in_flight <= self.limit and self._hand_over():
+            return
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def resize(self, limit: int, queue_max: int) -> None:
+        self.limit = limit
+        self.queue_max = queue_max
+        while self.in_flight < self.limit and self._hand_over():
+            self.in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.in_flight)
+
+    def _hand_over(self) -> bool:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return True
+        return False
+
+    def _admit(self) -> None:
+        self.in_flight += 1
+        self.stats.admitted += 1
+        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.in_flight)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "queue_max": self.queue_max,
+            "admitted": self.stats.admitted,
+            "queued": self.stats.queued,
+            "rejected": self.stats.rejected,
+            "peak_in_flight": self.stats.peak_in_flight,
+        }
+
+
+class BulkheadRegistry:
+    """
+    Bulkheads per tool, agent and host, created on first use.
+
+    `acquire` takes every bulkhead of a call in a fixed order (tool, agent,
+    host) so two calls never hold each other's slots; on rejection the slots
+    already taken are released before ConcurrencyLimited is raised. The
+    registry is LRU-bounded, so per-host and per-agent entries do not
+    accumulate.
+    """
+
+    def __init__(self) -> None:
+        self._bulkheads: "OrderedDict[str, Bulkhead]" = OrderedDict()
+
+    def get(self, key: str, limit: int, queue_max: int) -> Bulkhead:
+        bulkhead = self._bulkheads.get(key)
+        if bulkhead is None:
+            if len(self._bulkheads) >= _MAX_TRACKED_BULKHEADS:
+                self._evict()
+            bulkhead = self._bulkheads[key] = Bulkhead(limit, queue_max)
+        else:
+            self._bulkheads.move_to_end(key)
+            # Limits are read from the environment per call; follow changes in place.
+            bulkhead.resize(limit, queue_max)
+        return bulkhead
+
+    def _evict(self) -> None:
+        # Prefer the least recently used idle bulkhead; holders of a dropped busy one still release it.
+        victim = next(
+            (key for key, bulkhead in self._bulkheads.items() if not bulkhead.in_flight and not bulkhead.waiting),
+            None,
+        )
+        del self._bulkheads[victim if victim is not None else next(iter(self._bulkheads))]
+
+    async def acquire(self, keys: List[Tuple[str, str, int]], queue_max: int) -> List[Bulkhead]:
+        held: List[Bulkhead] = []
+        try:
+            for scope, key, limit in keys:
+                bulkhead = self.get(key, limit, queue_max)
+                if not await bulkhead.acquire():
+                    raise ConcurrencyLimited(scope, key, limit, queue_max)
+                held.append(bulkhead)
+        except BaseException:
+            self.release(held)
+            raise
+        return held
+
+    def release(self, held: List[Bulkhead]) -> None:
+        for bulkhead in reversed(held):
+            bulkhead.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: bulkhead.as_dict() for key, bulkhead in sorted(self._bulkheads.items())}
+
+    def clear(self) -> None:
+        self._bulkheads.clear()
+
+
+bulkheads = BulkheadRegistry()
@@ -0,0 +1,311 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+CACHE_REVALIDATED = "revalidated"
+CACHE_BYPASS = "bypass"
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL into a cache key.
+
+    Lowercases scheme and host, drops default ports, userinfo and fragments,
+    defaults an empty path to "/" and sorts query parameters.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    netloc = host
+    if parsed.port and parsed.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parsed.port}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, parsed.path or "/", "", query, ""))
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    content: Dict[str, Any]
+    size: int
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidated: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+    entries: int = 0
+    bytes: int = 0
+    disk_errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class _SQLiteTier:
+    """Optional on-disk tier; entries survive restarts and are shared across workers."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fetch_cache ("
+            " key TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, etag TEXT, last_modified TEXT, content_hash TEXT,"
+            " stored_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, size, expires_at, etag, last_modified, content_hash FROM fetch_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(
+            key=key,
+            content=json.loads(row[0]),
+            size=row[1],
+            expires_at=row[2],
+            etag=row[3],
+            last_modified=row[4],
+            content_hash=row[5],
+        )
+
+    def put(self, entry: CacheEntry) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fetch_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.key,
+                    json.dumps(entry.content, separators=(",", ":")),
+                    entry.size,
+                    entry.expires_at,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.content_hash,
+                    time.time(),
+                ),
+            )
+
+    def trim(self, max_bytes: int) -> None:
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM fetch_cache").fetchone()[0]
+            if total <= max_bytes:
+                return
+            excess = total - max_bytes
+            rows = self._conn.execute("SELECT key, size FROM fetch_cache ORDER BY stored_at").fetchall()
+            doomed: List[str] = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                doomed.append(key)
+                excess -= size
+            self._conn.executemany("DELETE FROM fetch_cache WHERE key = ?", [(key,) for key in doomed])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    In-process LRU+TTL cache of normalized web.fetch envelopes.
+
+    Bounded by total serialized bytes rather than entry count. Stale entries
+    are kept (until evicted) so their validators can drive conditional
+    revalidation. An optional SQLite tier backs the memory tier; entries
+    found only on disk are promoted into memory. The disk tier fails open:
+    SQLite or filesystem errors are counted in `disk_errors` and the call
+    carries on with the memory tier alone.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._sqlite: Optional[_SQLiteTier] = None
+        self.stats = CacheStats()
+
+    async def _tier(self, sqlite_path: str) -> Optional[_SQLiteTier]:
+        if not sqlite_path:
+            return None
+        if self._sqlite is None or self._sqlite.path != sqlite_path:
+            # Opening creates the file and switches it to WAL; keep that off the event loop.
+            try:
+                tier = await asyncio.to_thread(_SQLiteTier, sqlite_path)
+            except (sqlite3.Error, OSError):
+                self.stats.disk_errors += 1
+                return None
+            if self._sqlite is not None and self._sqlite.path == sqlite_path:
+                # Another call opened the same tier while this one waited.
+                tier.close()
+                return self._sqlite
+            if self._sqlite is not None:
+                self._sqlite.close()
+            self._sqlite = tier
+        return self._sqlite
+
+    async def get(self, key: str, *, sqlite_path: str = "", max_bytes: int = 0) -> Optional[CacheEntry]:
+        """Look `key` up in memory, then on disk; a disk hit that fits `max_bytes` is kept in memory."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        tier = await self._tier(sqlite_path)
+        if tier is None:
+            return None
+        try:
+            entry = await asyncio.to_thread(tier.get, key)
+        except (sqlite3.Error, OSError, ValueError):
+            # ValueError: a row whose content is not valid JSON.
+            self.stats.disk_errors += 1
+            return None
+        if entry is not None and key not in self._entries:
+            self._remember(entry, max_bytes)
+            self._update_stats()
+        return entry
+
+    def record(self, status: str) -> None:
+        if status == CACHE_HIT:
+            self.stats.hits += 1
+        elif status == CACHE_REVALIDATED:
+            self.stats.revalidated += 1
+        elif status == CACHE_MISS:
+            self.stats.misses += 1
+
+    async def put(self, entry: CacheEntry, *, max_bytes: int, sqlite_path: str = "") -> int:
+        """Store `entry`; returns how many entries were evicted to make room."""
+        evicted = self._remember(entry, max_bytes)
+        tier = await self._tier(sqlite_path)
+        if tier is not None:
+            try:
+                await asyncio.to_thread(tier.put, entry)
+                await asyncio.to_thread(tier.trim, max_bytes)
+            except (sqlite3.Error, OSError):
+                self.stats.disk_errors += 1
+        self._update_stats()
+        return evicted
+
+    def _remember(self, entry: CacheEntry, max_bytes: int) -> int:
+        evicted = 0
+        if entry.size <= max_bytes:
+            previous = self._entries.pop(entry.key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[entry.key] = entry
+            self._bytes += entry.size
+            while self._bytes > max_bytes and self._entries:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= dropped.size
+                self.stats.evictions += 1
+                self.stats.evicted_bytes += dropped.size
+                evicted += 1
+        return evicted
+
+    def _update_stats(self) -> None:
+        self.stats.entries = len(self._entries)
+        self.stats.bytes = self._bytes
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        self.stats = CacheStats()
+        if self._sqlite is not None:
+            self._sqlite.close()
+            self._sqlite = None
+
+
+response_cache = ResponseCache()
+
+
+@dataclass
+class Validators:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class ValidatorStats:
+    conditional_sent: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    entries: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class ValidatorStore:
+    """
+    LRU map of canonical URL to the last seen ETag, Last-Modified and content_hash.
+
+    Independent of the TTL cache: validators are a few hundred bytes per URL,
+    so they are kept for far more pages than full envelopes, and let a caller
+    holding a content_hash poll without pulling the body again.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[str, Validators]" = OrderedDict()
+        self.stats = ValidatorStats()
+
+    def get(self, key: str) -> Optional[Validators]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, validators: Validators, *, max_entries: int) -> None:
+        self._entries.pop(key, None)
+        if max_entries <= 0:
+            return
+        self._entries[key] = validators
+        while len(self._entries) > max_entries:
+            self._entries.popitem(last=False)
+        self.stats.entries = len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.stats = ValidatorStats()
+
+
+validator_store = ValidatorStore()
@@ -0,0 +1,87 @@
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Dict
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_content_hash(value: str) -> bool:
+    return bool(_HASH_RE.match(value))
+
+
+@dataclass
+class ContentStoreStats:
+    objects_written: int = 0
+    bytes_written: int = 0
+    dedup_hits: int = 0
+    bytes_deduplicated: int = 0
+    write_errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class ContentStore:
+    """
+    Content-addressed store for extracted page text, keyed by sha256 `content_hash`.
+
+    Objects live at `<root>/<hash[:2]>/<hash>` and are written once via a temp
+    file and rename, so the same text fetched from many URLs, or fetched again
+    on every research run, is stored a single time. Callers pass the root
+    directory on each call so it follows CONTENT_STORE_DIR.
+    """
+
+    def __init__(self) -> None:
+        self.stats = ContentStoreStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path(root: str, content_hash: str) -> str:
+        if not is_content_hash(content_hash):
+            raise ValueError("content_hash must be 64 lowercase hex characters")
+        return os.path.join(root, content_hash[:2], content_hash)
+
+    def contains(self, root: str, content_hash: str) -> bool:
+        return os.path.exists(self.path(root, content_hash))
+
+    def put(self, root: str, content_hash: str, text: str) -> bool:
+        """Store `text` unless an object with this hash exists; returns True when written."""
+        target = self.path(root, content_hash)
+        data = text.encode("utf-8")
+        if os.path.exists(target):
+            with self._lock:
+                self.stats.dedup_hits += 1
+                self.stats.bytes_deduplicated += len(data)
+            return False
+        directory = os.path.dirname(target)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(data)
+                os.replace(tmp_path, target)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            with self._lock:
+                self.stats.write_errors += 1
+            return False
+        with self._lock:
+            self.stats.objects_written += 1
+            self.stats.bytes_written += len(data)
+        return True
+
+    def get(self, root: str, content_hash: str) -> str | None:
+        try:
+            with open(self.path(root, content_hash), "rb") as handle:
+                return handle.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+
+content_store = ContentStore()
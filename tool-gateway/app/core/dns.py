@@ -0,0 +1,196 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Tuple
+
+import httpcore
+
+from app.core.policy import (
+    get_block_private_addresses,
+    get_dns_cache_max_entries,
+    get_dns_cache_ttl_s,
+    get_dns_negative_ttl_s,
+    load_allowlist,
+)
+from app.core.singleflight import SingleFlight
+
+
+class AddressBlockedError(Exception):
+    """A fetch target resolved to a private, loopback or otherwise non-public address."""
+
+    def __init__(self, hostname: str, address: str) -> None:
+        super().__init__(f"{hostname} resolves to non-public address {address}.")
+        self.hostname = hostname
+        self.address = address
+
+
+@dataclass
+class DNSStats:
+    hits: int = 0
+    misses: int = 0
+    negative_hits: int = 0
+    failures: int = 0
+    blocked: int = 0
+    warmed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class _Entry:
+    addresses: Tuple[str, ...]
+    expires_at: float
+    # Computed once per resolution so the SSRF check is free on cache hits.
+    public: bool
+    error: str | None = None
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _literal(host: str) -> str | None:
+    try:
+        return str(ipaddress.ip_address(host.strip("[]")))
+    except ValueError:
+        return None
+
+
+class DNSCache:
+    """
+    Async hostname -> addresses cache in front of the system resolver.
+
+    Lookups run through `loop.getaddrinfo`; concurrent lookups of one host
+    share a single resolution. Successful answers are kept for
+    DNS_CACHE_TTL_S and failures for DNS_NEGATIVE_TTL_S, LRU-bounded by
+    DNS_CACHE_MAX_ENTRIES. The system resolver does not expose record TTLs,
+    so the configured TTL is an upper bound on how stale an answer can be.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._flights = SingleFlight()
+        self.stats = DNSStats()
+
+    async def resolve(self, host: str, *, guard: bool = False) -> Tuple[str, ...]:
+        """
+        Return the addresses for `host`, raising OSError when it does not resolve.
+
+        With `guard`, a host with any non-public address raises
+        AddressBlockedError unless the host is allowlisted by exact name or
+        that address is allowlisted by IP or CIDR.
+        """
+        literal = _literal(host)
+        if literal is not None:
+            entry = _Entry((literal,), float("inf"), is_public_address(literal))
+        else:
+            entry = await self._lookup(host.lower().rstrip("."))
+        if entry.error is not None:
+            raise socket.gaierror(socket.EAI_NONAME, entry.error)
+        if guard and not entry.public and get_block_private_addresses():
+            self._check(host, entry.addresses)
+        return entry.addresses
+
+    def _check(self, host: str, addresses: Iterable[str]) -> None:
+        allowlist = load_allowlist()
+        if allowlist.lists_host(host):
+            # Named explicitly (e.g. a compose service such as `ollama`); wildcards do not exempt.
+            return
+        for address in addresses:
+            if not is_public_address(address) and not allowlist.matches_address(address):
+                self.stats.blocked += 1
+                raise AddressBlockedError(host, address)
+
+    async def _lookup(self, host: str) -> _Entry:
+        entry = self._entries.get(host)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self._entries.move_to_end(host)
+            if entry.error is None:
+                self.stats.hits += 1
+            else:
+                self.stats.negative_hits += 1
+            return entry
+        self.stats.misses += 1
+        return await self._flights.do(host, lambda: self._resolve(host))
+
+    async def _resolve(self, host: str) -> _Entry:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except OSError as exc:
+            self.stats.failures += 1
+            entry = _Entry((), time.monotonic() + get_dns_negative_ttl_s(), False, str(exc) or "lookup failed")
+        else:
+            addresses = tuple(dict.fromkeys(str(info[4][0]) for info in infos))
+            entry = _Entry(
+                addresses,
+                time.monotonic() + get_dns_cache_ttl_s(),
+                all(is_public_address(address) for address in addresses),
+            )
+        if entry.expires_at > time.monotonic():
+            self._entries[host] = entry
+            self._entries.move_to_end(host)
+            while len(self._entries) > get_dns_cache_max_entries():
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.stats = DNSStats()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.stats.as_dict(), "entries": len(self._entries)}
+
+
+dns_cache = DNSCache()
+
+
+class ResolvingBackend(httpcore.AsyncNetworkBackend):
+    """
+    httpcore network backend that connects to addresses from `dns_cache`.
+
+    The origin hostname is still used for TLS SNI and certificate checks.
+    With `guard` (direct web fetches), every new connection, including each
+    redirect hop, goes through the private-address check.
+    """
+
+    def __init__(self, inner: httpcore.AsyncNetworkBackend, *, guard: bool) -> None:
+        self._inner = inner
+        self._guard = guard
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable[Any] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await dns_cache.resolve(host, guard=self._guard)
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        error: Exception | None = None
+        for address in addresses:
+            try:
+                return await self._inner.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except httpcore.ConnectError as exc:
+                # Try the next address, as getaddrinfo-based connects do.
+                error = exc
+        raise error or httpcore.ConnectError(f"No addresses for {host}.")
+
+    async def connect_unix_socket(
+        self, path: str, timeout: float | None = None, socket_options: Iterable[Any] | None = None
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._inner.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._inner.sleep(seconds)
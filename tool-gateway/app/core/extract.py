@@ -0,0 +1,156 @@
+import re
+from html import unescape
+from typing import List, Tuple
+
+MAX_EXTRACTED_CHARS = 12000
+
+_tag_name_re = re.compile(r"</?([a-zA-Z][a-zA-Z0-9:-]*)")
+_skip_close_res = {tag: re.compile(rf"</{tag}\s*>", re.IGNORECASE) for tag in ("script", "style")}
+# Longest tail kept back while looking for a closing </script> or </style>.
+_SKIP_TAIL_CHARS = 16
+# Longest trailing "&..." kept back so a character reference split across chunks decodes.
+_ENTITY_TAIL_CHARS = 32
+
+
+class TextExtractor:
+    """
+    Single-pass, incremental HTML-to-text extractor.
+
+    A small hand-written scanner (str.find over tag boundaries) rather than
+    html.parser, which is several times slower per byte. Feed decoded HTML in
+    any chunking; the extractor drops script/style content, captures the first
+    <title>, collapses whitespace as it goes and reports `finished` once
+    `max_chars` of normalized text are collected so callers can stop feeding
+    (and stop downloading) early.
+    """
+
+    def __init__(self, max_chars: int = MAX_EXTRACTED_CHARS) -> None:
+        self.max_chars = max_chars
+        self._buffer = ""
+        self._parts: List[str] = []
+        self._length = 0
+        self._pending_space = False
+        self._skip_tag: str | None = None
+        self._in_title = False
+        self._title_seen = False
+        self._title_parts: List[str] = []
+        self._text_done = False
+
+    @property
+    def finished(self) -> bool:
+        return self._text_done and not self._in_title
+
+    @property
+    def title(self) -> str:
+        return " ".join("".join(self._title_parts).split())
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, data: str) -> None:
+        self._scan(data, final=False)
+
+    def close(self) -> None:
+        self._scan("", final=True)
+
+    def _scan(self, data: str, *, final: bool) -> None:
+        buf = self._buffer + data if self._buffer else data
+        pos = 0
+        end = len(buf)
+        while pos < end and not self.finished:
+            if self._skip_tag is not None:
+                match = _skip_close_res[self._skip_tag].search(buf, pos)
+                if match is None:
+                    pos = max(pos, end - _SKIP_TAIL_CHARS)
+                    break
+                self._skip_tag = None
+                self._pending_space = True
+                pos = match.end()
+                continue
+
+            lt = buf.find("<", pos)
+            if lt == -1:
+                stop = end
+                if not final:
+                    amp = buf.rfind("&", pos)
+                    if amp != -1 and end - amp < _ENTITY_TAIL_CHARS and ";" not in buf[amp:]:
+                        stop = amp
+                self._handle_data(buf[pos:stop])
+                pos = stop
+                break
+            if lt > pos:
+                self._handle_data(buf[pos:lt])
+
+            nxt = buf[lt + 1 : lt + 2]
+            if nxt == "!" and buf.startswith("<!--", lt):
+                close = buf.find("-->", lt + 4)
+                if close == -1:
+                    pos = lt
+                    break
+                self._pending_space = True
+                pos = close + 3
+                continue
+            if not (nxt.isalpha() or nxt in ("/", "!", "?")):
+                if not nxt and not final:
+                    pos = lt
+                    break
+                # A bare "<" (e.g. "a < b") is text, not markup.
+                self._handle_data("<")
+                pos = lt + 1
+                continue
+
+            gt = buf.find(">", lt + 1)
+            if gt == -1:
+                pos = lt if not final else end
+                break
+            match = _tag_name_re.match(buf, lt)
+            if match is not None:
+                self._handle_tag(match.group(1).lower(), closing=nxt == "/", self_closing=buf[gt - 1] == "/")
+            self._pending_space = True
+            pos = gt + 1
+
+        self._buffer = "" if self.finished or final else buf[pos:]
+
+    def _handle_tag(self, name: str, *, closing: bool, self_closing: bool) -> None:
+        if closing:
+            if name == "title" and self._in_title:
+                self._in_title = False
+                self._title_seen = True
+        elif name in _skip_close_res:
+            if not self_closing:
+                self._skip_tag = name
+        elif name == "title" and not self._title_seen:
+            self._in_title = True
+
+    def _handle_data(self, data: str) -> None:
+        if "&" in data:
+            data = unescape(data)
+        if self._in_title:
+            self._title_parts.append(data)
+        if self._text_done:
+            return
+        words = data.split()
+        if not words:
+            if data:
+                self._pending_space = True
+            return
+        chunk = " ".join(words)
+        if self._length and (self._pending_space or data[0].isspace()):
+            chunk = " " + chunk
+        self._pending_space = data[-1].isspace()
+        remaining = self.max_chars - self._length
+        if len(chunk) >= remaining:
+            chunk = chunk[:remaining]
+            self._text_done = True
+        self._parts.append(chunk)
+        self._length += len(chunk)
+
+
+def extract(html: str, max_chars: int = MAX_EXTRACTED_CHARS) -> Tuple[str, str]:
+    """Return `(title, text)` for an already-decoded document."""
+    extractor = TextExtractor(max_chars=max_chars)
+    extractor.feed(html)
+    if not extractor.finished:
+        extractor.close()
+    return extractor.title, extractor.text
@@ -1,8 +1,48 @@
-import re
-from dataclasses import dataclass
+import asyncio
+import importlib.util
+import json
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, Deque, Dict, List, Protocol, Set
+from urllib.parse import urlparse
 
 import httpx
 
+from app.core.dns import ResolvingBackend, dns_cache
+from app.core.extract import TextExtractor
+from app.core.policy import (
+    get_adaptive_timeout_enabled,
+    get_adaptive_timeout_min_ms,
+    get_adaptive_timeout_multiplier,
+    get_circuit_breaker_enabled,
+    get_circuit_failure_threshold,
+    get_circuit_half_open_probes,
+    get_circuit_open_s,
+    get_http2_enabled,
+    get_http_keepalive_enabled,
+    get_http_keepalive_expiry_s,
+    get_http_max_connections,
+    get_http_max_keepalive_connections,
+    get_n8n_endpoints,
+    get_n8n_hedge_enabled,
+    get_n8n_retry_backoff_ms,
+    get_n8n_retry_budget_percent,
+    get_n8n_retry_max_attempts,
+    get_timeout_ms,
+    get_tool_backend_chain,
+    load_allowlist,
+)
+from app.core.sniff import BodyDecoder, is_text_content_type, media_type
+
+logger = logging.getLogger(__name__)
+
+BACKEND_WEB = "web"
+BACKEND_N8N = "n8n"
+
 
 @dataclass
 class FetchResult:
@@ -10,40 +50,616 @@ class FetchResult:
     status_code: int
     title: str
     extracted_text: str
+    bytes_read: int = 0
+    truncated: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+    content_type: str | None = None
+    charset: str | None = None
+    phases: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class JsonResult:
+    data: dict
+    bytes_read: int
+    phases: Dict[str, float] = field(default_factory=dict)
+    attempts: int = 1
+    hedged: bool = False
+    endpoint: str | None = None
+
+
+# httpcore trace events (minus the http11./http2. prefix) -> upstream phase names.
+_TRACE_PHASES = {
+    "connection.connect_tcp": "upstream_connect",
+    "connection.start_tls": "upstream_tls",
+    "receive_response_headers": "upstream_ttfb",
+}
+
+
+class PhaseTrace:
+    """
+    httpcore `trace` extension callback that times connection setup and TTFB.
+
+    `phases` maps phase name to milliseconds. Connect and TLS are absent when
+    a pooled connection was reused.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self._started: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name.startswith(("http11.", "http2.")):
+            event_name = event_name.split(".", 1)[1]
+        name, _, stage = event_name.rpartition(".")
+        phase = _TRACE_PHASES.get(name)
+        if phase is None:
+            return
+        if stage == "started":
+            self._started[phase] = time.perf_counter()
+        elif stage == "complete" and phase in self._started:
+            elapsed = (time.perf_counter() - self._started.pop(phase)) * 1000
+            self.phases[phase] = round(self.phases.get(phase, 0.0) + elapsed, 3)
+
+
+def _h2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
 
 
-_title_re = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
-_tag_re = re.compile(r"<[^>]+>")
-_space_re = re.compile(r"\s+")
+def _http2() -> bool:
+    if not get_http2_enabled():
+        return False
+    if _h2_available():
+        return True
+    logger.warning("HTTP2_ENABLED is set but the h2 package is not installed; using HTTP/1.1.")
+    return False
 
 
-def _extract_title(html: str) -> str:
-    match = _title_re.search(html)
-    if not match:
-        return ""
-    return _space_re.sub(" ", match.group(1)).strip()
+def _install_resolver(client: httpx.AsyncClient, *, guard: bool) -> None:
+    # httpx has no resolver hook; swap the httpcore pool's network backend defensively.
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    inner = getattr(pool, "_network_backend", None)
+    if inner is not None and not isinstance(inner, ResolvingBackend):
+        pool._network_backend = ResolvingBackend(inner, guard=guard)  # noqa: SLF001
 
 
-def _extract_text(content: str) -> str:
-    without_tags = _tag_re.sub(" ", content)
-    normalized = _space_re.sub(" ", without_tags).strip()
-    return normalized[:12000]
+def _pool_stats(client: httpx.AsyncClient) -> Dict[str, int]:
+    # httpx does not expose pool occupancy publicly; read the httpcore pool defensively.
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = 0
+    for connection in connections:
+        try:
+            idle += 1 if connection.is_idle() else 0
+        except Exception:  # noqa: BLE001
+            continue
+    return {
+        "connections": len(connections),
+        "idle": idle,
+        "active": len(connections) - idle,
+        "queued": len(getattr(pool, "_requests", []) or []),
+    }
 
 
-async def fetch_url(url: str, timeout_ms: int, max_bytes: int, user_agent: str) -> FetchResult:
-    timeout = httpx.Timeout(timeout_ms / 1000.0)
-    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True, headers={"User-Agent": user_agent}) as client:
-        response = await client.get(url)
-        body_bytes = response.content[:max_bytes]
-        text = body_bytes.decode("utf-8", errors="ignore")
-        title = _extract_title(text)
-        extracted_text = _extract_text(text)
-        return FetchResult(
-            final_url=str(response.url),
-            status_code=response.status_code,
-            title=title,
-            extracted_text=extracted_text,
+class ClientRegistry:
+    """
+    Gateway-lifetime httpx clients, one pooled client per upstream backend.
+
+    Opened on application startup and closed on shutdown. Clients are created
+    lazily as well so code paths that run without the ASGI lifespan (tests,
+    scripts) still share connections.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._requests: Dict[str, int] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _build(self, backend: str) -> httpx.AsyncClient:
+        keepalive = get_http_keepalive_enabled()
+        limits = httpx.Limits(
+            max_connections=get_http_max_connections(backend),
+            max_keepalive_connections=get_http_max_keepalive_connections(backend) if keepalive else 0,
+            keepalive_expiry=get_http_keepalive_expiry_s() if keepalive else 0.0,
+        )
+        client = httpx.AsyncClient(
+            limits=limits,
+            http2=_http2(),
+            follow_redirects=backend == BACKEND_WEB,
+            timeout=httpx.Timeout(get_timeout_ms() / 1000.0),
         )
+        _install_resolver(client, guard=backend == BACKEND_WEB)
+        return client
+
+    def _ensure(self, backend: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Pooled connections belong to the event loop that opened them.
+            self._retire(list(self._clients.values()))
+            self._clients = {}
+            self._loop = loop
+        client = self._clients.get(backend)
+        if client is None or client.is_closed:
+            client = self._build(backend)
+            self._clients[backend] = client
+        return client
+
+    def _retire(self, clients: List[httpx.AsyncClient]) -> None:
+        old = self._loop
+        clients = [client for client in clients if not client.is_closed]
+        if not clients or old is None:
+            return
+        if old.is_running() and not old.is_closed():
+            for client in clients:
+                asyncio.run_coroutine_threadsafe(client.aclose(), old)
+            return
+        # A stopped loop cannot run aclose(); the sockets go with the clients.
+        logger.warning("Dropping %d pooled HTTP client(s) left open by a stopped event loop.", len(clients))
+
+    def get(self, backend: str) -> httpx.AsyncClient:
+        client = self._ensure(backend)
+        self._requests[backend] = self._requests.get(backend, 0) + 1
+        return client
+
+    async def startup(self) -> None:
+        for backend in (BACKEND_WEB, BACKEND_N8N):
+            self._ensure(backend)
+
+    async def warm_up(self, hosts: int) -> Dict[str, int]:
+        """
+        Resolve and pre-connect the first `hosts` allowlisted hostnames and the n8n webhook hosts.
+
+        Each target gets a HEAD request so a pooled keep-alive connection (TCP
+        and TLS) is ready for the first real call. Failures are ignored.
+        """
+        targets = [(BACKEND_WEB, f"https://{host}/") for host in load_allowlist().hosts[:hosts]]
+        n8n_urls = {
+            url
+            for tool in ("web.fetch", "web.search")
+            if BACKEND_N8N in get_tool_backend_chain(tool)
+            for url, _weight in get_n8n_endpoints(tool)
+        }
+        targets += [(BACKEND_N8N, url) for url in sorted(n8n_urls)]
+
+        async def _preconnect(backend: str, url: str) -> bool:
+            try:
+                await self._ensure(backend).head(url, timeout=httpx.Timeout(get_timeout_ms() / 1000.0))
+            except Exception:  # noqa: BLE001
+                return False
+            return True
+
+        results = await asyncio.gather(*[_preconnect(backend, url) for backend, url in targets])
+        dns_cache.stats.warmed += sum(results)
+        return {"targets": len(targets), "connected": sum(results)}
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients = {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception:  # noqa: BLE001
+                continue
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        stats: Dict[str, Dict[str, Any]] = {}
+        for backend, client in self._clients.items():
+            stats[backend] = {
+                "requests": self._requests.get(backend, 0),
+                "max_connections": get_http_max_connections(backend),
+                "keepalive": get_http_keepalive_enabled(),
+                "http2": get_http2_enabled() and _h2_available(),
+                **_pool_stats(client),
+            }
+        return stats
+
+
+client_registry = ClientRegistry()
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# Successful-call latencies kept per upstream, and how many are needed before
+# the adaptive timeout replaces the configured one.
+_LATENCY_WINDOW = 256
+_LATENCY_MIN_SAMPLES = 20
+_MAX_TRACKED_UPSTREAMS = 1024
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, upstream: str, retry_after_s: float) -> None:
+        super().__init__(f"Circuit open for upstream {upstream}.")
+        self.upstream = upstream
+        self.retry_after_s = retry_after_s
+        self.attempts = 0
+
+
+class CircuitBreaker:
+    """
+    Per-upstream breaker: closed -> open -> half-open -> closed.
+
+    Opens after `get_circuit_failure_threshold()` consecutive failures and
+    fast-fails for `get_circuit_open_s()`. Then up to
+    `get_circuit_half_open_probes()` concurrent probe calls are let through; a
+    probe success closes the circuit, a failure re-opens it. Successful call
+    latencies feed the adaptive timeout.
+    """
+
+    def __init__(self, upstream: str) -> None:
+        self.upstream = upstream
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.rejected = 0
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def before_call(self) -> None:
+        if self.state == CIRCUIT_CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == CIRCUIT_OPEN:
+            retry_after = self.opened_at + get_circuit_open_s() - now
+            if retry_after > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.upstream, retry_after)
+            self.state = CIRCUIT_HALF_OPEN
+            self.probes = 0
+        if self.probes >= get_circuit_half_open_probes():
+            self.rejected += 1
+            raise CircuitOpenError(self.upstream, get_circuit_open_s())
+        self.probes += 1
+
+    def record_success(self, latency_ms: float) -> None:
+        self._latencies.append(latency_ms)
+        self.failures = 0
+        self.state = CIRCUIT_CLOSED
+        self.probes = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or self.failures >= get_circuit_failure_threshold():
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.monotonic()
+            self.probes = 0
+
+    def is_available(self) -> bool:
+        """Whether a call would be let through now, without reserving a probe slot."""
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if self.state == CIRCUIT_OPEN:
+            return time.monotonic() >= self.opened_at + get_circuit_open_s()
+        return self.probes < get_circuit_half_open_probes()
+
+    def release(self) -> None:
+        """End a call that says nothing about upstream health (e.g. a client-side cap)."""
+        if self.state == CIRCUIT_HALF_OPEN:
+            self.probes = max(0, self.probes - 1)
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def latency_percentile(self, q: float) -> float | None:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout_ms(self, max_timeout_ms: int) -> int:
+        """Adaptive timeout: p99 latency x multiplier, within [min, max_timeout_ms]."""
+        if not get_adaptive_timeout_enabled() or self.samples < _LATENCY_MIN_SAMPLES:
+            return max_timeout_ms
+        p99 = self.latency_percentile(0.99) or 0.0
+        adaptive = max(get_adaptive_timeout_min_ms(), int(p99 * get_adaptive_timeout_multiplier()))
+        return min(max_timeout_ms, adaptive)
+
+    def stats(self, max_timeout_ms: int) -> Dict[str, Any]:
+        p50 = self.latency_percentile(0.5)
+        p99 = self.latency_percentile(0.99)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "latency_p50_ms": round(p50, 2) if p50 is not None else None,
+            "latency_p99_ms": round(p99, 2) if p99 is not None else None,
+            "timeout_ms": self.timeout_ms(max_timeout_ms),
+        }
+
+
+class BreakerRegistry:
+    """Circuit breakers keyed by upstream (`web:<host>` or `n8n:<host>`), LRU-bounded."""
+
+    def __init__(self) -> None:
+        self._breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+
+    def get(self, upstream: str) -> CircuitBreaker:
+        breaker = self._breakers.get(upstream)
+        if breaker is None:
+            # Evict before inserting so the new (closed) breaker is never the victim.
+            if len(self._breakers) >= _MAX_TRACKED_UPSTREAMS:
+                self._evict()
+            breaker = self._breakers[upstream] = CircuitBreaker(upstream)
+        else:
+            self._breakers.move_to_end(upstream)
+        return breaker
+
+    def _evict(self) -> None:
+        # Prefer forgetting the least recently used closed circuit so open ones keep failing fast;
+        # when every tracked circuit is open or half-open, drop the least recently used one anyway.
+        victim = next((key for key, breaker in self._breakers.items() if breaker.state == CIRCUIT_CLOSED), None)
+        del self._breakers[victim if victim is not None else next(iter(self._breakers))]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        max_timeout_ms = get_timeout_ms()
+        return {key: breaker.stats(max_timeout_ms) for key, breaker in self._breakers.items()}
+
+    def clear(self) -> None:
+        self._breakers.clear()
+
+
+breakers = BreakerRegistry()
+
+
+def upstream_key(backend: str, url: str) -> str:
+    return f"{backend}:{(urlparse(url).hostname or '').lower()}"
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+async def _guarded(backend: str, url: str, timeout_ms: int, call: Any) -> Any:
+    """
+    Run `call(effective_timeout_ms)` behind the upstream's circuit breaker.
+
+    Timeouts, transport errors and 5xx responses count as failures; other
+    errors (byte caps, 4xx) only release a half-open probe slot.
+    """
+    if not get_circuit_breaker_enabled():
+        return await call(timeout_ms)
+    breaker = breakers.get(upstream_key(backend, url))
+    breaker.before_call()
+    started = time.perf_counter()
+    try:
+        result = await call(breaker.timeout_ms(timeout_ms))
+    except BaseException as exc:
+        if is_upstream_failure(exc):
+            breaker.record_failure()
+        else:
+            breaker.release()
+        raise
+    if getattr(result, "status_code", 200) >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success((time.perf_counter() - started) * 1000)
+    return result
+
+
+_RETRY_BUDGET_MAX_TOKENS = 10.0
+_RETRY_BACKOFF_MAX_S = 2.0
+_RETRYABLE_STATUS = {502, 503, 504}
+
+
+class RetryBudget:
+    """
+    Token bucket that caps retries and hedges at a share of first attempts.
+
+    Every call deposits `N8N_RETRY_BUDGET_PERCENT / 100` of a token, up to
+    a small reserve; each retry or hedge spends a whole token. In a sustained
+    outage, extra load is bounded by the configured percentage.
+    """
+
+    def __init__(self) -> None:
+        self.tokens = _RETRY_BUDGET_MAX_TOKENS
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        self.tokens = min(_RETRY_BUDGET_MAX_TOKENS, self.tokens + get_n8n_retry_budget_percent() / 100.0)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1.0
+        self.retries += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tokens": round(self.tokens, 2), "retries": self.retries, "exhausted": self.exhausted}
+
+    def reset(self) -> None:
+        self.tokens = _RETRY_BUDGET_MAX_TOKENS
+        self.retries = 0
+        self.exhausted = 0
+
+
+retry_budget = RetryBudget()
+
+
+def _is_retryable(exc: BaseException, idempotent: bool) -> bool:
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True  # the request never reached the upstream
+    if not idempotent:
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRYABLE_STATUS
+    return isinstance(exc, httpx.TransportError)
+
+
+def _backoff_s(attempt: int) -> float:
+    # Full jitter: uniform in [0, base * 2^(attempt-1)], capped.
+    ceiling = get_n8n_retry_backoff_ms() / 1000.0 * (2 ** (attempt - 1))
+    return random.uniform(0.0, min(ceiling, _RETRY_BACKOFF_MAX_S))
+
+
+def _hedge_delay_s(url: str) -> float | None:
+    """Hedge after the upstream's p95 latency, once enough samples exist."""
+    breaker = breakers.get(upstream_key(BACKEND_N8N, url))
+    if breaker.samples < _LATENCY_MIN_SAMPLES:
+        return None
+    p95 = breaker.latency_percentile(0.95)
+    return p95 / 1000.0 if p95 is not None else None
+
+
+async def _first_success(tasks: "set[asyncio.Task[Any]]") -> Any:
+    """Return the first successful task result; raise the last error if all fail."""
+    pending = set(tasks)
+    try:
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            if not pending:
+                raise next(iter(done)).exception()  # type: ignore[misc]
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _declared_length(response: httpx.Response) -> int | None:
+    raw = response.headers.get("Content-Length")
+    if raw is None:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return None
+
+
+async def _read_capped(response: httpx.Response, max_bytes: int) -> bytes:
+    """
+    Read a streamed body, raising ValueError once it would exceed `max_bytes`.
+
+    An oversized Content-Length is rejected before any byte is read.
+    """
+    declared = _declared_length(response)
+    if declared is not None and declared > max_bytes:
+        raise ValueError(f"Upstream response exceeds {max_bytes} bytes.")
+
+    buffer = bytearray()
+    async for chunk in response.aiter_bytes():
+        if len(buffer) + len(chunk) > max_bytes:
+            raise ValueError(f"Upstream response exceeds {max_bytes} bytes.")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+async def fetch_url(
+    url: str,
+    timeout_ms: int,
+    max_bytes: int,
+    user_agent: str,
+    extra_headers: Dict[str, str] | None = None,
+) -> FetchResult:
+    return await _guarded(
+        BACKEND_WEB,
+        url,
+        timeout_ms,
+        lambda effective_ms: _fetch_url(url, effective_ms, max_bytes, user_agent, extra_headers),
+    )
+
+
+async def _fetch_url(
+    url: str,
+    timeout_ms: int,
+    max_bytes: int,
+    user_agent: str,
+    extra_headers: Dict[str, str] | None,
+) -> FetchResult:
+    client = client_registry.get(BACKEND_WEB)
+    extractor = TextExtractor()
+    bytes_read = 0
+    truncated = False
+    trace = PhaseTrace()
+    extract_s = 0.0
+    async with client.stream(
+        "GET",
+        url,
+        timeout=httpx.Timeout(timeout_ms / 1000.0),
+        headers={**(extra_headers or {}), "User-Agent": user_agent},
+        extensions={"trace": trace},
+    ) as response:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code == 304:
+            return FetchResult(
+                final_url=str(response.url),
+                status_code=304,
+                title="",
+                extracted_text="",
+                etag=etag,
+                last_modified=last_modified,
+                not_modified=True,
+                phases=trace.phases,
+            )
+        content_type = response.headers.get("Content-Type")
+        if not is_text_content_type(content_type):
+            # PDFs, images and the like: skip the body instead of decoding and extracting it.
+            return FetchResult(
+                final_url=str(response.url),
+                status_code=response.status_code,
+                title="",
+                extracted_text="",
+                etag=etag,
+                last_modified=last_modified,
+                content_type=media_type(content_type),
+                phases=trace.phases,
+            )
+        decoder = BodyDecoder(content_type)
+        # Extract while streaming: stop at the byte cap, or as soon as the
+        # extractor has all the text it will keep.
+        body_started = time.perf_counter()
+        async for chunk in response.aiter_bytes():
+            remaining = max_bytes - bytes_read
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                truncated = True
+            bytes_read += len(chunk)
+            feed_started = time.perf_counter()
+            extractor.feed(decoder.feed(chunk))
+            extract_s += time.perf_counter() - feed_started
+            if truncated or extractor.finished or decoder.binary:
+                break
+        body_s = time.perf_counter() - body_started - extract_s
+        final_url = str(response.url)
+        status_code = response.status_code
+    feed_started = time.perf_counter()
+    if not extractor.finished:
+        extractor.feed(decoder.finish())
+        extractor.close()
+    extract_s += time.perf_counter() - feed_started
+    phases = {**trace.phases, "upstream_body": round(body_s * 1000, 3), "extraction": round(extract_s * 1000, 3)}
+    return FetchResult(
+        final_url=final_url,
+        status_code=status_code,
+        title=extractor.title,
+        extracted_text=extractor.text,
+        bytes_read=bytes_read,
+        truncated=truncated,
+        etag=etag,
+        last_modified=last_modified,
+        content_type=media_type(content_type),
+        charset=decoder.charset,
+        phases=phases,
+    )
+
+
+class EndpointSelector(Protocol):
+    """Endpoint choice for one call: `select` picks a URL, `track` measures one request to it."""
+
+    def select(self, exclude: Set[str]) -> str: ...
+
+    def track(self, url: str) -> AsyncContextManager[None]: ...
 
 
 async def post_json(
@@ -52,11 +668,118 @@ async def post_json(
     timeout_ms: int,
     headers: dict | None = None,
     max_response_bytes: int | None = None,
-) -> dict:
-    timeout = httpx.Timeout(timeout_ms / 1000.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        response = await client.post(url, json=payload, headers=headers)
-        if max_response_bytes is not None and len(response.content) > max_response_bytes:
-            raise ValueError(f"Upstream response exceeds {max_response_bytes} bytes.")
-        response.raise_for_status()
-        return response.json()
+    idempotent: bool = True,
+    endpoints: EndpointSelector | None = None,
+) -> JsonResult:
+    """
+    POST to an n8n webhook with budgeted retries and optional hedging.
+
+    Tool webhooks are read-only, so calls are idempotent by default. Connect
+    failures are always retried; with `idempotent`, 502/503/504 and other
+    transport errors are too. Retries use jittered exponential backoff and draw
+    from `retry_budget`. With N8N_HEDGE_ENABLED, a second request is sent if
+    the first has not answered within the upstream's p95 latency. The result
+    (or the raised error, as `.attempts`) reports how many requests were sent.
+
+    `url` is used for the first request. With `endpoints`, every retry and
+    hedge picks an endpoint again, skipping those this call failed on or is
+    still waiting on, and each request's latency is tracked on its own
+    endpoint (backoff sleeps are not counted).
+    """
+    attempts = 0
+    hedged = False
+    first_pick = True
+    failed: Set[str] = set()
+    busy: Set[str] = set()
+
+    def _pick() -> str:
+        nonlocal first_pick
+        if first_pick or endpoints is None:
+            first_pick = False
+            return url
+        return endpoints.select(failed | busy)
+
+    async def _attempt(target: str) -> JsonResult:
+        async def _send(effective_ms: int) -> JsonResult:
+            # Counted here, past the breaker check, so fast-failed calls send nothing.
+            nonlocal attempts
+            attempts += 1
+            async with endpoints.track(target) if endpoints is not None else nullcontext():
+                return await _post_json(target, payload, effective_ms, headers, max_response_bytes)
+
+        busy.add(target)
+        try:
+            result = await _guarded(BACKEND_N8N, target, timeout_ms, _send)
+        except Exception:
+            failed.add(target)
+            raise
+        finally:
+            busy.discard(target)
+        result.endpoint = urlparse(target).netloc
+        return result
+
+    async def _attempt_maybe_hedged() -> JsonResult:
+        nonlocal hedged
+        target = _pick()
+        delay_s = _hedge_delay_s(target) if idempotent and get_n8n_hedge_enabled() else None
+        if delay_s is None or attempts + 2 > get_n8n_retry_max_attempts():
+            return await _attempt(target)
+        first = asyncio.create_task(_attempt(target))
+        done, _ = await asyncio.wait({first}, timeout=delay_s)
+        if done or not retry_budget.withdraw():
+            return await first
+        hedged = True
+        return await _first_success({first, asyncio.create_task(_attempt(_pick()))})
+
+    retry_budget.deposit()
+    while True:
+        try:
+            result = await _attempt_maybe_hedged()
+        except Exception as exc:
+            if (
+                attempts >= get_n8n_retry_max_attempts()
+                or not _is_retryable(exc, idempotent)
+                or not retry_budget.withdraw()
+            ):
+                exc.attempts = attempts  # type: ignore[attr-defined]
+                raise
+            await asyncio.sleep(_backoff_s(attempts))
+            continue
+        result.attempts = attempts
+        result.hedged = hedged
+        return result
+
+
+async def _post_json(
+    url: str,
+    payload: dict,
+    timeout_ms: int,
+    headers: dict | None,
+    max_response_bytes: int | None,
+) -> JsonResult:
+    client = client_registry.get(BACKEND_N8N)
+    trace = PhaseTrace()
+    async with client.stream(
+        "POST",
+        url,
+        json=payload,
+        headers=headers,
+        timeout=httpx.Timeout(timeout_ms / 1000.0),
+        extensions={"trace": trace},
+    ) as response:
+        body_started = time.perf_counter()
+        if max_response_bytes is None:
+            body = await response.aread()
+        else:
+            body = await _read_capped(response, max_response_bytes)
+        if response.is_error:
+            # Hand callers a fully-read response so error details stay inspectable.
+            failed = httpx.Response(
+                response.status_code,
+                headers={"Content-Type": response.headers.get("Content-Type", "application/octet-stream")},
+                content=body,
+                request=response.request,
+            )
+            failed.raise_for_status()
+        trace.phases["upstream_body"] = round((time.perf_counter() - body_started) * 1000, 3)
+    return JsonResult(data=json.loads(body), bytes_read=len(body), phases=trace.phases)
@@ -0,0 +1,108 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds in seconds; an implicit +Inf bucket follows.
+LATENCY_BUCKETS_S: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+REQUEST_METRIC = "tool_gateway_request_duration_seconds"
+PHASE_METRIC = "tool_gateway_phase_duration_seconds"
+
+_HELP = {
+    REQUEST_METRIC: "End-to-end tool call latency by tool, backend and outcome.",
+    PHASE_METRIC: "Latency of each phase of a tool call by tool, backend and phase.",
+}
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus semantics: cumulative on export)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_S) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value_s: float) -> None:
+        self.counts[bisect_left(self.bounds, value_s)] += 1
+        self.sum += value_s
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process histograms for the tool hot path, rendered as Prometheus text."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {REQUEST_METRIC: {}, PHASE_METRIC: {}}
+
+    def _observe(self, metric: str, labels: LabelSet, value_s: float) -> None:
+        family = self._histograms[metric]
+        histogram = family.get(labels)
+        if histogram is None:
+            with self._lock:
+                histogram = family.setdefault(labels, Histogram())
+        histogram.observe(value_s)
+
+    def observe_request(self, tool: str, backend: str, outcome: str, duration_ms: float) -> None:
+        labels = (("tool", tool), ("backend", backend), ("outcome", outcome))
+        self._observe(REQUEST_METRIC, labels, duration_ms / 1000.0)
+
+    def observe_phase(self, tool: str, backend: str, phase: str, duration_ms: float) -> None:
+        labels = (("tool", tool), ("backend", backend), ("phase", phase))
+        self._observe(PHASE_METRIC, labels, duration_ms / 1000.0)
+
+    def histogram(self, metric: str, **labels: str) -> Histogram | None:
+        for label_set, histogram in self._histograms[metric].items():
+            if dict(label_set) == labels:
+                return histogram
+        return None
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            families = {metric: list(family.items()) for metric, family in self._histograms.items()}
+        for metric, series in families.items():
+            lines.append(f"# HELP {metric} {_HELP[metric]}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, histogram in sorted(series):
+                base = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{{base},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{base},le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum{{{base}}} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{{{base}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            for family in self._histograms.values():
+                family.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+metrics = MetricsRegistry()
@@ -1,17 +1,21 @@
 import os
+import sqlite3
+import threading
 import time
-from collections import deque
-from functools import lru_cache
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Deque, Dict, Set
+from typing import Dict, List, Set, Tuple
+
+from app.core.allowlist import AllowlistStore
+
+RATE_WINDOW_S = 60.0
 
 
 def _parse_allowlist(raw: str) -> Set[str]:
     return {item.strip().lower() for item in raw.split(",") if item.strip()}
 
 
-@lru_cache(maxsize=1)
-def load_allowlist() -> Set[str]:
+def _read_allowlist() -> Tuple[List[str], str]:
     file_path = os.getenv("WEB_ALLOWLIST_FILE", "").strip()
     if file_path:
         path = Path(file_path)
@@ -22,18 +26,25 @@ def load_allowlist() -> Set[str]:
                 if not line or line.startswith("#"):
                     continue
                 values.append(line.lower())
-            return set(values)
-    return _parse_allowlist(os.getenv("WEB_ALLOWLIST", ""))
+            return values, file_path
+    return sorted(_parse_allowlist(os.getenv("WEB_ALLOWLIST", ""))), ""
+
+
+def get_allowlist_reload_interval_s() -> float:
+    # WEB_ALLOWLIST_RELOAD_MS=0 disables watching WEB_ALLOWLIST_FILE for changes.
+    return max(0.0, float(os.getenv("WEB_ALLOWLIST_RELOAD_MS", "1000")) / 1000.0)
+
+
+load_allowlist = AllowlistStore(_read_allowlist, get_allowlist_reload_interval_s)
 
 
 def is_allowed_host(hostname: str) -> bool:
     allowlist = load_allowlist()
     if not allowlist:
         return False
-    # Explicit wildcard opt-in (used for the "marketing" deployment profile).
-    if "*" in allowlist:
-        return True
-    return hostname.lower() in allowlist
+    # Explicit wildcard opt-in ("*", used for the "marketing" deployment profile)
+    # is handled by the compiled matcher.
+    return allowlist.matches(hostname)
 
 
 def get_timeout_ms() -> int:
@@ -44,6 +55,14 @@ def get_max_bytes() -> int:
     return int(os.getenv("WEB_MAX_BYTES", "1500000"))
 
 
+def get_fetch_batch_max_items() -> int:
+    return max(1, int(os.getenv("WEB_FETCH_BATCH_MAX_ITEMS", "100")))
+
+
+def get_fetch_batch_concurrency() -> int:
+    return max(1, int(os.getenv("WEB_FETCH_BATCH_CONCURRENCY", "8")))
+
+
 def get_tool_backend() -> str:
     return os.getenv("TOOL_BACKEND", "local").strip().lower() or "local"
 
@@ -56,28 +75,403 @@ def get_n8n_web_search_url() -> str:
     return os.getenv("N8N_WEB_SEARCH_URL", "http://n8n:5678/webhook/tools/web.search").strip()
 
 
+_N8N_TOOL_URLS = {
+    "web.fetch": get_n8n_web_fetch_url,
+    "web.search": get_n8n_web_search_url,
+}
+
+
+def get_tool_backend_chain(tool: str) -> List[str]:
+    # TOOL_BACKEND_CHAIN_WEB_FETCH=n8n,local tries n8n first and falls back to local.
+    env = "TOOL_BACKEND_CHAIN_" + tool.upper().replace(".", "_").replace(":", "_")
+    chain = [item.strip().lower() for item in os.getenv(env, "").split(",") if item.strip()]
+    return chain or [get_tool_backend()]
+
+
+def get_n8n_endpoints(tool: str) -> List[Tuple[str, float]]:
+    """
+    n8n webhook URLs for a tool with their balancing weights.
+
+    N8N_WEB_FETCH_URLS / N8N_WEB_SEARCH_URLS take comma-separated
+    `<url> [weight=N]` entries (weight defaults to 1; 0 drains an endpoint).
+    Without them, or with every endpoint drained, the single N8N_WEB_FETCH_URL / N8N_WEB_SEARCH_URL is used.
+    """
+    raw = os.getenv("N8N_" + tool.upper().replace(".", "_") + "_URLS", "").strip()
+    if not raw:
+        return [(_N8N_TOOL_URLS[tool](), 1.0)]
+    endpoints = []
+    for entry in raw.split(","):
+        parts = entry.split()
+        if not parts:
+            continue
+        weight = 1.0
+        for option in parts[1:]:
+            if option.startswith("weight="):
+                weight = max(0.0, float(option[len("weight=") :]))
+        if weight > 0:
+            endpoints.append((parts[0], weight))
+    return endpoints or [(_N8N_TOOL_URLS[tool](), 1.0)]
+
+
+def get_n8n_balance() -> str:
+    # `latency` (default) picks the faster of two weighted random endpoints; `weighted` is plain weighted random.
+    mode = os.getenv("N8N_BALANCE", "latency").strip().lower()
+    return mode if mode in {"latency", "weighted"} else "latency"
+
+
 def get_tool_shared_secret() -> str:
     return os.getenv("TOOL_SHARED_SECRET", "").strip()
 
 
+def get_http_max_connections(backend: str) -> int:
+    default = "20" if backend == "n8n" else "100"
+    return max(1, int(os.getenv(f"HTTP_{backend.upper()}_MAX_CONNECTIONS", default)))
+
+
+def get_http_max_keepalive_connections(backend: str) -> int:
+    default = "10" if backend == "n8n" else "20"
+    return max(0, int(os.getenv(f"HTTP_{backend.upper()}_MAX_KEEPALIVE", default)))
+
+
+def get_http_keepalive_enabled() -> bool:
+    return os.getenv("HTTP_KEEPALIVE", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def get_http_keepalive_expiry_s() -> float:
+    return max(0.0, float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "30")))
+
+
+def get_http2_enabled() -> bool:
+    return os.getenv("HTTP2_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_circuit_breaker_enabled() -> bool:
+    return os.getenv("CIRCUIT_BREAKER_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_circuit_failure_threshold() -> int:
+    # Consecutive upstream failures (timeouts, transport errors, 5xx) that open the circuit.
+    return max(1, int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")))
+
+
+def get_circuit_open_s() -> float:
+    return max(0.0, float(os.getenv("CIRCUIT_OPEN_MS", "30000")) / 1000.0)
+
+
+def get_circuit_half_open_probes() -> int:
+    return max(1, int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1")))
+
+
+def get_adaptive_timeout_enabled() -> bool:
+    return os.getenv("ADAPTIVE_TIMEOUT_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_adaptive_timeout_multiplier() -> float:
+    return max(1.0, float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", "4")))
+
+
+def get_adaptive_timeout_min_ms() -> int:
+    return max(1, int(os.getenv("ADAPTIVE_TIMEOUT_MIN_MS", "1000")))
+
+
+def get_n8n_retry_max_attempts() -> int:
+    # Total attempts per n8n call, including the first one and any hedge.
+    return max(1, int(os.getenv("N8N_RETRY_MAX_ATTEMPTS", "3")))
+
+
+def get_n8n_retry_backoff_ms() -> int:
+    return max(0, int(os.getenv("N8N_RETRY_BACKOFF_MS", "100")))
+
+
+def get_n8n_retry_budget_percent() -> float:
+    # Retries and hedges may add at most this share of extra load on n8n.
+    return max(0.0, float(os.getenv("N8N_RETRY_BUDGET_PERCENT", "10")))
+
+
+def get_n8n_hedge_enabled() -> bool:
+    return os.getenv("N8N_HEDGE_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_fetch_cache_ttl_s() -> float:
+    return max(0.0, float(os.getenv("WEB_FETCH_CACHE_TTL_S", "0")))
+
+
+def get_fetch_cache_max_bytes() -> int:
+    return max(0, int(os.getenv("WEB_FETCH_CACHE_MAX_BYTES", "67108864")))
+
+
+def get_fetch_cache_sqlite_path() -> str:
+    return os.getenv("WEB_FETCH_CACHE_SQLITE_PATH", "").strip()
+
+
+def get_fetch_validators_max_entries() -> int:
+    # 0 disables remembering ETag/Last-Modified per URL for conditional fetches.
+    return max(0, int(os.getenv("WEB_FETCH_VALIDATORS_MAX_ENTRIES", "10000")))
+
+
+def get_content_store_dir() -> str:
+    # Empty disables the content-addressed store for extracted text.
+    return os.getenv("CONTENT_STORE_DIR", "").strip()
+
+
+def get_agent_rate_limit_per_minute() -> int:
+    """Per agent_id and tool; 0 disables the agent key class."""
+    return max(0, int(os.getenv("AGENT_RATE_LIMIT_PER_MINUTE", "0")))
+
+
+def get_domain_rate_limit_per_minute() -> int:
+    """Per target hostname across tools; 0 disables the domain key class."""
+    return max(0, int(os.getenv("DOMAIN_RATE_LIMIT_PER_MINUTE", "0")))
+
+
+def get_rate_limit_retry_after_enabled() -> bool:
+    return os.getenv("TOOL_RATE_LIMIT_RETRY_AFTER", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def rate_limit_keys(tool: str, agent_id: str | None, hostname: str | None) -> List[Tuple[str, str, int]]:
+    """Return `(key_class, key, limit_per_minute)` for every enabled key class of a call."""
+    keys = [("tool", tool, get_rate_limit_per_minute())]
+    agent_limit = get_agent_rate_limit_per_minute()
+    if agent_limit and agent_id:
+        keys.append(("agent", f"agent:{tool}:{agent_id}", agent_limit))
+    domain_limit = get_domain_rate_limit_per_minute()
+    if domain_limit and hostname:
+        keys.append(("domain", f"domain:{hostname.lower()}", domain_limit))
+    return keys
+
+
+def get_dns_cache_ttl_s() -> float:
+    # How long resolved addresses are reused; 0 resolves on every new connection.
+    return max(0.0, float(os.getenv("DNS_CACHE_TTL_S", "60")))
+
+
+def get_dns_negative_ttl_s() -> float:
+    # How long a failed lookup is remembered before the resolver is asked again.
+    return max(0.0, float(os.getenv("DNS_NEGATIVE_TTL_S", "5")))
+
+
+def get_dns_cache_max_entries() -> int:
+    return max(1, int(os.getenv("DNS_CACHE_MAX_ENTRIES", "4096")))
+
+
+def get_dns_warmup_hosts() -> int:
+    # Allowlisted hostnames resolved and pre-connected on startup, in allowlist order; 0 disables warmup.
+    return max(0, int(os.getenv("DNS_WARMUP_HOSTS", "0")))
+
+
+def get_block_private_addresses() -> bool:
+    return os.getenv("WEB_BLOCK_PRIVATE_ADDRESSES", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def get_tool_concurrency(tool: str, default: int = 0) -> int:
+    """
+    Upstream calls in flight per tool; 0 is unbounded.
+
+    TOOL_CONCURRENCY_WEB_FETCH overrides the tool's declared default, which in
+    turn overrides TOOL_CONCURRENCY.
+    """
+    raw = os.getenv("TOOL_CONCURRENCY_" + tool.upper().replace(".", "_").replace(":", "_"), "").strip()
+    if raw:
+        return max(0, int(raw))
+    if default > 0:
+        return default
+    return max(0, int(os.getenv("TOOL_CONCURRENCY", "0")))
+
+
+def get_agent_concurrency() -> int:
+    """Upstream calls in flight per agent_id across tools; 0 disables the agent bulkhead."""
+    return max(0, int(os.getenv("AGENT_CONCURRENCY", "0")))
+
+
+def get_host_concurrency() -> int:
+    """Upstream calls in flight per target hostname across tools; 0 disables the host bulkhead."""
+    return max(0, int(os.getenv("HOST_CONCURRENCY", "16")))
+
+
+def get_concurrency_queue_max() -> int:
+    # Callers allowed to wait per bulkhead; beyond that they fail fast. 0 rejects instead of queueing.
+    return max(0, int(os.getenv("CONCURRENCY_QUEUE_MAX", "100")))
+
+
+def concurrency_keys(tool: str, agent_id: str | None, hostname: str | None, default: int = 0) -> List[Tuple[str, str, int]]:
+    """Return `(scope, key, limit)` for every enabled bulkhead of a call, in acquisition order."""
+    keys: List[Tuple[str, str, int]] = []
+    tool_limit = get_tool_concurrency(tool, default)
+    if tool_limit:
+        keys.append(("tool", f"tool:{tool}", tool_limit))
+    agent_limit = get_agent_concurrency()
+    if agent_limit and agent_id:
+        keys.append(("agent", f"agent:{agent_id}", agent_limit))
+    host_limit = get_host_concurrency()
+    if host_limit and hostname:
+        keys.append(("host", f"host:{hostname.lower()}", host_limit))
+    return keys
+
+
+def get_rate_limit_backend() -> str:
+    return os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower() or "memory"
+
+
+def get_rate_limit_sqlite_path() -> str:
+    return os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/corestack-tool-gateway-ratelimit.sqlite3").strip()
+
+
+def get_coalesce_enabled() -> bool:
+    return os.getenv("TOOL_COALESCE_ENABLED", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
 def get_rate_limit_per_minute() -> int:
     return max(1, int(os.getenv("TOOL_RATE_LIMIT_PER_MINUTE", "120")))
 
 
+@dataclass
+class RateDecision:
+    allowed: bool
+    retry_after_s: float = 0.0
+    key_class: str | None = None
+    limit_per_minute: int = 0
+
+
 class RateLimiter:
+    """
+    GCRA (generic cell rate algorithm) limiter.
+
+    Equivalent to a token bucket holding `limit_per_minute` tokens that refills
+    continuously, but each key stores a single float: its theoretical arrival
+    time. Cost and memory per key are O(1) regardless of the limit. Idle keys
+    are pruned once the table grows, since an expired entry is equivalent to
+    no entry.
+    """
+
+    _PRUNE_MIN_KEYS = 4096
+
     def __init__(self) -> None:
-        self._events: Dict[str, Deque[float]] = {}
+        self._events: Dict[str, float] = {}
+        self._prune_at = self._PRUNE_MIN_KEYS
+
+    def acquire(self, limits: List[Tuple[str, str, int]]) -> RateDecision:
+        """
+        Take one token from every `(key_class, key, limit_per_minute)` bucket,
+        or from none of them if any bucket is exhausted.
+        """
+        now = time.monotonic()
+        pending: List[Tuple[str, float]] = []
+        for key_class, key, limit_per_minute in limits:
+            tat = self._events.get(key, now)
+            tat = (tat if tat > now else now) + RATE_WINDOW_S / limit_per_minute
+            # Small epsilon so float accumulation never rejects the last token of a burst.
+            overshoot = tat - now - RATE_WINDOW_S
+            if overshoot > 1e-9:
+                return RateDecision(
+                    allowed=False,
+                    retry_after_s=round(overshoot, 3),
+                    key_class=key_class,
+                    limit_per_minute=limit_per_minute,
+                )
+            pending.append((key, tat))
+        for key, tat in pending:
+            self._events[key] = tat
+        if len(self._events) > self._prune_at:
+            self._prune(now)
+        return RateDecision(allowed=True)
 
     def allow(self, key: str, limit_per_minute: int) -> bool:
+        # Single-key fast path of acquire().
         now = time.monotonic()
-        window_start = now - 60.0
-        bucket = self._events.setdefault(key, deque())
-        while bucket and bucket[0] < window_start:
-            bucket.popleft()
-        if len(bucket) >= limit_per_minute:
+        tat = self._events.get(key, now)
+        tat = (tat if tat > now else now) + RATE_WINDOW_S / limit_per_minute
+        if tat - now - RATE_WINDOW_S > 1e-9:
             return False
-        bucket.append(now)
+        self._events[key] = tat
+        if len(self._events) > self._prune_at:
+            self._prune(now)
         return True
 
+    def _prune(self, now: float) -> None:
+        for key in [key for key, tat in self._events.items() if tat <= now]:
+            del self._events[key]
+        self._prune_at = max(self._PRUNE_MIN_KEYS, 2 * len(self._events))
+
+
+class SQLiteRateLimiter:
+    """
+    GCRA limiter whose state lives in a SQLite WAL database.
+
+    Every uvicorn worker on a host opens the same file, so the configured
+    limits hold for the whole gateway rather than per worker. Each acquire()
+    is one short `BEGIN IMMEDIATE` transaction; timestamps are wall-clock so
+    they are comparable across processes.
+    """
+
+    _PRUNE_EVERY = 1024
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+
+    def acquire(self, limits: List[Tuple[str, str, int]]) -> RateDecision:
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending: List[Tuple[str, float]] = []
+                for key_class, key, limit_per_minute in limits:
+                    row = self._conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+                    tat = row[0] if row is not None and row[0] > now else now
+                    tat += RATE_WINDOW_S / limit_per_minute
+                    overshoot = tat - now - RATE_WINDOW_S
+                    if overshoot > 1e-9:
+                        self._conn.execute("ROLLBACK")
+                        return RateDecision(
+                            allowed=False,
+                            retry_after_s=round(overshoot, 3),
+                            key_class=key_class,
+                            limit_per_minute=limit_per_minute,
+                        )
+                    pending.append((key, tat))
+                self._conn.executemany(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    pending,
+                )
+                self._calls += 1
+                if self._calls % self._PRUNE_EVERY == 0:
+                    self._conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+        return RateDecision(allowed=True)
+
+    def allow(self, key: str, limit_per_minute: int) -> bool:
+        return self.acquire([("tool", key, limit_per_minute)]).allowed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
 
 rate_limiter = RateLimiter()
+_sqlite_rate_limiter: SQLiteRateLimiter | None = None
+_sqlite_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter | SQLiteRateLimiter:
+    """Return the limiter selected by RATE_LIMIT_BACKEND (`memory` or `sqlite`); safe to call from worker threads."""
+    global _sqlite_rate_limiter
+    if get_rate_limit_backend() != "sqlite":
+        return rate_limiter
+    path = get_rate_limit_sqlite_path()
+    with _sqlite_rate_limiter_lock:
+        if _sqlite_rate_limiter is None or _sqlite_rate_limiter.path != path:
+            if _sqlite_rate_limiter is not None:
+                _sqlite_rate_limiter.close()
+                _sqlite_rate_limiter = None
+            _sqlite_rate_limiter = SQLiteRateLimiter(path)
+        return _sqlite_rate_limiter
@@ -0,0 +1,466 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from pydantic import BaseModel
+
+_STOP = object()
+_FLUSH = object()
+
+# Column name and Postgres type, in insert order.
+_TOOL_CALL_COLUMNS = (
+    ("call_id", "uuid"),
+    ("run_id", "uuid"),
+    ("tool", "text"),
+    ("request", "jsonb"),
+    ("response", "jsonb"),
+    ("ok", "boolean"),
+    ("created_at", "timestamptz"),
+)
+_WEB_FETCH_COLUMNS = (
+    ("fetch_id", "uuid"),
+    ("url", "text"),
+    ("status_code", "integer"),
+    ("fetched_at", "timestamptz"),
+    ("content_hash", "text"),
+    ("title", "text"),
+    ("extracted_text", "text"),
+    ("source_meta", "jsonb"),
+)
+_TABLES = {"tool_calls": _TOOL_CALL_COLUMNS, "web_fetches": _WEB_FETCH_COLUMNS}
+
+# SQLite stand-in for db/migrations/001_core_schema.sql, attached as schema `core`.
+_SQLITE_DDL = (
+    "CREATE TABLE IF NOT EXISTS core.tool_calls ("
+    " call_id TEXT PRIMARY KEY, run_id TEXT, tool TEXT NOT NULL, request TEXT NOT NULL DEFAULT '{}',"
+    " response TEXT NOT NULL DEFAULT '{}', ok INTEGER NOT NULL DEFAULT 0, created_at TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS core.web_fetches ("
+    " fetch_id TEXT PRIMARY KEY, url TEXT NOT NULL, status_code INTEGER NOT NULL, fetched_at TEXT NOT NULL,"
+    " content_hash TEXT, title TEXT, extracted_text TEXT, source_meta TEXT NOT NULL DEFAULT '{}')",
+)
+
+# Rows per INSERT statement; keeps SQLite under its bound-parameter limit.
+_ROWS_PER_STATEMENT = 500
+
+# Calls held for the writer thread to spool once the queue is full.
+_OVERFLOW_MAX = 10000
+
+Row = Tuple[Any, ...]
+
+
+def _dsn() -> str:
+    return os.getenv("TOOL_RECORD_DSN", "").strip()
+
+
+def _queue_size() -> int:
+    return max(1, int(os.getenv("TOOL_RECORD_QUEUE_SIZE", "10000")))
+
+
+def _batch_rows() -> int:
+    return max(1, int(os.getenv("TOOL_RECORD_BATCH_ROWS", "500")))
+
+
+def _flush_interval_s() -> float:
+    return max(0.001, float(os.getenv("TOOL_RECORD_FLUSH_INTERVAL_MS", "1000")) / 1000.0)
+
+
+def _retry_interval_s() -> float:
+    return max(0.0, float(os.getenv("TOOL_RECORD_RETRY_MS", "5000")) / 1000.0)
+
+
+def _spool_path() -> str:
+    return os.getenv("TOOL_RECORD_SPOOL_PATH", "/tmp/corestack-tool-gateway-record-spool.jsonl").strip()
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+class _SQLSink:
+    """Multi-row INSERT into core.tool_calls/core.web_fetches on Postgres (psycopg) or SQLite."""
+
+    def __init__(self, dsn: str) -> None:
+        self.dsn = dsn
+        self.dialect = "postgres" if dsn.startswith(("postgres://", "postgresql://")) else "sqlite"
+        self._conn: Any = None
+
+    def _connect(self) -> Any:
+        if self.dialect == "postgres":
+            try:
+                import psycopg
+            except ImportError as exc:
+                raise RuntimeError("TOOL_RECORD_DSN is a Postgres DSN but psycopg is not installed") from exc
+            return psycopg.connect(self.dsn, connect_timeout=5)
+        path = self.dsn[len("sqlite:///") :] if self.dsn.startswith("sqlite:///") else self.dsn
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute("ATTACH DATABASE ? AS core", (path,))
+        for statement in _SQLITE_DDL:
+            conn.execute(statement)
+        conn.commit()
+        return conn
+
+    def _placeholders(self, columns: Tuple[Tuple[str, str], ...]) -> str:
+        if self.dialect == "postgres":
+            return "(" + ",".join(f"%s::{pg_type}" for _, pg_type in columns) + ")"
+        return "(" + ",".join("?" for _ in columns) + ")"
+
+    def write(self, rows: Dict[str, List[Row]]) -> None:
+        """Insert every row in one transaction; duplicate ids (spool replays) are skipped."""
+        if self._conn is None:
+            self._conn = self._connect()
+        try:
+            cursor = self._conn.cursor()
+            for table, table_rows in rows.items():
+                columns = _TABLES[table]
+                names = ",".join(name for name, _ in columns)
+                for start in range(0, len(table_rows), _ROWS_PER_STATEMENT):
+                    chunk = table_rows[start : start + _ROWS_PER_STATEMENT]
+                    sql = (
+                        f"INSERT INTO core.{table} ({names}) VALUES "
+                        + ",".join([self._placeholders(columns)] * len(chunk))
+                        + " ON CONFLICT DO NOTHING"
+                    )
+                    cursor.execute(sql, [value for row in chunk for value in row])
+            self._conn.commit()
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:  # noqa: BLE001
+                pass
+            self._conn = None
+
+
+def _rows_for(tool: str, request: Any, body: bytes, created_at: float) -> Dict[str, List[Row]]:
+    envelope = json.loads(body)
+    data = envelope.get("data") or {}
+    request_doc = request.model_dump(mode="json") if isinstance(request, BaseModel) else request
+    fetched = tool == "web.fetch" and envelope.get("ok") and "extracted_text" in data
+    if fetched:
+        # The text lives in core.web_fetches; keep the call row small.
+        envelope = {**envelope, "data": {k: v for k, v in data.items() if k != "extracted_text"}}
+    rows: Dict[str, List[Row]] = {
+        "tool_calls": [
+            (
+                str(uuid.uuid4()),
+                None,
+                tool,
+                json.dumps(request_doc, separators=(",", ":")),
+                json.dumps(envelope, separators=(",", ":")),
+                bool(envelope.get("ok")),
+                _iso(created_at),
+            )
+        ],
+        "web_fetches": [],
+    }
+    source_meta = envelope.get("source_meta") or {}
+    # Only record pages that were actually downloaded with their text.
+    if fetched and source_meta.get("cache") != "hit" and not data.get("unchanged") and "content_ref" not in data:
+        rows["web_fetches"].append(
+            (
+                str(uuid.uuid4()),
+                data.get("final_url") or data.get("url") or "",
+                int(data.get("status") or 0),
+                data.get("fetched_at") or _iso(created_at),
+                envelope.get("content_hash"),
+                data.get("title"),
+                data.get("extracted_text"),
+                json.dumps(source_meta, separators=(",", ":")),
+            )
+        )
+    return rows
+
+
+class ToolCallRecorder:
+    """
+    Background batched writer of tool calls into core.tool_calls/core.web_fetches.
+
+    Handlers only enqueue the request model and the already-encoded response
+    body; a daemon thread decodes them and flushes multi-row INSERTs when
+    `batch_rows` calls are pending or `flush_interval_s` has passed. The queue
+    is bounded: a call that does not fit is handed to the thread to append to
+    the spool file instead of blocking the request. Batches that fail to write
+    (database down) are spooled too, and the spool is replayed once a write
+    succeeds again, at most every `retry_interval_s`. Spool lines that cannot
+    be parsed are moved to `<spool>.corrupt` so they never block a replay.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        spool_path: str,
+        max_queue: int,
+        batch_rows: int,
+        flush_interval_s: float,
+        retry_interval_s: float,
+    ) -> None:
+        self.dsn = dsn
+        self.spool_path = spool_path
+        self.batch_rows = batch_rows
+        self.flush_interval_s = flush_interval_s
+        self.retry_interval_s = retry_interval_s
+        self.queued = 0
+        self.batches = 0
+        self.tool_calls_written = 0
+        self.web_fetches_written = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.quarantined = 0
+        self.write_errors = 0
+        self.last_error: str | None = None
+        self._sink = _SQLSink(dsn)
+        self._sink_lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._last_failure = 0.0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._overflow: "queue.Queue[Any]" = queue.Queue(maxsize=_OVERFLOW_MAX)
+        self._thread = threading.Thread(target=self._run, name="tool-recorder", daemon=True)
+        self._thread.start()
+
+    def submit(self, tool: str, request: Any, body: bytes) -> bool:
+        item = (tool, request, body, time.time())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Backpressure: never block the request path on the database or the spool file.
+            try:
+                self._overflow.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+            return False
+        self.queued += 1
+        return True
+
+    def flush(self) -> None:
+        """Write the pending batch now and block until every call submitted so far is written or spooled."""
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join(timeout=10)
+        with self._sink_lock:
+            self._sink.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self._sink.dialect,
+            "queued": self.queued,
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "tool_calls_written": self.tool_calls_written,
+            "web_fetches_written": self.web_fetches_written,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "quarantined": self.quarantined,
+            "write_errors": self.write_errors,
+            "last_error": self.last_error,
+        }
+
+    def _decode(self, items: List[Any]) -> Dict[str, List[Row]]:
+        rows: Dict[str, List[Row]] = {"tool_calls": [], "web_fetches": []}
+        for tool, request, body, created_at in items:
+            try:
+                decoded = _rows_for(tool, request, body, created_at)
+            except Exception:  # noqa: BLE001
+                self.dropped += 1
+                continue
+            for table, table_rows in decoded.items():
+                rows[table].extend(table_rows)
+        return rows
+
+    def _write(self, rows: Dict[str, List[Row]]) -> bool:
+        with self._sink_lock:
+            try:
+                self._sink.write(rows)
+            except Exception as exc:  # noqa: BLE001
+                self.write_errors += 1
+                self.last_error = str(exc)[:200]
+                self._last_failure = time.monotonic()
+                return False
+        self.batches += 1
+        self.tool_calls_written += len(rows["tool_calls"])
+        self.web_fetches_written += len(rows["web_fetches"])
+        return True
+
+    def _spool(self, rows: Dict[str, List[Row]]) -> None:
+        lines = [json.dumps({"table": table, "row": row}) for table, table_rows in rows.items() for row in table_rows]
+        if not lines:
+            return
+        try:
+            with self._spool_lock, open(self.spool_path, "a", encoding="utf-8") as handle:
+                handle.write("\n".join(lines))
+                handle.write("\n")
+            self.spooled += len(rows["tool_calls"])
+        except OSError:
+            self.dropped += len(rows["tool_calls"])
+
+    def replay_spool(self) -> int:
+        """Write spooled rows back to the database; returns how many calls were replayed."""
+        replaying = self.spool_path + ".replay"
+        with self._spool_lock:
+            if not os.path.exists(replaying):
+                if not os.path.exists(self.spool_path) or os.path.getsize(self.spool_path) == 0:
+                    return 0
+                os.replace(self.spool_path, replaying)
+        rows: Dict[str, List[Row]] = {"tool_calls": [], "web_fetches": []}
+        good: List[str] = []
+        corrupt: List[str] = []
+        with open(replaying, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                line = line if line.endswith("\n") else line + "\n"
+                try:
+                    record = json.loads(line)
+                    row = tuple(record["row"])
+                    if len(row) != len(_TABLES[record["table"]]):
+                        raise ValueError("column count mismatch")
+                except (ValueError, KeyError, TypeError):
+                    corrupt.append(line)
+                    continue
+                rows[record["table"]].append(row)
+                good.append(line)
+        if corrupt:
+            self._quarantine(replaying, good, corrupt)
+        if not self._write(rows):
+            # Still down: the rows stay in the replay file for the next attempt.
+            return 0
+        os.unlink(replaying)
+        self.replayed += len(rows["tool_calls"])
+        return len(rows["tool_calls"])
+
+    def _quarantine(self, replaying: str, good: List[str], corrupt: List[str]) -> None:
+        """Move unparseable lines to the `.corrupt` file and keep only the good ones for replay."""
+        with open(self.spool_path + ".corrupt", "a", encoding="utf-8") as handle:
+            handle.writelines(corrupt)
+        with open(replaying + ".tmp", "w", encoding="utf-8") as handle:
+            handle.writelines(good)
+        os.replace(replaying + ".tmp", replaying)
+        self.quarantined += len(corrupt)
+
+    def _spool_overflow(self) -> None:
+        items: List[Any] = []
+        while True:
+            try:
+                items.append(self._overflow.get_nowait())
+            except queue.Empty:
+                break
+        if items:
+            self._spool(self._decode(items))
+
+    def _flush_batch(self, batch: List[Any]) -> None:
+        try:
+            rows = self._decode(batch)
+            if not self._write(rows):
+                self._spool(rows)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _maybe_replay(self) -> None:
+        if time.monotonic() - self._last_failure < self.retry_interval_s:
+            return
+        try:
+            self.replay_spool()
+        except Exception as exc:  # noqa: BLE001
+            self.last_error = str(exc)[:200]
+
+    def _run(self) -> None:
+        batch: List[Any] = []
+        deadline = time.monotonic() + self.flush_interval_s
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            self._spool_overflow()
+            if item is _STOP:
+                if batch:
+                    self._flush_batch(batch)
+                self._spool_overflow()
+                self._queue.task_done()
+                break
+            if item is _FLUSH:
+                if batch:
+                    self._flush_batch(batch)
+                    batch = []
+                self._spool_overflow()
+                self._queue.task_done()
+                continue
+            if item is not None:
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_rows or time.monotonic() >= deadline):
+                self._flush_batch(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                self._maybe_replay()
+                deadline = time.monotonic() + self.flush_interval_s
+
+
+_recorder: ToolCallRecorder | None = None
+_recorder_lock = threading.Lock()
+
+
+def _tool_recorder(dsn: str) -> ToolCallRecorder:
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None or _recorder.dsn != dsn:
+            if _recorder is not None:
+                _recorder.close()
+            _recorder = ToolCallRecorder(
+                dsn,
+                spool_path=_spool_path(),
+                max_queue=_queue_size(),
+                batch_rows=_batch_rows(),
+                flush_interval_s=_flush_interval_s(),
+                retry_interval_s=_retry_interval_s(),
+            )
+        return _recorder
+
+
+def record_tool_call(tool: str, request: Any, body: bytes) -> None:
+    """
+    Queue one tool call for durable recording when TOOL_RECORD_DSN is set.
+
+    Like audit logging, recording must never break tool execution.
+    """
+    dsn = _dsn()
+    if not dsn:
+        return
+    try:
+        _tool_recorder(dsn).submit(tool, request, body)
+    except Exception:  # noqa: BLE001
+        return
+
+
+def flush_tool_recorder() -> None:
+    if _recorder is not None:
+        _recorder.flush()
+
+
+def shutdown_tool_recorder() -> None:
+    global _recorder
+    with _recorder_lock:
+        if _recorder is not None:
+            _recorder.close()
+            _recorder = None
+
+
+def tool_recorder_stats() -> Dict[str, Any]:
+    if _recorder is None:
+        return {"mode": "disabled" if not _dsn() else "idle"}
+    return _recorder.stats()
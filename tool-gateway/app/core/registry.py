@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Type
+
+from pydantic import BaseModel
+
+from app.core.backends import Executor, backend_registry
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Response cache hooks for a tool.
+
+    `lookup(call)` fills the call's cache state and returns a fresh cached
+    envelope to skip the upstream, or None. `storable(call, envelope)` says
+    whether a result goes into the cache; `store(call, content, body)` then
+    receives it fully encoded, before any response-only reshaping.
+    """
+
+    lookup: Callable[[Any], Awaitable[Any]]
+    storable: Callable[[Any, Any], bool]
+    store: Callable[[Any, Dict[str, Any], bytes], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """
+    Declaration of one gateway tool, run by the shared pipeline in app.api.tools.
+
+    - `request_model`: validated straight from the request body bytes.
+    - `executors`: backend name -> coroutine taking the call; the order they
+      are tried in comes from the tool's backend chain.
+    - `target_url`: the URL a call touches, if any. It is allowlisted, feeds
+      the per-domain rate limit and is recorded in audit events.
+    - `cache`: optional response cache hooks.
+    - `finalize`: optional hook run on a successful envelope before encoding;
+      it may set `call.reshape` and add result audit fields to `call.audit`.
+    - `max_concurrency`: default size of the tool's bulkhead (upstream calls in
+      flight); TOOL_CONCURRENCY_<TOOL> overrides it, 0 defers to TOOL_CONCURRENCY.
+    - `coalesces`: the executors send their upstream calls through the shared
+      single-flight helper, which admits only the leader of identical calls to
+      the bulkheads. Otherwise the pipeline admits every call around its executor.
+    """
+
+    name: str
+    request_model: Type[BaseModel]
+    executors: Dict[str, Executor] = field(default_factory=dict)
+    target_url: Callable[[Any], str] | None = None
+    cache: CachePolicy | None = None
+    finalize: Callable[[Any, Any], Awaitable[None]] | None = None
+    max_concurrency: int = 0
+    coalesces: bool = False
+
+
+class ToolRegistry:
+    """Registered tool specs; registering a spec also registers its backend executors."""
+
+    def __init__(self) -> None:
+        self._specs: Dict[str, ToolSpec] = {}
+
+    def register(self, spec: ToolSpec) -> None:
+        self._specs[spec.name] = spec
+        for backend, executor in spec.executors.items():
+            backend_registry.register(spec.name, backend, executor)
+
+    def get(self, name: str) -> ToolSpec:
+        return self._specs[name]
+
+    def names(self) -> List[str]:
+        return sorted(self._specs)
+
+    def __iter__(self) -> Iterator[ToolSpec]:
+        return iter(list(self._specs.values()))
+
+
+tool_registry = ToolRegistry()
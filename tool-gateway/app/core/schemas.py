@@ -18,8 +18,16 @@ class Envelope(BaseModel):
     content_hash: Optional[str] = None
 
 
+# Most content hashes a caller may list as already held.
+MAX_KNOWN_HASHES = 1000
+
+
 class WebFetchInputs(BaseModel):
     url: str
+    # Content the caller already has; a matching fetch returns only a reference.
+    known_hashes: List[str] = Field(default_factory=list, max_length=MAX_KNOWN_HASHES)
+    # content_hash of the caller's copy; an unchanged page returns no text.
+    if_none_match: Optional[str] = Field(default=None, pattern=r"^[0-9a-f]{64}$")
 
 
 class WebFetchRequest(BaseModel):
@@ -29,6 +37,19 @@ class WebFetchRequest(BaseModel):
     inputs: WebFetchInputs
 
 
+class WebFetchBatchInputs(BaseModel):
+    items: List[WebFetchInputs] = Field(min_length=1)
+    # Applies to every item, in addition to the item's own known_hashes.
+    known_hashes: List[str] = Field(default_factory=list, max_length=MAX_KNOWN_HASHES)
+
+
+class WebFetchBatchRequest(BaseModel):
+    agent_id: str
+    purpose: str
+    request_id: Optional[str] = None
+    inputs: WebFetchBatchInputs
+
+
 class WebSearchInputs(BaseModel):
     query: str
     max_results: int = 5
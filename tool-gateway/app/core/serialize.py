@@ -0,0 +1,52 @@
+import json
+from typing import Any, Dict
+
+from fastapi.responses import Response
+
+from app.core.schemas import Envelope
+
+try:  # Optional: several times faster than the stdlib encoder for large payloads.
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode compact UTF-8 JSON, matching what JSONResponse would send."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson.JSONEncodeError (a TypeError) covers values the stdlib accepts, such as
+            # integers wider than 64 bits; never turn valid JSON into a server error.
+            pass
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def envelope_content(envelope: Envelope) -> Dict[str, Any]:
+    """
+    Plain-dict view of an envelope without a recursive `model_dump()`.
+
+    Envelope fields already hold plain JSON values; only `error` is a model.
+    The dict shares `data`/`source_meta`/`timings_ms` with the envelope.
+    """
+    return {
+        "ok": envelope.ok,
+        "data": envelope.data,
+        "error": envelope.error.model_dump() if envelope.error is not None else None,
+        "source_meta": envelope.source_meta,
+        "timings_ms": envelope.timings_ms,
+        "content_hash": envelope.content_hash,
+    }
+
+
+def json_response(body: bytes, *, status_code: int, headers: Dict[str, str] | None = None) -> Response:
+    """Wrap an already-encoded body so the response is not encoded a second time."""
+    return Response(content=body, status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+def append_raw(body: bytes, key: str, raw: bytes) -> bytes:
+    """Add one top-level field holding pre-encoded JSON `raw` to an encoded JSON object."""
+    return body[:-1] + (b"," if len(body) > 2 else b"") + dumps(key) + b":" + raw + b"}"
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def search_key(backend: str, query: str, max_results: int) -> str:
+    return f"web.search|{backend}|{' '.join(query.split())}|{max_results}"
+
+
+def fetch_key(backend: str, canonical: str, conditional: Dict[str, str] | None = None) -> str:
+    validators = "|".join(f"{name}={value}" for name, value in sorted((conditional or {}).items()))
+    return f"web.fetch|{backend}|{canonical}|{validators}"
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical upstream calls onto one in-flight task.
+
+    The first caller for a key starts the call; callers arriving while it is in
+    flight await the same task and receive the same result or exception. The
+    shared task is shielded, so a cancelled caller does not cancel it for the
+    others; it is cancelled only once every caller has gone. Check `key in singleflight` before `do()` to learn whether a call
+    will be coalesced.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Future[Any]] = {}
+        self._waiters: Dict[asyncio.Future[Any], int] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+
+            def _forget(done: asyncio.Future[Any]) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                if not done.cancelled():
+                    # Mark the exception retrieved even if every waiter was cancelled.
+                    done.exception()
+
+            task.add_done_callback(_forget)
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # The last caller was cancelled; nobody is left to use the result.
+                    task.cancel()
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,124 @@
+import codecs
+import re
+from typing import Any
+
+# Bytes buffered to look for a BOM, a <meta> charset or binary magic when the
+# Content-Type header does not settle the question.
+SNIFF_BYTES = 4096
+DEFAULT_CHARSET = "utf-8"
+
+_TEXT_TYPES = {"application/xhtml+xml", "application/xml", "application/json", "application/rss+xml"}
+_BOMS = ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16-le"), (codecs.BOM_UTF16_BE, "utf-16-be"))
+_BINARY_MAGIC = (b"%PDF-", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"PK\x03\x04", b"\x1f\x8b", b"RIFF", b"\x00\x00\x01\x00")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]*?charset\s*=\s*["']?\s*([A-Za-z0-9._:-]+)""", re.IGNORECASE)
+_HEADER_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([A-Za-z0-9._:-]+)""", re.IGNORECASE)
+# Browsers decode these labels as windows-1252, which is a superset.
+_WINDOWS_1252_ALIASES = {"iso8859-1", "ascii"}
+
+
+def media_type(content_type: str | None) -> str | None:
+    if not content_type:
+        return None
+    return content_type.split(";", 1)[0].strip().lower() or None
+
+
+def is_text_content_type(content_type: str | None) -> bool:
+    """False for bodies that are not worth decoding; a missing type is sniffed instead."""
+    mime = media_type(content_type)
+    if mime is None:
+        return True
+    return mime.startswith("text/") or mime in _TEXT_TYPES or mime.endswith("+xml")
+
+
+def normalize_charset(label: str | None) -> str | None:
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip().strip("\"'")).name
+    except LookupError:
+        return None
+    return "cp1252" if name in _WINDOWS_1252_ALIASES else name
+
+
+def charset_from_content_type(content_type: str | None) -> str | None:
+    if not content_type:
+        return None
+    match = _HEADER_CHARSET_RE.search(content_type)
+    return normalize_charset(match.group(1)) if match else None
+
+
+def looks_binary(head: bytes) -> bool:
+    return head.startswith(_BINARY_MAGIC) or b"\x00" in head[:1024]
+
+
+def _is_utf8(head: bytes) -> bool:
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        # A multi-byte sequence cut at the end of the sniffed window is fine.
+        return exc.reason == "unexpected end of data" and exc.start >= len(head) - 3
+    return True
+
+
+def sniff_charset(head: bytes) -> str:
+    """BOM, then <meta charset>/http-equiv, then UTF-8 if the bytes validate, else windows-1252."""
+    for bom, name in _BOMS:
+        if head.startswith(bom):
+            return name
+    match = _META_CHARSET_RE.search(head)
+    if match is not None:
+        declared = normalize_charset(match.group(1).decode("ascii", "ignore"))
+        # A page that reached us as bytes cannot really be UTF-16 per its own meta.
+        if declared and not declared.startswith("utf-16"):
+            return declared
+    return DEFAULT_CHARSET if _is_utf8(head) else "cp1252"
+
+
+def _incremental_decoder(charset: str) -> Any:
+    # utf-8-sig also drops a BOM the header charset did not account for.
+    return codecs.getincrementaldecoder("utf-8-sig" if charset == "utf-8" else charset)(errors="ignore")
+
+
+class BodyDecoder:
+    """
+    Incremental bytes-to-text decoder for fetched pages.
+
+    With a charset in the Content-Type header, decoding starts on the first
+    chunk. Otherwise the first `SNIFF_BYTES` are held back, checked for binary
+    magic (only when the response had no Content-Type) and sniffed for the
+    charset. Once `binary` is set the caller should stop reading.
+    """
+
+    def __init__(self, content_type: str | None) -> None:
+        self.charset = charset_from_content_type(content_type)
+        self.binary = False
+        self._check_binary = media_type(content_type) is None
+        self._head = bytearray()
+        self._decoder = _incremental_decoder(self.charset) if self.charset else None
+
+    def feed(self, chunk: bytes) -> str:
+        if self._decoder is not None:
+            return self._decoder.decode(chunk)
+        if self.binary:
+            return ""
+        self._head.extend(chunk)
+        if len(self._head) < SNIFF_BYTES:
+            return ""
+        return self._start(final=False)
+
+    def finish(self) -> str:
+        if self._decoder is not None:
+            return self._decoder.decode(b"", final=True)
+        if self.binary:
+            return ""
+        return self._start(final=True)
+
+    def _start(self, *, final: bool) -> str:
+        head = bytes(self._head)
+        self._head.clear()
+        if self._check_binary and looks_binary(head):
+            self.binary = True
+            return ""
+        self.charset = sniff_charset(head)
+        self._decoder = _incremental_decoder(self.charset)
+        return self._decoder.decode(head, final=final)
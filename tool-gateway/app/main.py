@@ -1,8 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
+from app.api.content import router as content_router
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.api.tools import router as tools_router
+from app.core.audit import shutdown_audit_sink
+from app.core.http import client_registry
+from app.core.policy import get_dns_warmup_hosts
+from app.core.recorder import shutdown_tool_recorder
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    await client_registry.startup()
+    # Warm up in the background so a slow resolver or origin never delays startup.
+    hosts = get_dns_warmup_hosts()
+    warmup = asyncio.create_task(client_registry.warm_up(hosts)) if hosts else None
+    try:
+        yield
+    finally:
+        if warmup is not None:
+            warmup.cancel()
+        await client_registry.aclose()
+        shutdown_audit_sink()
+        shutdown_tool_recorder()
+
 
-app = FastAPI(title="Corestack Tool Gateway", version="0.1.0")
+app = FastAPI(title="Corestack Tool Gateway", version="0.1.0", lifespan=lifespan)
 app.include_router(health_router)
+app.include_router(content_router)
+app.include_router(metrics_router)
 app.include_router(tools_router)
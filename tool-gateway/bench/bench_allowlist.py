@@ -0,0 +1,128 @@
+"""
+Micro-benchmark: compiled allowlist vs. a linear scan over the same entries.
+
+Builds a 50k-entry allowlist (exact hosts, `*.suffix` wildcards and CIDR
+ranges) and times host checks for a mix of exact hits, wildcard hits, IP hits
+and misses. The linear scan is what wildcard/CIDR support costs without
+compilation; the legacy exact-only set lookup cannot express those entries.
+
+Usage (from tool-gateway/):
+
+    python -m bench.bench_allowlist [--entries N] [--lookups N] [--json]
+"""
+
+import argparse
+import ipaddress
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+from app.core.allowlist import CompiledAllowlist
+
+
+def _entries(count: int) -> List[str]:
+    rng = random.Random(7)
+    entries: List[str] = []
+    for i in range(count):
+        kind = i % 10
+        if kind < 6:
+            entries.append(f"host{i}.example{rng.randrange(1000)}.com")
+        elif kind < 9:
+            entries.append(f"*.dept{i}.gov.uk")
+        else:
+            entries.append(f"10.{(i >> 8) & 255}.{i & 255}.0/24")
+    return entries
+
+
+def _hosts(entries: List[str], lookups: int) -> List[str]:
+    rng = random.Random(11)
+    hosts: List[str] = []
+    for _ in range(lookups):
+        entry = rng.choice(entries)
+        roll = rng.random()
+        if roll < 0.25:
+            hosts.append(f"nowhere{rng.randrange(10**6)}.example.org")
+        elif entry.startswith("*."):
+            hosts.append(f"www.service.{entry[2:]}")
+        elif "/" in entry:
+            hosts.append(entry.split("/", 1)[0][:-1] + "17")
+        else:
+            hosts.append(entry)
+    return hosts
+
+
+def _linear_matcher(entries: List[str]) -> Callable[[str], bool]:
+    parsed = []
+    for entry in entries:
+        if "/" in entry:
+            parsed.append(("cidr", ipaddress.ip_network(entry)))
+        elif entry.startswith("*."):
+            parsed.append(("suffix", entry[1:]))
+        else:
+            parsed.append(("exact", entry))
+
+    def matches(host: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(host)
+        except ValueError:
+            ip = None
+        for kind, value in parsed:
+            if kind == "exact" and host == value:
+                return True
+            if kind == "suffix" and host.endswith(value):
+                return True
+            if kind == "cidr" and ip is not None and ip in value:
+                return True
+        return False
+
+    return matches
+
+
+def _ns_per_lookup(matches: Callable[[str], bool], hosts: List[str]) -> float:
+    started = time.perf_counter_ns()
+    for host in hosts:
+        matches(host)
+    return (time.perf_counter_ns() - started) / len(hosts)
+
+
+def run(entry_count: int, lookups: int) -> Dict[str, float]:
+    entries = _entries(entry_count)
+    hosts = _hosts(entries, lookups)
+
+    started = time.perf_counter()
+    compiled = CompiledAllowlist(entries)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    linear = _linear_matcher(entries)
+    # The linear scan is slow enough that a slice of the lookups is representative.
+    linear_hosts = hosts[: max(1, lookups // 100)]
+    assert all(compiled.matches(h) == linear(h) for h in linear_hosts)
+
+    return {
+        "entries": entry_count,
+        "compile_ms": round(compile_ms, 1),
+        "compiled_ns_per_lookup": round(_ns_per_lookup(compiled.matches, hosts), 1),
+        "linear_ns_per_lookup": round(_ns_per_lookup(linear, linear_hosts), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.entries, args.lookups)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"entries:            {results['entries']}")
+    print(f"compile:            {results['compile_ms']:.1f} ms")
+    print(f"compiled lookup:    {results['compiled_ns_per_lookup']:.1f} ns")
+    print(f"linear scan lookup: {results['linear_ns_per_lookup']:.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the streaming HTML extractor against the legacy regex pipeline.
+
+Usage (from tool-gateway/):
+
+    python -m bench.bench_extract [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import re
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.core.extract import MAX_EXTRACTED_CHARS, extract
+
+PAGE_SIZES = {"100KB": 100_000, "1MB": 1_000_000, "5MB": 5_000_000}
+
+_title_re = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_tag_re = re.compile(r"<[^>]+>")
+_space_re = re.compile(r"\s+")
+
+
+def legacy_extract(html: str) -> Tuple[str, str]:
+    """The regex pipeline fetch_url used before the streaming extractor."""
+    match = _title_re.search(html)
+    title = _space_re.sub(" ", match.group(1)).strip() if match else ""
+    text = _space_re.sub(" ", _tag_re.sub(" ", html)).strip()[:MAX_EXTRACTED_CHARS]
+    return title, text
+
+
+def make_page(size: int) -> str:
+    head = (
+        "<!doctype html><html><head><meta charset='utf-8'><title>Benchmark page</title>"
+        + "<style>" + ("body{margin:0;padding:0}" * 200) + "</style>"
+        + "<script>" + ("var x = '<div>' + 1;" * 400) + "</script></head><body>"
+    )
+    block = (
+        "<div class='article'><h2>Section heading</h2>"
+        "<p>Lorem ipsum dolor sit amet, <a href='/x'>consectetur</a> adipiscing elit, "
+        "sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p>\n"
+        "<ul><li>one</li><li>two</li><li>three</li></ul></div>\n"
+    )
+    body: List[str] = [head]
+    length = len(head)
+    while length < size:
+        body.append(block)
+        length += len(block)
+    body.append("</body></html>")
+    return "".join(body)
+
+
+def _time(fn: Callable[[str], Tuple[str, str]], html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def run(repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for label, size in PAGE_SIZES.items():
+        html = make_page(size)
+        legacy_ms = _time(legacy_extract, html, repeat)
+        streaming_ms = _time(extract, html, repeat)
+        results[label] = {
+            "legacy_regex_ms": legacy_ms,
+            "streaming_ms": streaming_ms,
+            "speedup": round(legacy_ms / streaming_ms, 1) if streaming_ms else 0.0,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'page':>6}  {'legacy regex':>14}  {'streaming':>10}  {'speedup':>8}")
+    for label, row in results.items():
+        print(f"{label:>6}  {row['legacy_regex_ms']:>11.3f} ms  {row['streaming_ms']:>7.3f} ms  {row['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Load test: drive a real gateway process against local mock upstreams.
+
+Starts `bench.mock_upstreams` and a uvicorn gateway as subprocesses, then
+sends `/tools/web.fetch` and `/tools/web.search` at a fixed concurrency for a
+fixed duration each. `web.fetch` uses `--backend` (`local` fetches and
+extracts the synthetic origin pages, `n8n` goes through the mock webhook);
+`web.search` always goes through the mock n8n. Every fetch targets a distinct
+URL, so neither the cache nor request coalescing hides upstream work.
+
+Reports req/s, latency percentiles, status counts and the gateway's CPU time
+and RSS (read from /proc, so Linux only) as JSON. Save a run with `--output`
+and pass it as `--baseline` on another commit to get the relative change.
+
+Usage (from tool-gateway/):
+
+    python -m bench.bench_load [--backend local|n8n] [--concurrency N] [--duration S]
+        [--scenarios web.fetch,web.search] [--env KEY=VALUE ...]
+        [--output FILE] [--baseline FILE] [--json]
+
+Mock upstream options (`--page-bytes`, `--origin-latency-ms`,
+`--origin-error-rate`, `--n8n-latency-ms`, ...) are listed by `--help`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from bench.mock_upstreams import add_arguments as add_mock_arguments
+
+GATEWAY_DIR = Path(__file__).resolve().parents[1]
+SCENARIOS = ("web.fetch", "web.search")
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=GATEWAY_DIR, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _start_mocks(args: argparse.Namespace) -> Tuple[subprocess.Popen, Dict[str, int]]:
+    command = [
+        sys.executable,
+        "-m",
+        "bench.mock_upstreams",
+        f"--page-bytes={args.page_bytes}",
+        f"--origin-latency-ms={args.origin_latency_ms}",
+        f"--origin-error-rate={args.origin_error_rate}",
+        f"--origin-reset-rate={args.origin_reset_rate}",
+        f"--n8n-latency-ms={args.n8n_latency_ms}",
+        f"--n8n-error-rate={args.n8n_error_rate}",
+        f"--n8n-reset-rate={args.n8n_reset_rate}",
+        f"--secret={args.secret}",
+        f"--seed={args.seed}",
+    ]
+    proc = subprocess.Popen(command, cwd=GATEWAY_DIR, stdout=subprocess.PIPE, text=True)
+    assert proc.stdout is not None
+    line = proc.stdout.readline()
+    if not line:
+        proc.kill()
+        raise RuntimeError("mock upstreams failed to start")
+    return proc, json.loads(line)
+
+
+def _start_gateway(args: argparse.Namespace, ports: Dict[str, int], port: int) -> subprocess.Popen:
+    n8n = f"http://127.0.0.1:{ports['n8n_port']}/webhook/tools"
+    env = {
+        **os.environ,
+        "TOOL_BACKEND": args.backend,
+        "TOOL_BACKEND_CHAIN_WEB_SEARCH": "n8n",
+        "N8N_WEB_FETCH_URL": f"{n8n}/web.fetch",
+        "N8N_WEB_SEARCH_URL": f"{n8n}/web.search",
+        "TOOL_SHARED_SECRET": args.secret,
+        "WEB_ALLOWLIST": "127.0.0.1,localhost",
+        "TOOL_RATE_LIMIT_PER_MINUTE": "1000000000",
+        "AUDIT_LOG_PATH": os.devnull,
+    }
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host=127.0.0.1",
+        f"--port={port}",
+        f"--workers={args.workers}",
+        "--log-level=warning",
+        "--no-access-log",
+    ]
+    return subprocess.Popen(command, cwd=GATEWAY_DIR, env=env)
+
+
+async def _wait_ready(base_url: str, proc: subprocess.Popen, timeout_s: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"gateway exited with {proc.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("gateway did not become ready")
+
+
+def _process_tree(pid: int) -> List[int]:
+    pids = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children", encoding="ascii") as handle:
+                for child in handle.read().split():
+                    pids.extend(_process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def _proc_snapshot(pid: int) -> Dict[str, float] | None:
+    """CPU seconds and RSS (current and peak, MiB) summed over the gateway's process tree."""
+    ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    cpu_s = rss_kb = peak_kb = 0.0
+    try:
+        for member in _process_tree(pid):
+            with open(f"/proc/{member}/stat", encoding="ascii") as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+            cpu_s += (int(fields[11]) + int(fields[12])) / ticks
+            with open(f"/proc/{member}/status", encoding="ascii") as handle:
+                for line in handle:
+                    if line.startswith("VmRSS:"):
+                        rss_kb += int(line.split()[1])
+                    elif line.startswith("VmHWM:"):
+                        peak_kb += int(line.split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return {"cpu_s": cpu_s, "rss_mb": rss_kb / 1024, "peak_rss_mb": peak_kb / 1024}
+
+
+def _request_body(scenario: str, index: int, origin_port: int) -> Dict[str, Any]:
+    if scenario == "web.fetch":
+        inputs: Dict[str, Any] = {"url": f"http://127.0.0.1:{origin_port}/page/{index}"}
+    else:
+        inputs = {"query": f"load test query {index}", "max_results": 5}
+    return {"agent_id": "bench-load", "purpose": "load test", "request_id": f"load-{index}", "inputs": inputs}
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    scenario: str,
+    origin_port: int,
+    concurrency: int,
+    duration_s: float,
+    first_index: int,
+) -> Tuple[List[float], Counter, float, int]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = iter(range(first_index, sys.maxsize))
+    deadline = time.perf_counter() + duration_s
+
+    async def _worker() -> None:
+        while time.perf_counter() < deadline:
+            body = _request_body(scenario, next(counter), origin_port)
+            started = time.perf_counter()
+            try:
+                resp = await client.post(f"/tools/{scenario}", json=body)
+                statuses[str(resp.status_code)] += 1
+            except httpx.HTTPError as exc:
+                statuses[type(exc).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_worker() for _ in range(concurrency)])
+    return latencies, statuses, time.perf_counter() - started, next(counter)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _run_scenarios(args: argparse.Namespace, base_url: str, gateway_pid: int, origin_port: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        index = 0
+        for scenario in args.scenarios:
+            if args.warmup > 0:
+                _, _, _, index = await _drive(client, scenario, origin_port, args.concurrency, args.warmup, index)
+            before = _proc_snapshot(gateway_pid)
+            latencies, statuses, elapsed, index = await _drive(
+                client, scenario, origin_port, args.concurrency, args.duration, index
+            )
+            after = _proc_snapshot(gateway_pid)
+            ordered = sorted(latencies)
+            count = len(ordered)
+            ok = statuses.get("200", 0)
+            result: Dict[str, Any] = {
+                "requests": count,
+                "ok": ok,
+                "errors": count - ok,
+                "statuses": dict(sorted(statuses.items())),
+                "rps": round(count / elapsed, 1) if elapsed else 0.0,
+                "latency_ms": {
+                    "mean": round(sum(ordered) / count, 2) if count else 0.0,
+                    "p50": round(_percentile(ordered, 0.50), 2),
+                    "p90": round(_percentile(ordered, 0.90), 2),
+                    "p99": round(_percentile(ordered, 0.99), 2),
+                    "max": round(ordered[-1], 2) if ordered else 0.0,
+                },
+            }
+            if before is not None and after is not None:
+                cpu_s = after["cpu_s"] - before["cpu_s"]
+                result["gateway"] = {
+                    "cpu_s": round(cpu_s, 3),
+                    "cpu_percent": round(100 * cpu_s / elapsed, 1) if elapsed else 0.0,
+                    "cpu_ms_per_request": round(1000 * cpu_s / count, 3) if count else 0.0,
+                    "rss_mb": round(after["rss_mb"], 1),
+                    "peak_rss_mb": round(after["peak_rss_mb"], 1),
+                }
+            results[scenario] = result
+    return results
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mocks, ports = _start_mocks(args)
+    gateway_port = _free_port()
+    gateway = _start_gateway(args, ports, gateway_port)
+    base_url = f"http://127.0.0.1:{gateway_port}"
+    try:
+        asyncio.run(_wait_ready(base_url, gateway))
+        scenarios = asyncio.run(_run_scenarios(args, base_url, gateway.pid, ports["origin_port"]))
+    finally:
+        for proc in (gateway, mocks):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    return {
+        "commit": _git_commit(),
+        "config": {
+            "backend": args.backend,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "workers": args.workers,
+            "page_bytes": args.page_bytes,
+            "origin_latency_ms": args.origin_latency_ms,
+            "origin_error_rate": args.origin_error_rate,
+            "origin_reset_rate": args.origin_reset_rate,
+            "n8n_latency_ms": args.n8n_latency_ms,
+            "n8n_error_rate": args.n8n_error_rate,
+            "n8n_reset_rate": args.n8n_reset_rate,
+            "env": sorted(args.env),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def _change(current: float, baseline: float) -> float | None:
+    return round(100 * (current - baseline) / baseline, 1) if baseline else None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Percent change per scenario for throughput, latency and CPU cost."""
+    changes: Dict[str, Any] = {"baseline_commit": baseline.get("commit")}
+    for scenario, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if base is None:
+            continue
+        delta = {
+            "rps_percent": _change(result["rps"], base["rps"]),
+            "p50_percent": _change(result["latency_ms"]["p50"], base["latency_ms"]["p50"]),
+            "p99_percent": _change(result["latency_ms"]["p99"], base["latency_ms"]["p99"]),
+        }
+        if "gateway" in result and "gateway" in base:
+            delta["cpu_ms_per_request_percent"] = _change(
+                result["gateway"]["cpu_ms_per_request"], base["gateway"]["cpu_ms_per_request"]
+            )
+        changes[scenario] = delta
+    return changes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("local", "n8n"), default="local", help="web.fetch backend")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra gateway env")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--json", action="store_true", help="emit machine-readable JSON")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = run(args)
+    if args.baseline:
+        results["comparison"] = compare(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"commit {results['commit']}  backend={args.backend}  concurrency={args.concurrency}")
+    for scenario, result in results["scenarios"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{scenario:<11} {result['rps']:>9.1f} req/s  "
+            f"p50 {latency['p50']:>8.2f} ms  p90 {latency['p90']:>8.2f} ms  p99 {latency['p99']:>8.2f} ms  "
+            f"errors {result['errors']}"
+        )
+        gateway = result.get("gateway")
+        if gateway:
+            print(
+                f"{'':<11} cpu {gateway['cpu_percent']:>6.1f}%  {gateway['cpu_ms_per_request']:.3f} ms/req  "
+                f"rss {gateway['rss_mb']:.1f} MiB (peak {gateway['peak_rss_mb']:.1f})"
+            )
+    for scenario, delta in results.get("comparison", {}).items():
+        if isinstance(delta, dict):
+            print(f"vs baseline {scenario}: " + ", ".join(f"{key} {value:+}" for key, value in delta.items() if value is not None))
+
+
+if __name__ == "__main__":
+    main()
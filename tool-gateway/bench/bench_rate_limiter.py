@@ -0,0 +1,116 @@
+"""
+Micro-benchmark: GCRA rate limiter vs. the legacy per-key timestamp deque.
+
+A simulated clock advances by 60/limit seconds per call, so each limiter runs
+at exactly its limit with a full window. Reports the per-call cost and the
+state held for the key, up to a 10k/min limit.
+
+Usage (from tool-gateway/):
+
+    python -m bench.bench_rate_limiter [--calls N] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from typing import Callable, Deque, Dict
+
+from app.core import policy
+
+LIMIT_PER_MINUTE = 10_000
+
+
+class LegacyDequeLimiter:
+    """The sliding-window limiter the gateway used before GCRA."""
+
+    def __init__(self) -> None:
+        self._events: Dict[str, Deque[float]] = {}
+
+    def allow(self, key: str, limit_per_minute: int) -> bool:
+        now = time.monotonic()
+        window_start = now - 60.0
+        bucket = self._events.setdefault(key, deque())
+        while bucket and bucket[0] < window_start:
+            bucket.popleft()
+        if len(bucket) >= limit_per_minute:
+            return False
+        bucket.append(now)
+        return True
+
+
+def _state_bytes(limiter: object) -> int:
+    events = getattr(limiter, "_events")
+    total = sys.getsizeof(events)
+    for value in events.values():
+        total += sys.getsizeof(value)
+        if isinstance(value, deque):
+            total += sum(sys.getsizeof(item) for item in value)
+    return total
+
+
+class _SimulatedClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _per_call_ns(allow: Callable[[str, int], bool], clock: _SimulatedClock, calls: int, limit: int) -> float:
+    step = 60.0 / limit
+    # Fill the window first so the measured calls run against a full bucket.
+    for _ in range(limit):
+        clock.now += step
+        allow("web.fetch", limit)
+    timer = time.perf_counter_ns
+    elapsed = 0
+    for _ in range(calls):
+        clock.now += step
+        started = timer()
+        allow("web.fetch", limit)
+        elapsed += timer() - started
+    return elapsed / calls
+
+
+def run(calls: int) -> Dict[str, Dict[str, float]]:
+    clock = _SimulatedClock()
+    real_monotonic = time.monotonic
+    time.monotonic = clock  # both limiters read time.monotonic at call time
+    try:
+        results: Dict[str, Dict[str, float]] = {}
+        for limit in (100, 1_000, LIMIT_PER_MINUTE):
+            legacy = LegacyDequeLimiter()
+            gcra = policy.RateLimiter()
+            results[f"{limit}/min"] = {
+                "legacy_ns_per_call": round(_per_call_ns(legacy.allow, clock, calls, limit), 1),
+                "gcra_ns_per_call": round(_per_call_ns(gcra.allow, clock, calls, limit), 1),
+                "legacy_state_bytes": _state_bytes(legacy),
+                "gcra_state_bytes": _state_bytes(gcra),
+            }
+        return results
+    finally:
+        time.monotonic = real_monotonic
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.calls)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'limit':>10}  {'legacy ns/call':>15}  {'gcra ns/call':>13}  {'legacy state':>13}  {'gcra state':>11}")
+    for label, row in results.items():
+        print(
+            f"{label:>10}  {row['legacy_ns_per_call']:>15.1f}  {row['gcra_ns_per_call']:>13.1f}"
+            f"  {row['legacy_state_bytes']:>11} B  {row['gcra_state_bytes']:>9} B"
+        )
+
+
+if __name__ == "__main__":
+    main()
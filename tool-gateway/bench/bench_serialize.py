@@ -0,0 +1,105 @@
+"""
+Micro-benchmark: single-pass envelope encoding vs. the legacy response path.
+
+The legacy path is `model_dump()`, a `json.dumps` to size the audit
+`bytes_out`, then `JSONResponse` encoding the dict again. The current path
+builds the content dict without `model_dump()` and encodes it once, with orjson
+when installed and the stdlib encoder otherwise. Uses a typical web.fetch
+envelope with 12 KB of extracted text.
+
+Usage (from tool-gateway/):
+
+    python -m bench.bench_serialize [--iterations N] [--json]
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict
+
+from fastapi.responses import JSONResponse
+
+from app.api import tools
+from app.core import serialize
+from app.core.schemas import Envelope
+
+EXTRACTED_CHARS = 12_000
+
+
+def _envelope() -> Envelope:
+    text = ("Corestack tool gateway extracted text, with some non-ASCII: café. " * 200)[:EXTRACTED_CHARS]
+    return Envelope(
+        ok=True,
+        data={
+            "url": "https://example.com/article",
+            "final_url": "https://example.com/article",
+            "status": 200,
+            "title": "Example article",
+            "extracted_text": text,
+            "fetched_at": "2026-01-01T00:00:00+00:00",
+        },
+        error=None,
+        source_meta={
+            "tool": "web.fetch",
+            "backend": "local",
+            "bytes_read": 48213,
+            "truncated": False,
+            "cache": "miss",
+            "coalesced": False,
+        },
+        timings_ms={"total": 12.5},
+        content_hash="0" * 64,
+    )
+
+
+def _legacy(envelope: Envelope) -> int:
+    content = envelope.model_dump()
+    bytes_out = len(json.dumps(content, separators=(",", ":"), ensure_ascii=True).encode("utf-8"))
+    JSONResponse(status_code=200, content=content)
+    return bytes_out
+
+
+def _single_pass(envelope: Envelope) -> int:
+    _, body = tools._encode_envelope(envelope, tools._Phases("web.fetch", "local"), 12.5)  # noqa: SLF001
+    serialize.json_response(body, status_code=200)
+    return len(body)
+
+
+def _us_per_call(fn: Callable[[Envelope], int], iterations: int) -> float:
+    envelope = _envelope()
+    fn(envelope)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(envelope)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(iterations: int) -> Dict[str, float]:
+    results = {"legacy_us": round(_us_per_call(_legacy, iterations), 1)}
+    orjson = serialize.orjson
+    try:
+        serialize.orjson = None
+        results["single_pass_stdlib_us"] = round(_us_per_call(_single_pass, iterations), 1)
+    finally:
+        serialize.orjson = orjson
+    if orjson is not None:
+        results["single_pass_orjson_us"] = round(_us_per_call(_single_pass, iterations), 1)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for label, value in results.items():
+        print(f"{label:>24}: {value:8.1f} us/response")
+
+
+if __name__ == "__main__":
+    main()
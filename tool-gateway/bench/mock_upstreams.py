@@ -0,0 +1,247 @@
+"""
+Asyncio mock n8n webhooks and a synthetic HTML origin for load tests.
+
+Both servers speak just enough HTTP/1.1 (keep-alive, Content-Length bodies)
+to sit behind the gateway without becoming the bottleneck:
+
+- mock n8n: `POST /webhook/tools/web.fetch` and `/webhook/tools/web.search`
+  answer like the real workflows after `--n8n-latency-ms`.
+- origin: `GET /<anything>` returns an HTML page of `--page-bytes` after
+  `--origin-latency-ms`. `?bytes=N` and `?latency_ms=N` override per request.
+
+`--*-error-rate` answers that share of requests with a 500 and
+`--*-reset-rate` drops the connection without a response. Once listening,
+one JSON line with both ports is printed to stdout.
+
+Usage (from tool-gateway/):
+
+    python -m bench.mock_upstreams [--n8n-port N] [--origin-port N] [--page-bytes N] ...
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# (status, content type, body), or None to reset the connection.
+Reply = Optional[Tuple[int, str, bytes]]
+Handler = Callable[[str, str, Dict[str, str], bytes], Awaitable[Reply]]
+
+_REASONS = {200: "OK", 401: "Unauthorized", 404: "Not Found", 500: "Internal Server Error"}
+_MAX_HEADER_BYTES = 64 * 1024
+
+
+def html_page(size: int, seed: int = 0) -> bytes:
+    """A page of roughly `size` bytes with a title, nav/script noise and paragraphs."""
+    rng = random.Random(seed)
+    words = ["gateway", "latency", "origin", "tool", "cache", "policy", "agent", "fetch", "search", "audit"]
+    head = b"<html><head><title>Synthetic page %d</title><script>var x = 1;</script></head><body><nav>menu</nav>" % seed
+    tail = b"</body></html>"
+    parts = [head]
+    total = len(head) + len(tail)
+    while total < size:
+        paragraph = ("<p>" + " ".join(rng.choice(words) for _ in range(40)) + "</p>\n").encode("ascii")
+        parts.append(paragraph)
+        total += len(paragraph)
+    parts.append(tail)
+    return b"".join(parts)
+
+
+class MockHTTPServer:
+    """Minimal keep-alive HTTP/1.1 server around an async handler."""
+
+    def __init__(self, handler: Handler, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port, limit=_MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+                reply = await self.handler(method, target, headers, body)
+                if reply is None:
+                    writer.transport.abort()
+                    return
+                status, content_type, payload = reply
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_REASONS.get(status, 'Status')}\r\n"
+                        f"Content-Type: {content_type}\r\n"
+                        f"Content-Length: {len(payload)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            return
+        finally:
+            writer.close()
+
+
+class Faults:
+    """Seeded fault injection: a share of requests get a 500 or a dropped connection."""
+
+    def __init__(self, error_rate: float, reset_rate: float, seed: int) -> None:
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self._rng = random.Random(seed)
+
+    def roll(self) -> str | None:
+        value = self._rng.random()
+        if value < self.reset_rate:
+            return "reset"
+        if value < self.reset_rate + self.error_rate:
+            return "error"
+        return None
+
+
+def origin_handler(page_bytes: int, latency_ms: float, faults: Faults) -> Handler:
+    pages: Dict[int, bytes] = {}
+
+    async def handle(method: str, target: str, headers: Dict[str, str], body: bytes) -> Reply:
+        query = parse_qs(urlsplit(target).query)
+        size = int(query.get("bytes", [page_bytes])[0])
+        delay_ms = float(query.get("latency_ms", [latency_ms])[0])
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+        fault = faults.roll()
+        if fault == "reset":
+            return None
+        if fault == "error":
+            return 500, "text/plain", b"injected fault"
+        page = pages.get(size)
+        if page is None:
+            page = pages[size] = html_page(size, seed=size)
+        return 200, "text/html; charset=utf-8", page
+
+    return handle
+
+
+def n8n_handler(page_bytes: int, latency_ms: float, faults: Faults, secret: str) -> Handler:
+    text = " ".join(["mock n8n fetch result"] * max(1, page_bytes // 40))
+
+    async def handle(method: str, target: str, headers: Dict[str, str], body: bytes) -> Reply:
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000.0)
+        if secret and headers.get("x-tool-secret", "") != secret:
+            return 401, "application/json", b'{"code":"UNAUTHORIZED","message":"Invalid X-Tool-Secret"}'
+        fault = faults.roll()
+        if fault == "reset":
+            return None
+        if fault == "error":
+            return 500, "application/json", b'{"code":"INJECTED_FAULT"}'
+        payload = json.loads(body or b"{}")
+        path = urlsplit(target).path
+        if path.endswith("/webhook/tools/web.fetch"):
+            result = {
+                "url": payload.get("url", ""),
+                "final_url": payload.get("url", ""),
+                "status": 200,
+                "title": "Mock n8n fetch",
+                "extracted_text": text,
+                "fetched_at": "2026-01-01T00:00:00Z",
+            }
+        elif path.endswith("/webhook/tools/web.search"):
+            result = {
+                "query": payload.get("query", ""),
+                "results": [
+                    {
+                        "title": f"Mock result {i}",
+                        "url": f"https://example.com/result/{i}",
+                        "snippet": "mock snippet",
+                        "source": "mock",
+                        "published_at": None,
+                    }
+                    for i in range(int(payload.get("max_results") or 5))
+                ],
+                "searched_at": "2026-01-01T00:00:00Z",
+            }
+        else:
+            return 404, "application/json", b"{}"
+        return 200, "application/json", json.dumps(result).encode("utf-8")
+
+    return handle
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--page-bytes", type=int, default=50_000, help="origin page size")
+    parser.add_argument("--origin-latency-ms", type=float, default=5.0)
+    parser.add_argument("--origin-error-rate", type=float, default=0.0, help="share of origin 500s")
+    parser.add_argument("--origin-reset-rate", type=float, default=0.0, help="share of dropped origin connections")
+    parser.add_argument("--n8n-latency-ms", type=float, default=5.0)
+    parser.add_argument("--n8n-error-rate", type=float, default=0.0, help="share of n8n 500s")
+    parser.add_argument("--n8n-reset-rate", type=float, default=0.0, help="share of dropped n8n connections")
+    parser.add_argument("--secret", default="bench-secret", help="expected X-Tool-Secret")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+async def serve(args: argparse.Namespace, n8n_port: int = 0, origin_port: int = 0) -> None:
+    n8n = MockHTTPServer(
+        n8n_handler(
+            args.page_bytes,
+            args.n8n_latency_ms,
+            Faults(args.n8n_error_rate, args.n8n_reset_rate, args.seed),
+            args.secret,
+        ),
+        port=n8n_port,
+    )
+    origin = MockHTTPServer(
+        origin_handler(
+            args.page_bytes,
+            args.origin_latency_ms,
+            Faults(args.origin_error_rate, args.origin_reset_rate, args.seed + 1),
+        ),
+        port=origin_port,
+    )
+    ports = {"n8n_port": await n8n.start(), "origin_port": await origin.start()}
+    print(json.dumps(ports), flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await n8n.close()
+        await origin.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n8n-port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--origin-port", type=int, default=0, help="0 picks a free port")
+    add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args, args.n8n_port, args.origin_port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()